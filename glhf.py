@@ -2,57 +2,20 @@
 
 import asyncio
 import datetime
-import traceback
-from typing import List
-from langgraph.store.memory import InMemoryStore
-
-from src.graph import build_graph
-from src.utils.problem_api import ProblemAPIClient, Challenge
-from src.state import State, Target
-from langchain_core.messages import HumanMessage, SystemMessage
-
-
-async def run_single_challenge(challenge: Challenge, graph_index: int):
-    """Run a single challenge in its own graph instance."""
-    print(f"[Graph {graph_index}] Starting challenge: {challenge.challenge_code}")
-
-    # Create separate store for each graph instance
-    store = InMemoryStore()
-
-    # Build the graph with its own store
-    graph = build_graph()
-
-    # Prepare initial state with challenge information
-    initial_state = State(
-        messages=[
-            SystemMessage(
-                content=f"Your challenge code is `{challenge.challenge_code}`. Use it for submitting answer or getting hint."
-            )
-        ],
-        target=[
-            Target(ip=challenge.target_info.ip, port=port) for port in challenge.target_info.port
-        ],
-        recon="",
-        findings=[],
-        flag="",
-        redirection=[],
-    )
-
-    try:
-        # Run the graph
-        result = await graph.ainvoke(
-            initial_state,
-            store=store,
-            config={"recursion_limit": 100},
-        )
-        print(f"[Graph {graph_index}] Completed challenge: {challenge.challenge_code}")
-        if result.get("flag"):
-            print(f"[Graph {graph_index}] Found flag: {result['flag']}")
-        return result
-    except Exception as e:
-        print(f"[Graph {graph_index}] Error in challenge {challenge.challenge_code}: {str(e)}")
-        print(f"[Graph {graph_index}] Traceback:\n{traceback.format_exc()}")
-        return None
+import functools
+import math
+from typing import Any, Dict, List
+
+from src.budget import Preempted
+from src.checkpoint import open_persistence
+from src.llm import aclose_clients
+from src.runner import run_single_challenge
+from src.runtime import close_jobs, close_kernels, close_shells, warm_kernels
+from src.scheduler import ChallengeScheduler
+from src.settings import settings
+from src.utils.problem_api import Challenge, ProblemAPIClient
+from src.web import close_web_clients
+from src.workers import ProcessWorkerPool
 
 
 async def wait_15_minutes():
@@ -80,6 +43,26 @@ async def wait_15_minutes():
     print("Wait complete! Starting competition...")
 
 
+async def run_scheduled(challenges: List[Challenge], runner) -> Dict[str, Any]:
+    """Run challenges through a bounded priority scheduler."""
+    scheduler = ChallengeScheduler(
+        runner,
+        max_workers=settings.MAX_CONCURRENT_CHALLENGES,
+        max_attempts=settings.MAX_CHALLENGE_ATTEMPTS,
+        max_passes=settings.MAX_CHALLENGE_PASSES,
+    )
+    print(f"\nScheduling {len(challenges)} challenges across {scheduler.max_workers} slots...\n")
+    return await scheduler.run(challenges)
+
+
+async def run_in_worker_processes(challenges: List[Challenge]) -> Dict[str, Any]:
+    """Run challenges on a pool of worker processes, sharing the scheduler slots."""
+    processes = max(1, min(settings.WORKER_PROCESSES, settings.MAX_CONCURRENT_CHALLENGES))
+    concurrency = math.ceil(settings.MAX_CONCURRENT_CHALLENGES / processes)
+    async with ProcessWorkerPool(processes, concurrency) as pool:
+        return await run_scheduled(challenges, pool.run)
+
+
 async def run_competition(skip_wait: bool = False):
     """Main competition runner."""
     if not skip_wait:
@@ -103,42 +86,31 @@ async def run_competition(skip_wait: bool = False):
             print("All challenges are already solved! 🎉")
             return
 
-        # Run all unsolved challenges in parallel
-        tasks = []
-        for i, challenge in enumerate(unsolved_challenges):
-            task = asyncio.create_task(run_single_challenge(challenge, i))
-            tasks.append(task)
-
-        print(f"\nStarting {len(tasks)} parallel graph instances...\n")
-
-        # Wait for all challenges to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Retry any challenges that failed due to errors
-        failed_indices = [
-            idx
-            for idx, result in enumerate(results)
-            if isinstance(result, Exception) or result is None
-        ]
-
-        if failed_indices:
-            print("\nRetrying failed challenges...\n")
-            retry_tasks = [
-                asyncio.create_task(run_single_challenge(unsolved_challenges[idx], idx))
-                for idx in failed_indices
-            ]
-            retry_results = await asyncio.gather(*retry_tasks, return_exceptions=True)
-            for idx, retry_result in zip(failed_indices, retry_results):
-                results[idx] = retry_result
+        if settings.EXECUTION_MODE == "process":
+            results = await run_in_worker_processes(unsolved_challenges)
+        else:
+            warm_kernels()
+            async with open_persistence() as persistence:
+                results = await run_scheduled(
+                    unsolved_challenges,
+                    functools.partial(run_single_challenge, persistence=persistence),
+                )
 
         # Print summary
         print("\n📊 COMPETITION RESULTS 📊")
-        successful = sum(1 for r in results if r and not isinstance(r, Exception))
-        print(f"Successful completions: {successful}/{len(tasks)}")
+        successful = sum(
+            1 for r in results.values() if r and not isinstance(r, (Exception, Preempted))
+        )
+        print(f"Successful completions: {successful}/{len(unsolved_challenges)}")
 
-        for i, (challenge, result) in enumerate(zip(unsolved_challenges, results)):
+        for challenge in unsolved_challenges:
+            result = results.get(challenge.challenge_code)
             if isinstance(result, Exception):
                 print(f"Challenge {challenge.challenge_code}: ❌ Error - {result}")
+            elif isinstance(result, Preempted):
+                print(
+                    f"Challenge {challenge.challenge_code}: ⏸️ Preempted - {result.reason}"
+                )
             elif result is None:
                 print(
                     f"Challenge {challenge.challenge_code}: ❌ Error - graph did not return a result"
@@ -162,7 +134,14 @@ async def main():
     if skip_wait:
         print("Skipping wait, starting immediately...")
 
-    await run_competition(skip_wait=skip_wait)
+    try:
+        await run_competition(skip_wait=skip_wait)
+    finally:
+        await close_shells()
+        await close_kernels()
+        await close_jobs()
+        await close_web_clients()
+        await aclose_clients()
 
 
 if __name__ == "__main__":
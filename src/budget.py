@@ -0,0 +1,109 @@
+"""Per-challenge time, token and tool-call budgets."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.settings import settings
+
+
+class BudgetExceeded(Exception):
+    """Raised from inside the graph run when a challenge exhausts its budget."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass
+class ChallengeBudget:
+    """Limits for one pass over a challenge. ``0`` disables a limit."""
+
+    max_seconds: float = 0
+    max_tokens: int = 0
+    max_tool_calls: int = 0
+
+    @classmethod
+    def from_settings(cls) -> "ChallengeBudget":
+        return cls(
+            max_seconds=settings.CHALLENGE_TIME_BUDGET,
+            max_tokens=settings.CHALLENGE_TOKEN_BUDGET,
+            max_tool_calls=settings.CHALLENGE_TOOL_CALL_BUDGET,
+        )
+
+
+@dataclass
+class Preempted:
+    """Result of a run that was stopped because its budget ran out."""
+
+    reason: str
+    state: Optional[dict] = None
+    usage: dict = field(default_factory=dict)
+
+
+def _usage_tokens(response: LLMResult) -> int:
+    total = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                total += usage.get("total_tokens", 0)
+    if total:
+        return total
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("total_tokens", 0) or 0
+
+
+class BudgetTracker(BaseCallbackHandler):
+    """Callback that meters a graph run and preempts it when a limit is hit.
+
+    Passed in the run config, so every LLM call and tool call made by the
+    recon, scout and router nodes is counted. Checks happen at the start of
+    each call, which lets the in-flight step finish before the run stops.
+    """
+
+    raise_error = True
+    run_inline = True
+
+    def __init__(self, budget: ChallengeBudget):
+        self.budget = budget
+        self.started_at = time.monotonic()
+        self.tokens = 0
+        self.tool_calls = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def usage(self) -> dict:
+        return {
+            "seconds": round(self.elapsed, 1),
+            "tokens": self.tokens,
+            "tool_calls": self.tool_calls,
+        }
+
+    def check(self) -> None:
+        budget = self.budget
+        if budget.max_seconds and self.elapsed >= budget.max_seconds:
+            raise BudgetExceeded(f"time budget of {budget.max_seconds:.0f}s exhausted")
+        if budget.max_tokens and self.tokens >= budget.max_tokens:
+            raise BudgetExceeded(f"token budget of {budget.max_tokens} exhausted")
+        if budget.max_tool_calls and self.tool_calls >= budget.max_tool_calls:
+            raise BudgetExceeded(f"tool call budget of {budget.max_tool_calls} exhausted")
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self.check()
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self.check()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.tokens += _usage_tokens(response)
+
+    def on_tool_start(self, serialized: Any, input_str: str, **kwargs: Any) -> None:
+        self.check()
+        self.tool_calls += 1
@@ -0,0 +1,84 @@
+"""Durable SQLite persistence for graph checkpoints and the memory store."""
+
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+import aiosqlite
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.store.sqlite.aio import AsyncSqliteStore
+
+from src.settings import settings
+
+# Pydantic models that nodes put into graph state and checkpoints may restore
+CHECKPOINT_TYPES = [
+    ("src.state", "FindingWithFeedbackModel"),
+    ("src.state", "TargetModel"),
+    ("src.scout.model", "PlanModel"),
+    ("src.scout.model", "PlanPhase"),
+]
+# Seconds a write waits for another worker process's lock on the database
+BUSY_TIMEOUT = 30
+
+
+@dataclass
+class Persistence:
+    checkpointer: AsyncSqliteSaver
+    store: AsyncSqliteStore
+
+
+@asynccontextmanager
+async def _connect(path: str, **kwargs: Any) -> AsyncIterator[aiosqlite.Connection]:
+    """A connection that shares the database with other worker processes."""
+    async with aiosqlite.connect(path, timeout=BUSY_TIMEOUT, **kwargs) as conn:
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT * 1000}")
+        yield conn
+
+
+@asynccontextmanager
+async def open_persistence(path: Optional[str] = None) -> AsyncIterator[Optional[Persistence]]:
+    """Open the checkpoint database, yielding ``None`` when checkpointing is disabled."""
+    path = settings.CHECKPOINT_DB if path is None else path
+    if not path:
+        yield None
+        return
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    serde = JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+    async with (
+        _connect(path) as conn,
+        _connect(path, isolation_level=None) as store_conn,
+    ):
+        checkpointer = AsyncSqliteSaver(conn, serde=serde)
+        store = AsyncSqliteStore(store_conn)
+        await checkpointer.setup()
+        await store.setup()
+        yield Persistence(checkpointer=checkpointer, store=store)
+
+
+def thread_config(challenge_code: str, **config: Any) -> dict:
+    """Run config whose checkpoint thread is keyed by the challenge code."""
+    configurable = {**config.pop("configurable", {}), "thread_id": challenge_code}
+    return {**config, "configurable": configurable}
+
+
+async def has_pending_run(graph: Any, config: dict) -> bool:
+    """Whether the thread stopped mid-run and can resume from its last checkpoint."""
+    snapshot = await graph.aget_state(config)
+    return bool(snapshot.next)
+
+
+async def clear_finished_run(persistence: Persistence, graph: Any, config: dict) -> bool:
+    """Drop the checkpoints of a thread whose run completed, so a fresh state starts clean.
+
+    Store entries are keyed by target rather than thread and survive the reset.
+    """
+    snapshot = await graph.aget_state(config)
+    if not snapshot.values or snapshot.next:
+        return False
+    await persistence.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+    return True
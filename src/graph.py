@@ -1,22 +1,40 @@
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from langgraph.store.base import BaseStore
 from src.state import State
 from src.recon.agent import Recon
 from src.scout.graph import build_graph as Scout
 from src.routing.router import Router
 
-def build_graph():
+def _unless_flag(next_node: str):
+    """Edge to ``next_node`` that ends the run once a flag has been captured."""
+
+    def route(state: State) -> str:
+        return END if state.get("flag") else next_node
+
+    return route
+
+
+def build_graph(
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    store: Optional[BaseStore] = None,
+):
     recon = Recon()
-    scout = Scout()
+    # The scout subgraph keeps its own checkpoints under the parent's thread and
+    # uses this graph's store, so every node shares plans, memories and the site map
+    scout = Scout(checkpointer=True if checkpointer is not None else None)
     router = Router()
 
     graph = (
         StateGraph(State)
-        .add_node("recon", recon.invoke)
-        .add_node("scout", scout.invoke)
-        .add_node("router", router.route)
+        .add_node("recon", recon.ainvoke)
+        .add_node("scout", scout.ainvoke)
+        .add_node("router", router.aroute)
 
         .set_entry_point("recon")
-        .add_edge("recon", "scout")
-        .add_edge("scout", "router")
+        .add_conditional_edges("recon", _unless_flag("scout"), ["scout", END])
+        .add_conditional_edges("scout", _unless_flag("router"), ["router", END])
         )
-    return graph.compile()
\ No newline at end of file
+    return graph.compile(checkpointer=checkpointer, store=store)
@@ -0,0 +1,5 @@
+"""Shared LLM client layer used by every agent."""
+
+from .client import aclose_clients, get_agent_model, get_chat_model
+
+__all__ = ["aclose_clients", "get_agent_model", "get_chat_model"]
@@ -0,0 +1,159 @@
+"""Health-scored load balancing and circuit breaking across LLM endpoints."""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from src.settings import settings
+
+LATENCY_EWMA_ALPHA = 0.3
+ERROR_EWMA_ALPHA = 0.2
+# How strongly the recent error rate inflates an endpoint's score
+ERROR_PENALTY = 4.0
+# Ceiling for the breaker cooldown after repeated failed probes
+MAX_COOLDOWN = 600.0
+
+
+@dataclass
+class EndpointHealth:
+    """Live health of one endpoint, with a closed / open / half-open breaker."""
+
+    base_url: str
+    weight: float = 1.0
+    latency_ewma: Optional[float] = None
+    error_rate: float = 0.0
+    in_flight: int = 0
+    failures: int = 0
+    cooldown: float = 0.0
+    open_until: float = 0.0
+    probing: bool = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_until > 0
+
+    def available(self, now: float) -> bool:
+        if not self.is_open:
+            return True
+        # Half-open: one probe at a time once the cooldown has passed
+        return now >= self.open_until and not self.probing
+
+    def score(self, baseline: float) -> float:
+        """Lower is better: latency, scaled by load and recent errors, over weight."""
+        latency = self.latency_ewma if self.latency_ewma is not None else baseline
+        return latency * (1 + self.in_flight) * (1 + ERROR_PENALTY * self.error_rate) / self.weight
+
+
+class EndpointBalancer:
+    """Spreads calls across endpoints by live latency, load and error rate.
+
+    Each call picks the better-scoring of two random available endpoints (an
+    endpoint without a latency sample yet gets one trial call first), so load
+    follows health without every caller piling onto the single best one. After
+    ``failure_threshold`` consecutive failures an endpoint's breaker opens for
+    ``cooldown`` seconds; then a single probe call decides whether it closes
+    again or reopens with a doubled cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.endpoints: Dict[str, EndpointHealth] = {}
+
+    def register(self, base_url: str, weight: float = 1.0) -> None:
+        if base_url not in self.endpoints:
+            self.endpoints[base_url] = EndpointHealth(base_url, weight=max(weight, 1e-6))
+
+    def choose(self, candidates: Sequence[str]) -> str:
+        """Pick the endpoint for the next call and count it as in flight."""
+        now = time.monotonic()
+        healths = [self.endpoints[url] for url in candidates]
+        available = [health for health in healths if health.available(now)]
+        if not available:
+            # Every breaker is open: probe whichever endpoint reopens first
+            available = [min(healths, key=lambda health: health.open_until)]
+
+        # One call at a time to an endpoint we have no latency sample for yet
+        fresh = [
+            health for health in available if health.latency_ewma is None and not health.in_flight
+        ]
+        if fresh:
+            chosen = fresh[0]
+        else:
+            samples = [health.latency_ewma for health in available if health.latency_ewma is not None]
+            baseline = min(samples, default=1.0)
+            pair = random.sample(available, min(2, len(available)))
+            chosen = min(pair, key=lambda health: health.score(baseline))
+
+        chosen.in_flight += 1
+        if chosen.is_open:
+            chosen.probing = True
+        return chosen.base_url
+
+    def healthy(self, candidates: Sequence[str]) -> bool:
+        """Whether any of ``candidates`` could take a call right now."""
+        now = time.monotonic()
+        return any(self.endpoints[url].available(now) for url in candidates)
+
+    def record_success(self, base_url: str, latency: float) -> None:
+        health = self.endpoints[base_url]
+        health.in_flight = max(0, health.in_flight - 1)
+        if health.latency_ewma is None:
+            health.latency_ewma = latency
+        else:
+            health.latency_ewma += LATENCY_EWMA_ALPHA * (latency - health.latency_ewma)
+        health.error_rate -= ERROR_EWMA_ALPHA * health.error_rate
+        health.failures = 0
+        if health.is_open:
+            print(f"[LLM balancer] {base_url} recovered, closing breaker")
+        health.open_until = 0.0
+        health.cooldown = 0.0
+        health.probing = False
+
+    def record_failure(self, base_url: str) -> None:
+        health = self.endpoints[base_url]
+        health.in_flight = max(0, health.in_flight - 1)
+        health.error_rate += ERROR_EWMA_ALPHA * (1 - health.error_rate)
+        health.failures += 1
+        if health.is_open and not health.probing:
+            # A call that was already in flight when the breaker opened
+            return
+        if health.probing or health.failures >= self.failure_threshold:
+            health.cooldown = min(MAX_COOLDOWN, health.cooldown * 2 or self.cooldown)
+            health.open_until = time.monotonic() + health.cooldown
+            health.probing = False
+            print(f"[LLM balancer] Opening breaker for {base_url} ({health.cooldown:.0f}s)")
+
+    def release(self, base_url: str) -> None:
+        """Forget a call that ended without telling us anything (e.g. cancelled)."""
+        health = self.endpoints[base_url]
+        health.in_flight = max(0, health.in_flight - 1)
+        health.probing = False
+
+
+_balancer: Optional[EndpointBalancer] = None
+
+
+def get_balancer() -> EndpointBalancer:
+    global _balancer
+    if _balancer is None:
+        _balancer = EndpointBalancer(
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            cooldown=settings.LLM_BREAKER_COOLDOWN,
+        )
+    return _balancer
+
+
+def balanced_endpoints() -> List[tuple[str, str, float]]:
+    """``(base_url, api_key, weight)`` of every endpoint, or ``[]`` with only API_BASE."""
+    if not settings.API_ENDPOINTS:
+        return []
+    endpoints = {settings.API_BASE: (settings.API_BASE, settings.API_KEY, 1.0)}
+    for endpoint in settings.API_ENDPOINTS:
+        endpoints[endpoint.base_url] = (
+            endpoint.base_url,
+            endpoint.api_key or settings.API_KEY,
+            endpoint.weight,
+        )
+    return list(endpoints.values())
@@ -0,0 +1,154 @@
+"""Opt-in on-disk cache of LLM responses for replays, debugging runs and retries."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from src.settings import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_used_at ON llm_cache (used_at);
+"""
+
+# Message fields that describe a past response but are never sent to the model
+UNSENT_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _normalise_prompt(prompt: str) -> str:
+    """Drop response metadata, which differs between a live and a replayed message."""
+    try:
+        messages = json.loads(prompt)
+    except json.JSONDecodeError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    for message in messages:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if isinstance(kwargs, dict):
+            for field in UNSENT_MESSAGE_FIELDS:
+                kwargs.pop(field, None)
+    return json.dumps(messages, sort_keys=True)
+
+
+class SQLiteResponseCache(BaseCache):
+    """LangChain response cache stored in SQLite with TTL and size-based eviction.
+
+    LangChain keys lookups by the serialized prompt (system prompt and messages)
+    and the model's ``llm_string`` (model name, parameters and bound tool
+    schemas); both are hashed into one key here, ignoring response metadata.
+    Entries older than ``ttl`` seconds are ignored and swept, and the least
+    recently used entries are dropped once the cache exceeds ``max_bytes``.
+    """
+
+    def __init__(self, path: str, ttl: float = 0, max_bytes: int = 0):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode())
+        digest.update(b"\0")
+        digest.update(_normalise_prompt(prompt).encode())
+        return digest.hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl) and now - created_at > self.ttl
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at, now):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        try:
+            return loads(value, allowed_objects="core")
+        except Exception:  # pylint: disable=broad-except
+            # Entries written by an incompatible langchain version are treated as misses
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = dumps(list(return_val))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self._key(prompt, llm_string), value, len(value), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        if not self.max_bytes:
+            return
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        stale: list[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY used_at"):
+            stale.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(key,) for key in stale])
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+_cache: Optional[SQLiteResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[SQLiteResponseCache]:
+    """The process-wide response cache, or ``None`` unless ``LLM_CACHE_PATH`` is set."""
+    global _cache
+    if not settings.LLM_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SQLiteResponseCache(
+                settings.LLM_CACHE_PATH,
+                ttl=settings.LLM_CACHE_TTL,
+                max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _cache
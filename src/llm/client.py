@@ -0,0 +1,148 @@
+"""Process-wide registry of chat models sharing pooled HTTP transports."""
+
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from src.llm.balancer import balanced_endpoints, get_balancer
+from src.llm.cache import get_response_cache
+from src.llm.model import ManagedChatOpenAI
+from src.settings import ModelProfile, settings
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_models: Dict[tuple, ChatOpenAI] = {}
+
+# Agents doing light classification or summarisation default to the fast tier
+FAST_AGENTS = {"router", "pathfinder", "summarizer"}
+
+
+def _transport_options() -> Dict[str, Any]:
+    return {
+        "http2": settings.LLM_HTTP2,
+        "limits": httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(settings.LLM_REQUEST_TIMEOUT, connect=10.0),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Pooled sync transport shared by every chat model in this process."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(**_transport_options())
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Pooled async transport shared by every chat model in this process."""
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None or _async_http_client.is_closed:
+            _async_http_client = httpx.AsyncClient(**_transport_options())
+        return _async_http_client
+
+
+def get_chat_model(
+    model: Optional[str] = None,
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    fallbacks: Sequence[str] = (),
+    **kwargs: Any,
+) -> ChatOpenAI:
+    """Return the shared chat model for this configuration, creating it once.
+
+    Models with identical settings are the same instance, and all of them send
+    requests through the same keep-alive connection pool. Retries are left to
+    the shared limiter, so the OpenAI client itself does not retry. When the
+    response cache is enabled, cache hits skip the limiter and the network.
+    ``fallbacks`` names models on the same endpoint(s) to try if this one fails.
+    Without an explicit ``base_url``, calls are balanced across API_BASE and
+    every endpoint in API_ENDPOINTS.
+    """
+    endpoints = balanced_endpoints() if base_url is None and api_key is None else []
+    requested_base_url, requested_api_key = base_url, api_key
+    model = model or settings.MODEL
+    base_url = base_url or settings.API_BASE
+    api_key = api_key or settings.API_KEY
+    fallbacks = tuple(name for name in fallbacks if name != model)
+    key = (model, base_url, api_key, bool(endpoints), fallbacks, tuple(sorted(kwargs.items())))
+
+    with _lock:
+        cached = _models.get(key)
+    if cached is not None:
+        return cached
+
+    transport = {
+        "max_retries": 0,
+        "disable_streaming": True,
+        "http_client": get_http_client(),
+        "http_async_client": get_async_http_client(),
+    }
+    replicas: Dict[str, ChatOpenAI] = {}
+    for endpoint_url, endpoint_key, weight in endpoints:
+        get_balancer().register(endpoint_url, weight)
+        replicas[endpoint_url] = ChatOpenAI(
+            model=model, base_url=endpoint_url, api_key=endpoint_key, **transport, **kwargs
+        )
+    chat_model = ManagedChatOpenAI(
+        model=model,
+        base_url=base_url,
+        api_key=api_key,
+        cache=get_response_cache(),
+        fallbacks=[
+            get_chat_model(name, requested_base_url, requested_api_key, **kwargs)
+            for name in fallbacks
+        ],
+        replicas=replicas,
+        **transport,
+        **kwargs,
+    )
+    with _lock:
+        return _models.setdefault(key, chat_model)
+
+
+def get_agent_model(agent: str) -> ChatOpenAI:
+    """Return the chat model configured for ``agent`` (e.g. ``"router"``).
+
+    The agent's profile comes from ``<AGENT>_LLM`` in settings. Fast-tier
+    agents use ``FAST_MODEL`` when it is set and fall back to ``MODEL``, so a
+    cheap model handles routing while the strong one stays available.
+    """
+    profile: ModelProfile = getattr(settings, f"{agent.upper()}_LLM", None) or ModelProfile()
+    tier = profile.tier or ("fast" if agent in FAST_AGENTS else "strong")
+    model = profile.model or (settings.FAST_MODEL if tier == "fast" else "") or settings.MODEL
+    fallbacks = profile.fallbacks or [settings.MODEL]
+
+    options: Dict[str, Any] = {}
+    if profile.temperature is not None:
+        options["temperature"] = profile.temperature
+    if profile.max_tokens is not None:
+        options["max_tokens"] = profile.max_tokens
+    return get_chat_model(
+        model,
+        base_url=profile.base_url or None,
+        api_key=profile.api_key or None,
+        fallbacks=fallbacks,
+        **options,
+    )
+
+
+async def aclose_clients() -> None:
+    """Close the pooled transports and forget cached models."""
+    global _http_client, _async_http_client
+    with _lock:
+        http_client, async_http_client = _http_client, _async_http_client
+        _http_client = _async_http_client = None
+        _models.clear()
+    if async_http_client is not None:
+        await async_http_client.aclose()
+    if http_client is not None:
+        http_client.close()
@@ -0,0 +1,141 @@
+"""Chat model that sends every call through the process-wide limiter."""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import openai
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_openai import ChatOpenAI
+from pydantic import Field
+
+from src.llm.balancer import get_balancer
+from src.llm.ratelimit import flag_proximity, get_limiter
+from src.memory.context import get_current_state
+from src.settings import settings
+
+# Errors that suggest an overloaded provider rather than a bad request
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+# Errors after which the next model in the fallback chain is tried
+FALLBACK_ERRORS = RETRYABLE_ERRORS + (openai.NotFoundError,)
+
+# Budgeted completion size when estimating a call's token cost up front
+ESTIMATED_COMPLETION_TOKENS = 1000
+MAX_BACKOFF = 60.0
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    return sum(len(str(message.content)) for message in messages) // 4 + ESTIMATED_COMPLETION_TOKENS
+
+
+def result_tokens(result: ChatResult) -> int:
+    total = 0
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens", 0)
+    return total
+
+
+def _retry_after(error: Exception, attempt: int) -> float:
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        if header is not None:
+            return min(MAX_BACKOFF, float(header))
+    except ValueError:
+        pass
+    return min(MAX_BACKOFF, 2.0**attempt)
+
+
+class ManagedChatOpenAI(ChatOpenAI):
+    """``ChatOpenAI`` whose async calls share one adaptive limiter.
+
+    Retries on throttling and transient errors happen here, through the
+    limiter, instead of independently inside each client. Calls made while a
+    node's state is in context are prioritised by how close that challenge
+    looks to its flag. When retries are exhausted or the model is unavailable,
+    the call moves on to each model in ``fallbacks`` in turn, with the same
+    messages and bound tools. With ``replicas`` (one client per endpoint for
+    this model), each attempt goes to the endpoint the balancer picks, and a
+    failing endpoint is skipped without throttling the others. Sync calls are
+    only used by debug scripts and go straight through.
+    """
+
+    fallbacks: List[ChatOpenAI] = Field(default_factory=list)
+    replicas: Dict[str, ChatOpenAI] = Field(default_factory=dict)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        try:
+            return await self._agenerate_limited(messages, stop, run_manager, **kwargs)
+        except FALLBACK_ERRORS as e:
+            error = e
+        for fallback in self.fallbacks:
+            print(f"[LLM] {self.model_name} failed ({type(error).__name__}), falling back to {fallback.model_name}")
+            try:
+                return await fallback._agenerate(messages, stop, run_manager, **kwargs)
+            except FALLBACK_ERRORS as e:
+                error = e
+        raise error
+
+    async def _agenerate_limited(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        limiter = get_limiter()
+        balancer = get_balancer()
+        estimate = estimate_tokens(messages)
+        priority = flag_proximity(get_current_state(optional=True))
+
+        attempt = 0
+        while True:
+            await limiter.acquire(priority, estimate)
+            endpoint = balancer.choose(list(self.replicas)) if self.replicas else None
+            started = time.monotonic()
+            try:
+                if endpoint is None:
+                    result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+                else:
+                    replica = self.replicas[endpoint]
+                    result = await ChatOpenAI._agenerate(replica, messages, stop, run_manager, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                latency = time.monotonic() - started
+                if endpoint is not None:
+                    balancer.record_failure(endpoint)
+                if endpoint is not None and balancer.healthy(list(self.replicas)):
+                    # Another endpoint can take the retry; leave the shared limits alone
+                    limiter.release(latency, adapt=False)
+                else:
+                    limiter.release(latency, throttled=True, retry_after=_retry_after(e, attempt))
+                attempt += 1
+                if attempt > settings.LLM_MAX_RETRIES:
+                    raise
+                where = f" from {endpoint}" if endpoint else ""
+                print(f"[LLM] {type(e).__name__}{where}, retry {attempt}/{settings.LLM_MAX_RETRIES}")
+                continue
+            except BaseException:
+                if endpoint is not None:
+                    balancer.release(endpoint)
+                limiter.release(time.monotonic() - started, adapt=False)
+                raise
+            latency = time.monotonic() - started
+            if endpoint is not None:
+                balancer.record_success(endpoint, latency)
+            limiter.release(latency, extra_tokens=result_tokens(result) - estimate)
+            return result
@@ -0,0 +1,209 @@
+"""Adaptive, priority-aware rate limiter shared by every LLM call in a process."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Mapping, Optional
+
+from src.settings import settings
+
+WINDOW_SECONDS = 60.0
+
+# Smoothing for the latency baseline and how far above it counts as a spike
+LATENCY_EWMA_ALPHA = 0.2
+LATENCY_SPIKE_FACTOR = 2.0
+LATENCY_WARMUP_CALLS = 5
+
+# Multiplicative decrease factors and the minimum gap between two decreases
+THROTTLE_DECREASE = 0.5
+LATENCY_DECREASE = 0.75
+DECREASE_COOLDOWN = 5.0
+
+DEFAULT_RETRY_AFTER = 2.0
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with requests- and tokens-per-minute caps.
+
+    Callers ``acquire`` a slot with a priority and an estimated token cost,
+    then ``release`` it with the observed latency, any tokens used beyond the
+    estimate and whether the provider throttled them. Concurrency grows by one
+    per window of successful calls and is cut multiplicatively on a 429 or a
+    latency spike. Waiting calls are admitted highest priority first.
+    """
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(
+            min(max(initial_concurrency, self.min_concurrency), self.max_concurrency)
+        )
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self._calls = 0
+        self._requests: deque[float] = deque()
+        self._tokens: deque[tuple[float, int]] = deque()
+        self._waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def _prune(self, now: float) -> None:
+        while self._requests and now - self._requests[0] >= WINDOW_SECONDS:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= WINDOW_SECONDS:
+            self._tokens.popleft()
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """Seconds until a call of ``tokens`` fits the windows, 0 if it fits now."""
+        wait = max(0.0, self._paused_until - now)
+        if self.rpm and len(self._requests) >= self.rpm:
+            wait = max(wait, self._requests[0] + WINDOW_SECONDS - now)
+        if self.tpm and self._tokens:
+            used = sum(count for _, count in self._tokens)
+            if used + tokens > self.tpm:
+                wait = max(wait, self._tokens[0][0] + WINDOW_SECONDS - now)
+        return wait
+
+    def _pump(self) -> None:
+        self._wakeup = None
+        now = time.monotonic()
+        self._prune(now)
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(now, tokens)
+            if wait > 0:
+                loop = asyncio.get_running_loop()
+                self._wakeup = loop.call_later(wait, self._pump)
+                return
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            self._requests.append(now)
+            self._tokens.append((now, tokens))
+            future.set_result(None)
+
+    async def acquire(self, priority: int = 0, tokens: int = 0) -> None:
+        """Wait for a slot; higher ``priority`` is admitted first."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), tokens, future))
+        if self._wakeup is None:
+            self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._pump()
+            raise
+
+    def release(
+        self,
+        latency: float,
+        extra_tokens: int = 0,
+        throttled: bool = False,
+        retry_after: Optional[float] = None,
+        adapt: bool = True,
+    ) -> None:
+        """Return a slot and, if ``adapt``, adjust concurrency to what the call observed."""
+        now = time.monotonic()
+        self.in_flight = max(0, self.in_flight - 1)
+        if extra_tokens > 0:
+            self._tokens.append((now, extra_tokens))
+
+        if not adapt:
+            pass
+        elif throttled:
+            pause = retry_after or DEFAULT_RETRY_AFTER
+            self._paused_until = max(self._paused_until, now + pause)
+            self._decrease(now, THROTTLE_DECREASE)
+        else:
+            self._calls += 1
+            spiking = (
+                self.latency_ewma is not None
+                and self._calls > LATENCY_WARMUP_CALLS
+                and latency > self.latency_ewma * LATENCY_SPIKE_FACTOR
+            )
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += LATENCY_EWMA_ALPHA * (latency - self.latency_ewma)
+            if spiking:
+                self._decrease(now, LATENCY_DECREASE)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._pump()
+
+    def _decrease(self, now: float, factor: float) -> None:
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_concurrency), self.limit * factor)
+        print(f"[LLM limiter] Concurrency {previous:.1f} -> {self.limit:.1f}")
+
+
+_limiter: Optional[AdaptiveLimiter] = None
+_share = 1.0
+
+
+def set_limiter_share(share: float) -> None:
+    """Scale this process's limits, e.g. to 1/N of the budget in each of N workers."""
+    global _share, _limiter
+    _share = max(0.0, min(1.0, share))
+    _limiter = None
+
+
+def get_limiter() -> AdaptiveLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveLimiter(
+            rpm=int(settings.LLM_MAX_RPM * _share),
+            tpm=int(settings.LLM_MAX_TPM * _share),
+            initial_concurrency=max(1, int(settings.LLM_INITIAL_CONCURRENCY * _share)),
+            min_concurrency=1,
+            max_concurrency=max(1, int(settings.LLM_MAX_CONCURRENCY * _share)),
+        )
+    return _limiter
+
+
+def _field(item: Any, key: str, default: Any = None) -> Any:
+    if isinstance(item, Mapping):
+        return item.get(key, default)
+    return getattr(item, key, default)
+
+
+def flag_proximity(state: Optional[Mapping[str, Any]]) -> int:
+    """Rough score of how close a challenge is to its flag; used as call priority."""
+    if not state:
+        return 0
+    score = 0
+    for finding in state.get("findings", []) or []:
+        kind = _field(finding, "type", "")
+        if kind == "vulnerability":
+            score += 3
+        elif kind == "curiosity":
+            score += 1
+    plan = state.get("plan")
+    phases = (_field(plan, "phases", []) or []) if plan else []
+    if phases:
+        done = sum(1 for phase in phases if _field(phase, "status") == "done")
+        score += round(3 * done / len(phases))
+    return min(score, 20)
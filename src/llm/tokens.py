@@ -0,0 +1,39 @@
+"""Token counting for prompt budgets, with a character-based fallback."""
+
+import functools
+from typing import Any, Optional
+
+# Roughly four characters per token for English text and code
+CHARS_PER_TOKEN = 4
+ENCODING = "o200k_base"
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(ENCODING)
+    except Exception:  # pylint: disable=broad-except
+        # tiktoken fetches its encodings on first use, which fails offline
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, limit: int, marker: str = " …[truncated]") -> str:
+    """Cut ``text`` to at most ``limit`` tokens, marking the cut."""
+    if limit <= 0:
+        return ""
+    if count_tokens(text) <= limit:
+        return text
+    limit = max(0, limit - count_tokens(marker))
+    encoding = _encoding()
+    if encoding is None:
+        return text[: limit * CHARS_PER_TOKEN] + marker
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:limit]) + marker
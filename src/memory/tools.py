@@ -79,7 +79,7 @@ def _dedupe_memories(
 
 
 @tool
-def store_plan(
+async def store_plan(
     plan: Dict[str, Any],
     runtime: ToolRuntime,
 ) -> Command:
@@ -94,7 +94,7 @@ def store_plan(
 
     if store is not None:
         namespace = memory_namespace(state, "plan")
-        store.put(namespace, "active", payload)
+        await store.aput(namespace, "active", payload)
 
     return Command(
         update={
@@ -110,7 +110,7 @@ def store_plan(
 
 
 @tool
-def get_plan(
+async def get_plan(
     runtime: ToolRuntime,
 ) -> str:
     """
@@ -124,7 +124,7 @@ def get_plan(
     store = runtime.store
     if store is not None:
         namespace = memory_namespace(state, "plan")
-        item = store.get(namespace, "active")
+        item = await store.aget(namespace, "active")
         if item:
             value = getattr(item, "value", item)
             if isinstance(value, dict) and "plan" in value:
@@ -136,7 +136,7 @@ def get_plan(
 
 
 @tool
-def list_memories(
+async def list_memories(
     runtime: ToolRuntime,
 ) -> str:
     """
@@ -151,7 +151,7 @@ def list_memories(
     store = runtime.store
     if store is not None:
         namespace = memory_namespace(state, "memory")
-        items = store.search(namespace)
+        items = await store.asearch(namespace)
         for payload in serialize_store_items(items):
             if not isinstance(payload, dict):
                 continue
@@ -167,7 +167,7 @@ def list_memories(
 
 
 @tool
-def store_memory(
+async def store_memory(
     runtime: ToolRuntime,
     content: Any,
     category: Literal["plan", "finding", "reflection", "note"] = "note",
@@ -192,7 +192,7 @@ def store_memory(
     store = runtime.store
     if store is not None:
         namespace = memory_namespace(state, "memory")
-        store.put(namespace, entry["key"], entry)
+        await store.aput(namespace, entry["key"], entry)
 
     state_memories = _state_value(state, "memory", []) or []
     if not isinstance(state_memories, list):
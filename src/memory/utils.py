@@ -58,6 +58,17 @@ def save_plan(plan: Dict[str, Any], *, state: Optional[Mapping[str, Any]] = None
     return payload
 
 
+async def asave_plan(plan: Dict[str, Any], *, state: Optional[Mapping[str, Any]] = None, store: Optional[BaseStore] = None) -> Dict[str, Any]:
+    store = store or get_current_store(optional=True)
+    if store is None:
+        return {}
+    state = state or get_current_state(optional=True)
+    namespace = memory_namespace(state, "plan")
+    payload = {"plan": plan, "updated_at": datetime.utcnow().isoformat()}
+    await store.aput(namespace, "active", payload)
+    return payload
+
+
 def load_plan(*, state: Optional[Mapping[str, Any]] = None, store: Optional[BaseStore] = None) -> Optional[Dict[str, Any]]:
     store = store or get_current_store(optional=True)
     if store is None:
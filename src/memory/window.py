@@ -0,0 +1,181 @@
+"""Sliding-window context management for agent transcripts."""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, Optional
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.llm import get_agent_model
+from src.llm.tokens import count_tokens, truncate_to_tokens
+from src.settings import settings
+
+# Per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD = 4
+# Caps on what the summarizer is shown per message and per call, and summaries remembered
+SUMMARY_INPUT_TOKENS = 1500
+SUMMARY_CHUNK_TOKENS = 12000
+MAX_CACHED_SUMMARIES = 64
+
+SUMMARY_PROMPT = """You maintain the running summary of an offensive-security agent's transcript.
+Merge the new transcript excerpt into the existing summary and return only the updated summary.
+
+Keep, verbatim where possible: commands and requests tried and what they returned, endpoints,
+parameters, credentials, tokens, file paths, error messages, hypotheses confirmed or ruled out,
+and anything that looks like a flag. Drop chatter and repeated output. Stay under {tokens} tokens.
+
+<existing_summary>
+{summary}
+</existing_summary>
+
+<new_transcript>
+{transcript}
+</new_transcript>"""
+
+
+def message_tokens(message: AnyMessage) -> int:
+    tokens = count_tokens(message.text) + MESSAGE_OVERHEAD
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += count_tokens(str(message.tool_calls))
+    return tokens
+
+
+def _message_key(message: AnyMessage) -> str:
+    if message.id:
+        return message.id
+    return hashlib.sha1(f"{message.type}:{message.content}".encode()).hexdigest()
+
+
+def _render(message: AnyMessage) -> str:
+    text = truncate_to_tokens(message.text, SUMMARY_INPUT_TOKENS)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        calls = "; ".join(f"{call['name']}({call['args']})" for call in message.tool_calls)
+        text = f"{text}\n[tool calls] {truncate_to_tokens(calls, SUMMARY_INPUT_TOKENS)}".strip()
+    if isinstance(message, ToolMessage):
+        return f"[{message.name or 'tool'} result] {text}"
+    return f"[{message.type}] {text}"
+
+
+def _pinned_count(messages: List[AnyMessage]) -> int:
+    """Leading task messages (system/human before the first AI turn) are always kept."""
+    for index, message in enumerate(messages):
+        if isinstance(message, (AIMessage, ToolMessage)):
+            return index
+    return len(messages)
+
+
+def _safe_cutoff(messages: List[AnyMessage], cutoff: int) -> int:
+    """Move ``cutoff`` back so the window never starts with an orphaned tool result."""
+    while 0 < cutoff < len(messages) and isinstance(messages[cutoff], ToolMessage):
+        cutoff -= 1
+    return cutoff
+
+
+class TranscriptWindow(AgentMiddleware):
+    """Keeps each model call of an agent within its token budget.
+
+    Before every model call, a transcript over ``max_tokens`` is rebuilt as
+    the pinned task messages, a summary of the older turns and the most recent
+    turns verbatim (about ``keep_tokens``), without splitting a tool call from
+    its result. The agent's own state is left untouched. Summaries are cached
+    by the range of messages they cover and extended incrementally, so each
+    older turn is summarised once.
+    """
+
+    def __init__(
+        self,
+        agent: str,
+        max_tokens: Optional[int] = None,
+        keep_tokens: Optional[int] = None,
+        summary_tokens: Optional[int] = None,
+    ):
+        super().__init__()
+        profile = getattr(settings, f"{agent.upper()}_LLM", None)
+        self.agent = agent
+        self.max_tokens = (
+            max_tokens or (profile.context_tokens if profile else None) or settings.CONTEXT_MAX_TOKENS
+        )
+        self.keep_tokens = keep_tokens or int(self.max_tokens * settings.CONTEXT_KEEP_RATIO)
+        self.summary_tokens = summary_tokens or settings.CONTEXT_SUMMARY_TOKENS
+        self._summaries: OrderedDict[tuple[str, str], str] = OrderedDict()
+
+    @property
+    def name(self) -> str:
+        return f"TranscriptWindow[{self.agent}]"
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> Any:
+        messages = await self.fit(request.messages)
+        if messages is not request.messages:
+            request = request.override(messages=messages)
+        return await handler(request)
+
+    async def fit(self, messages: List[AnyMessage]) -> List[AnyMessage]:
+        """Return ``messages`` unchanged if they fit, else pinned + summary + window."""
+        sizes = [message_tokens(message) for message in messages]
+        if sum(sizes) <= self.max_tokens:
+            return messages
+
+        pinned = _pinned_count(messages)
+        cutoff, kept = len(messages), 0
+        while cutoff > pinned and kept + sizes[cutoff - 1] <= self.keep_tokens:
+            cutoff -= 1
+            kept += sizes[cutoff]
+        # Always keep at least the latest turn, then avoid splitting a tool call
+        cutoff = _safe_cutoff(messages, min(cutoff, len(messages) - 1))
+        if cutoff <= pinned:
+            return messages
+
+        summary = await self._summarise(messages[pinned:cutoff])
+        note = HumanMessage(
+            content=f"[Summary of {cutoff - pinned} earlier messages]\n{summary}",
+            id=f"summary-{_message_key(messages[cutoff - 1])}",
+        )
+        return [*messages[:pinned], note, *messages[cutoff:]]
+
+    async def _summarise(self, older: List[AnyMessage]) -> str:
+        first = _message_key(older[0])
+        keys = [_message_key(message) for message in older]
+
+        # Extend the longest summary we already have for a prefix of this range
+        summary, start = "", 0
+        for end in range(len(older) - 1, -1, -1):
+            cached = self._summaries.get((first, keys[end]))
+            if cached is not None:
+                summary, start = cached, end + 1
+                self._summaries.move_to_end((first, keys[end]))
+                break
+
+        # Fold the remaining messages in chunk by chunk, caching after each one
+        chunk: List[str] = []
+        chunk_tokens = 0
+        for index in range(start, len(older)):
+            rendered = _render(older[index])
+            chunk.append(rendered)
+            chunk_tokens += count_tokens(rendered)
+            if chunk_tokens >= SUMMARY_CHUNK_TOKENS or index == len(older) - 1:
+                summary = await self._extend(summary, "\n\n".join(chunk))
+                self._summaries[(first, keys[index])] = summary
+                chunk, chunk_tokens = [], 0
+        while len(self._summaries) > MAX_CACHED_SUMMARIES:
+            self._summaries.popitem(last=False)
+        return summary
+
+    async def _extend(self, summary: str, transcript: str) -> str:
+        response = await get_agent_model("summarizer").ainvoke(
+            [
+                SystemMessage(content="You write dense, factual summaries."),
+                HumanMessage(
+                    content=SUMMARY_PROMPT.format(
+                        tokens=self.summary_tokens,
+                        summary=summary or "(none yet)",
+                        transcript=transcript,
+                    )
+                ),
+            ]
+        )
+        return truncate_to_tokens(response.text, self.summary_tokens)
@@ -0,0 +1,5 @@
+"""Post-processing of tool output before it reaches the conversation."""
+
+from .pipeline import process_tool_output
+
+__all__ = ["process_tool_output"]
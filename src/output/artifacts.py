@@ -0,0 +1,128 @@
+"""Spooling of large tool output to per-target artifact files."""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+from typing import Any, Mapping, Optional
+
+from src.memory.context import get_current_state
+from src.scout.config import get_scout_config
+
+ARTIFACT_ROOT = "/tmp"
+# Share of the inline limit shown from the start and from the end of spooled output
+HEAD_SHARE = 0.5
+TAIL_SHARE = 0.25
+MAX_GREP_MATCHES = 200
+
+
+def _field(item: Any, key: str) -> Any:
+    if isinstance(item, Mapping):
+        return item.get(key)
+    return getattr(item, key, None)
+
+
+def artifact_dir(state: Optional[Mapping[str, Any]] = None) -> str:
+    """``/tmp/<ip-with-dashes>-<port>/`` for the current challenge's first target."""
+    if state is None:
+        state = get_current_state(optional=True)
+    targets = (state or {}).get("target") or []
+    if targets:
+        ip, port = _field(targets[0], "ip"), _field(targets[0], "port")
+        name = f"{str(ip).replace('.', '-')}-{port}"
+    else:
+        name = "unknown-target"
+    path = os.path.join(ARTIFACT_ROOT, re.sub(r"[^\w.-]", "_", name))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _write_artifact(data: bytes, tool: str) -> str:
+    digest = hashlib.sha1(data).hexdigest()[:8]
+    path = os.path.join(artifact_dir(), f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}-{digest}.txt")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+async def save_artifact(data: bytes, tool: str) -> str:
+    """Write ``data`` to a new file in the target's artifact directory and return its path."""
+    # The worker thread gets a copy of the context, so artifact_dir() sees the current state
+    return await asyncio.to_thread(_write_artifact, data, tool)
+
+
+async def spool_output(output: str, tool: str, limit: Optional[int] = None) -> str:
+    """Return ``output`` as is, or head/tail plus an artifact handle if it is too long.
+
+    The full text is written under the target's artifact directory; the handle
+    is the file's path and can be passed to ``read_artifact`` to grep or slice it.
+    """
+    limit = limit or get_scout_config().max_output_size
+    data = output.encode(errors="replace")
+    if len(data) <= limit:
+        return output
+
+    path = await save_artifact(data, tool)
+    head = data[: int(limit * HEAD_SHARE)].decode(errors="ignore")
+    tail = data[-int(limit * TAIL_SHARE) :].decode(errors="ignore")
+    omitted = len(data) - len(head.encode()) - len(tail.encode())
+    return (
+        f"{head}\n\n"
+        f"[... {omitted} bytes omitted; full output ({len(data)} bytes, "
+        f"{output.count(chr(10)) + 1} lines) saved as artifact {path} - "
+        f"use read_artifact to grep or slice it ...]\n\n"
+        f"{tail}"
+    )
+
+
+def resolve_artifact(handle: str) -> str:
+    """Map a handle (path or bare file name) to a file in the current challenge's artifact
+    directory, or raise ``FileNotFoundError``."""
+    root = os.path.realpath(artifact_dir())
+    path = os.path.realpath(handle if os.path.isabs(handle) else os.path.join(root, handle))
+    if path.startswith(root + os.sep) and os.path.isfile(path):
+        return path
+    raise FileNotFoundError(f"No artifact {handle!r}")
+
+
+def read_artifact_text(
+    handle: str,
+    pattern: Optional[str] = None,
+    start_line: int = 1,
+    end_line: Optional[int] = None,
+    context: int = 0,
+    limit: Optional[int] = None,
+) -> str:
+    """Lines ``start_line``..``end_line`` of an artifact, or the lines matching ``pattern``."""
+    limit = limit or get_scout_config().max_output_size
+    with open(resolve_artifact(handle), encoding="utf-8", errors="replace") as f:
+        lines = f.read().splitlines()
+
+    start = max(1, start_line)
+    end = min(len(lines), end_line or len(lines))
+    if pattern:
+        regex = re.compile(pattern)
+        keep: set[int] = set()
+        matches = 0
+        for number in range(start, end + 1):
+            if regex.search(lines[number - 1]):
+                matches += 1
+                keep.update(range(max(start, number - context), min(end, number + context) + 1))
+                if matches >= MAX_GREP_MATCHES:
+                    break
+        if not keep:
+            return f"No lines match {pattern!r} in lines {start}-{end} of {len(lines)}"
+        selected = sorted(keep)
+    else:
+        selected = list(range(start, end + 1))
+
+    out, size = [], 0
+    for number in selected:
+        line = f"{number}: {lines[number - 1]}"
+        size += len(line.encode(errors="replace")) + 1
+        if size > limit:
+            out.append(f"[... output capped; narrow the range or pattern, file has {len(lines)} lines ...]")
+            break
+        out.append(line)
+    return "\n".join(out)
@@ -0,0 +1,212 @@
+"""Digest of HTTP responses and HTML pages found in tool output."""
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from src.output.flags import FLAG_PATTERN
+
+STATUS_LINE = re.compile(r"^(?:< )?(HTTP/\d(?:\.\d)? \d{3}[^\r\n]*)\r?$", re.MULTILINE)
+TAG = re.compile(r"<[^>]{0,500}>")
+HTML_MARKER = re.compile(r"<(?:!doctype html|html|head|body|form|div|script|a|input)\b", re.IGNORECASE)
+# Matches the error marker only; the surrounding line is sliced out around each match
+ERROR_PATTERN = re.compile(
+    r"(?:Traceback \(most recent call last\)|Fatal error|Warning:|Parse error|"
+    r"Exception|SQLSTATE|SQL syntax|mysql_|mysqli|ORA-\d{5}|sqlite3?\.|PG::|psql:|"
+    r"syntax error|Stack trace|Internal Server Error|undefined (?:index|variable|method)|"
+    r"NoMethodError|TemplateSyntaxError|jinja2|Werkzeug|at [\w.$]+\([\w.]+:\d+\))",
+    re.IGNORECASE,
+)
+
+# Response headers worth keeping in the digest (plus any X-* header)
+INTERESTING_HEADERS = {
+    "server", "location", "content-type", "content-length", "www-authenticate",
+    "allow", "via", "link", "refresh", "content-security-policy",
+    "access-control-allow-origin", "access-control-allow-credentials",
+}
+MAX_LINKS = 40
+MAX_ITEMS = 15
+TEXT_CHARS = 1200
+PREFIX_CHARS = 600
+# Characters of context kept before and after an error marker
+ERROR_BEFORE = 80
+ERROR_AFTER = 160
+# Only the start of a huge page is scanned for errors
+ERROR_SCAN_CHARS = 500_000
+
+
+@dataclass
+class Form:
+    action: str
+    method: str
+    fields: List[str] = field(default_factory=list)
+
+
+class _PageParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.meta: List[str] = []
+        self.forms: List[Form] = []
+        self.links: List[str] = []
+        self.scripts: List[str] = []
+        self.inline_scripts: List[str] = []
+        self.comments: List[str] = []
+        self.text: List[str] = []
+        self._in: Optional[str] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attr = {key: value or "" for key, value in attrs}
+        if tag in ("title", "script", "style"):
+            self._in = tag
+        if tag == "script" and attr.get("src"):
+            self.scripts.append(attr["src"])
+        elif tag == "meta" and attr.get("name") in ("generator", "csrf-token", "description"):
+            self.meta.append(f"{attr['name']}={attr.get('content', '')}")
+        elif tag == "form":
+            self.forms.append(Form(attr.get("action", ""), attr.get("method", "get").upper()))
+        elif tag in ("input", "textarea", "select", "button") and (attr.get("name") or attr.get("id")):
+            kind = attr.get("type", tag)
+            name = attr.get("name") or f"#{attr['id']}"
+            value = f"={attr['value']}" if attr.get("value") and kind in ("hidden", "submit") else ""
+            entry = f"{name}({kind}{value})"
+            if self.forms:
+                self.forms[-1].fields.append(entry)
+            else:
+                self.forms.append(Form("", "(no form)", [entry]))
+        for key in ("href", "src", "action", "formaction", "data-url"):
+            url = attr.get(key)
+            if url and tag != "script" and not url.startswith(("#", "data:", "javascript:void")):
+                self.links.append(url)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == self._in:
+            self._in = None
+
+    def handle_data(self, data: str) -> None:
+        if self._in == "title":
+            self.title += data.strip()
+        elif self._in == "script":
+            if data.strip():
+                self.inline_scripts.append(" ".join(data.split()))
+        elif self._in != "style" and data.strip():
+            self.text.append(" ".join(data.split()))
+
+    def handle_comment(self, data: str) -> None:
+        if data.strip():
+            self.comments.append(" ".join(data.split()))
+
+
+def _dedupe(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(items))
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _error_lines(text: str) -> List[str]:
+    """Each error marker with up to ``ERROR_BEFORE``/``ERROR_AFTER`` characters of its line around it."""
+    text = text[:ERROR_SCAN_CHARS]
+    lines = []
+    for match in ERROR_PATTERN.finditer(text):
+        start = max(match.start() - ERROR_BEFORE, text.rfind("\n", 0, match.start()) + 1)
+        end = text.find("\n", match.end())
+        end = min(match.end() + ERROR_AFTER, len(text) if end == -1 else end)
+        lines.append(" ".join(text[start:end].split()))
+    return lines
+
+
+def _split_responses(output: str) -> Tuple[str, List[Tuple[str, List[str]]], str]:
+    """Split curl-style output into (prefix, [(status line, headers)], body)."""
+    matches = list(STATUS_LINE.finditer(output))
+    if not matches:
+        return "", [], output
+    prefix = output[: matches[0].start()]
+    responses, body_start = [], matches[0].start()
+    for match in matches:
+        headers: List[str] = []
+        position = match.end() + 1
+        for line in output[position:].split("\n"):
+            position += len(line) + 1
+            line = line.rstrip("\r")
+            if line.startswith("< "):
+                line = line[2:]
+            if not line.strip():
+                break
+            headers.append(line)
+        responses.append((match.group(1).strip(), headers))
+        body_start = max(body_start, position)
+    return prefix, responses, output[body_start:]
+
+
+def looks_like_web(output: str) -> bool:
+    return bool(STATUS_LINE.search(output)) or len(HTML_MARKER.findall(output[:200_000])) >= 3
+
+
+def distill(output: str) -> Optional[str]:
+    """Structured digest of HTTP/HTML tool output, or ``None`` if it is neither."""
+    if not looks_like_web(output):
+        return None
+    prefix, responses, body = _split_responses(output)
+    lines: List[str] = []
+
+    prefix = "\n".join(
+        line for line in prefix.splitlines() if line.strip() and not line.startswith(("* ", "{ ", "} "))
+    )
+    if prefix:
+        lines.append(f"Output before response: {_clip(prefix, PREFIX_CHARS)}")
+
+    for index, (status, headers) in enumerate(responses, 1):
+        lines.append(f"Response {index}: {status}")
+        cookies = []
+        for header in headers:
+            name, _, value = header.partition(":")
+            key = name.strip().lower()
+            if key == "set-cookie":
+                cookies.append(value.strip())
+            elif key in INTERESTING_HEADERS or key.startswith("x-"):
+                lines.append(f"  {name.strip()}: {_clip(value.strip(), 300)}")
+        for cookie in cookies:
+            lines.append(f"  Cookie: {_clip(cookie, 300)}")
+
+    if HTML_MARKER.search(body):
+        parser = _PageParser()
+        try:
+            parser.feed(body)
+            parser.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+        if parser.title:
+            lines.append(f"Title: {_clip(parser.title, 200)}")
+        if parser.meta:
+            lines.append("Meta: " + "; ".join(_dedupe(parser.meta)[:MAX_ITEMS]))
+        if parser.forms:
+            lines.append("Forms:")
+            for form in parser.forms[:MAX_ITEMS]:
+                lines.append(f"  - {form.method} {form.action or '(same page)'}: {', '.join(form.fields) or 'no fields'}")
+        links = _dedupe(parser.links)
+        if links:
+            more = f" (+{len(links) - MAX_LINKS} more)" if len(links) > MAX_LINKS else ""
+            lines.append(f"Links ({len(links)}): " + ", ".join(links[:MAX_LINKS]) + more)
+        if parser.scripts or parser.inline_scripts:
+            inline = [f"inline: {_clip(script, 200)}" for script in parser.inline_scripts[:5]]
+            lines.append("Scripts: " + "; ".join(_dedupe(parser.scripts)[:MAX_ITEMS] + inline))
+        if parser.comments:
+            lines.append("Comments: " + " | ".join(_clip(c, 200) for c in _dedupe(parser.comments)[:MAX_ITEMS]))
+        text = " ".join(_dedupe(parser.text))
+    else:
+        text = " ".join(body.split())
+
+    plain = TAG.sub(" ", body)
+    errors = _dedupe(_error_lines(plain))
+    if errors:
+        lines.append("Errors:")
+        lines.extend(f"  - {_clip(error, 240)}" for error in errors[:MAX_ITEMS])
+    flags = _dedupe(FLAG_PATTERN.findall(output))
+    if flags:
+        lines.append("Flags: " + ", ".join(flags))
+    if text:
+        lines.append(f"Text: {_clip(text, TEXT_CHARS)}")
+    return "\n".join(lines)
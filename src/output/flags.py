@@ -0,0 +1,200 @@
+"""Recognising flags in text and submitting them without a router round trip."""
+
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.memory.context import get_current_state
+from src.utils.problem_api import ProblemAPIClient
+
+FLAG_PATTERN = re.compile(r"(?:flag|FLAG)\{[^{}\s]{1,200}\}")
+
+# Bodies that are examples or redactions rather than real flags
+PLACEHOLDER_BODY = re.compile(
+    r"^(?:[.\-_*?xX]+|example|placeholder|redacted|fake|test|flag|your_flag|flag_here|"
+    r"[a-z_]*(?:here|goes)[a-z_]*)$",
+    re.IGNORECASE,
+)
+# Longest possible match, kept across chunks so a flag split between reads is still found
+CARRY_CHARS = 210
+SUBMIT_RETRIES = 3
+
+
+class FlagCaptured(Exception):
+    """Raised to stop an agent as soon as the challenge API accepts a flag."""
+
+    def __init__(self, flag: str, source: str):
+        super().__init__(f"flag {flag} accepted (found in {source})")
+        self.flag = flag
+        self.source = source
+
+    def update(self) -> dict:
+        """State update for the node that was running when the flag was captured."""
+        return {
+            "flag": self.flag,
+            "messages": [
+                HumanMessage(
+                    content=f"Flag {self.flag} (found in {self.source}) was accepted by the challenge API."
+                )
+            ],
+        }
+
+
+def find_flags(text: str, exclude: str = "") -> List[str]:
+    """Flag candidates in ``text``, skipping placeholders and anything present in ``exclude``.
+
+    ``exclude`` is typically the command that produced the text, so a flag the
+    agent typed itself (an echo, a guess) is not taken as evidence.
+    """
+    candidates = []
+    for match in FLAG_PATTERN.finditer(text):
+        flag = match.group()
+        body = flag[flag.index("{") + 1 : -1]
+        if PLACEHOLDER_BODY.match(body) or (exclude and flag in exclude):
+            continue
+        if flag not in candidates:
+            candidates.append(flag)
+    return candidates
+
+
+class FlagScanner:
+    """Incremental scanner for output that arrives in chunks."""
+
+    def __init__(self, exclude: str = ""):
+        self.exclude = exclude
+        self._tail = ""
+        self._seen: Set[str] = set()
+
+    def feed(self, chunk: str) -> List[str]:
+        """New flag candidates completed by ``chunk``."""
+        text = self._tail + chunk
+        self._tail = text[-CARRY_CHARS:]
+        found = [flag for flag in find_flags(text, self.exclude) if flag not in self._seen]
+        self._seen.update(found)
+        return found
+
+
+class FlagDetector:
+    """Submits flag candidates for one challenge, each at most once.
+
+    A correct answer raises ``FlagCaptured`` so the running agent stops and
+    the node can end the graph. Incorrect candidates are remembered and not
+    resubmitted; API errors leave a candidate eligible for the next sighting.
+    """
+
+    def __init__(self, challenge_code: str):
+        self.challenge_code = challenge_code
+        self.tried: Set[str] = set()
+        self.captured: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def submit(self, candidates: Iterable[str], source: str) -> None:
+        for flag in candidates:
+            async with self._lock:
+                if self.captured:
+                    raise FlagCaptured(self.captured, source)
+                if flag in self.tried:
+                    continue
+                response = None
+                for attempt in range(SUBMIT_RETRIES):
+                    try:
+                        async with ProblemAPIClient() as client:
+                            response = await client.submit_answer(self.challenge_code, flag)
+                        break
+                    except Exception as e:  # pylint: disable=broad-except
+                        print(f"[Flag] Submitting {flag} for {self.challenge_code} failed: {e}")
+                        await asyncio.sleep(1 + attempt)
+                if response is None:
+                    continue
+                self.tried.add(flag)
+                print(f"[Flag] {self.challenge_code}: {flag} from {source} -> "
+                      f"{'correct' if response.correct else 'incorrect'}")
+                if response.correct:
+                    self.captured = flag
+                    raise FlagCaptured(flag, source)
+
+
+_detectors: Dict[str, FlagDetector] = {}
+
+
+def get_detector(state: Optional[Any] = None) -> Optional[FlagDetector]:
+    """The detector for the challenge in ``state`` (or the current node's state)."""
+    if state is None:
+        state = get_current_state(optional=True)
+    code = state.get("challenge_code") if state else None
+    if not code:
+        return None
+    if code not in _detectors:
+        _detectors[code] = FlagDetector(code)
+    return _detectors[code]
+
+
+def close_detectors(challenge_code: Optional[str] = None) -> None:
+    """Forget the detector of one challenge, or every detector when none is given."""
+    if challenge_code:
+        _detectors.pop(challenge_code, None)
+    else:
+        _detectors.clear()
+
+
+async def check_output(text: str, source: str, exclude: str = "") -> None:
+    """Submit any flags in a tool's output; raises ``FlagCaptured`` on a correct one."""
+    candidates = find_flags(text, exclude)
+    detector = get_detector()
+    if candidates and detector is not None:
+        await detector.submit(candidates, source)
+
+
+def output_watcher(source: str, exclude: str = "") -> Callable[[bytes], Awaitable[None]]:
+    """Callback for streamed command output that submits each flag as soon as it is complete."""
+    scanner = FlagScanner(exclude)
+
+    async def watch(chunk: bytes) -> None:
+        candidates = scanner.feed(chunk.decode(errors="ignore"))
+        detector = get_detector() if candidates else None
+        if detector is not None:
+            await detector.submit(candidates, source)
+
+    return watch
+
+
+class FlagWatch(AgentMiddleware):
+    """Checks every tool result and agent reply for flags and submits them directly.
+
+    A correct submission (including one the agent made itself through
+    ``submit_answer``) raises ``FlagCaptured`` out of the agent, so the graph
+    can end without another router call. Flags in an agent reply are only
+    submitted if they also appear in a tool result or message it was shown,
+    never ones it made up.
+    """
+
+    async def awrap_tool_call(self, request: Any, handler: Callable[[Any], Awaitable[Any]]) -> Any:
+        result = await handler(request)
+        if not isinstance(result, ToolMessage):
+            return result
+        call = request.tool_call
+        if call["name"] == "submit_answer" and result.text.startswith("Correct!"):
+            flag = str(call["args"].get("answer", ""))
+            detector = get_detector()
+            if detector is not None:
+                detector.captured = flag
+            raise FlagCaptured(flag, "submit_answer")
+        await check_output(result.text, call["name"], exclude=str(call.get("args", "")))
+        return result
+
+    async def aafter_model(self, state: Any, runtime: Any) -> None:
+        messages = state.get("messages", [])
+        if not messages or not isinstance(messages[-1], AIMessage):
+            return None
+        candidates = find_flags(messages[-1].text)
+        if not candidates:
+            return None
+        observed = "\n".join(m.text for m in messages[:-1] if not isinstance(m, AIMessage))
+        candidates = [flag for flag in candidates if flag in observed]
+        detector = get_detector()
+        if candidates and detector is not None:
+            await detector.submit(candidates, "agent reply")
+        return None
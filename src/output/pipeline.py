@@ -0,0 +1,28 @@
+"""Single entry point that shapes tool output before it enters the conversation."""
+
+import asyncio
+from typing import Optional
+
+from src.output.artifacts import save_artifact, spool_output
+from src.output.distill import distill
+from src.scout.config import get_scout_config
+
+
+async def process_tool_output(output: str, tool: str, limit: Optional[int] = None) -> str:
+    """Distill web responses, spool anything else that is too long, pass the rest through.
+
+    HTTP responses and HTML pages larger than ``distill_min_size`` become a
+    structured digest, with the raw output kept as an artifact.
+    """
+    config = get_scout_config()
+    data = output.encode(errors="replace")
+    if len(data) > config.distill_min_size:
+        digest = await asyncio.to_thread(distill, output)
+        if digest is not None:
+            path = await save_artifact(data, tool)
+            digest = (
+                f"[Web response digest; full output ({len(data)} bytes) saved as artifact "
+                f"{path} - use read_artifact to grep or slice it]\n{digest}"
+            )
+            return await spool_output(digest, tool, limit)
+    return await spool_output(output, tool, limit)
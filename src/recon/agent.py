@@ -1,57 +1,127 @@
+import asyncio
+from typing import List, Optional
+
 from langchain_core.messages import HumanMessage
 from langchain.agents import create_agent
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
+from langgraph.store.base import BaseStore
 
+from src.llm import get_agent_model
+from src.memory.context import memory_context
+from src.memory.window import TranscriptWindow
+from src.output.flags import FlagCaptured, FlagWatch
+from src.recon.prerecon import SurfaceMap, run_prerecon
 from src.settings import settings
 from src.state import State, ReconOutput
-from src.tool import run_bash, run_ipython
-from src.scout.state import ScoutState
-
-llm = ChatOpenAI(
-    api_key=settings.API_KEY,
-    base_url=settings.API_BASE,
-    model=settings.MODEL,
-    max_retries=5,
+from src.tool import (
+    batch_probe,
+    cancel_job,
+    crawl_site,
+    get_response,
+    http_request,
+    poll_job,
+    read_artifact,
+    run_bash,
+    run_ipython,
+    search_traffic,
+    site_map,
+    start_job,
 )
-print(llm)
+from src.scout.state import ScoutState
+from src.web import crawl, default_base_url, get_target_session
 
 
 class Recon:
     def __init__(self):
         # Create agent with tools - using model identifier string for sonnet-4.5
-        tools = [run_bash, run_ipython]
+        tools = [run_bash, run_ipython, http_request, batch_probe, crawl_site, site_map, search_traffic, get_response, start_job, poll_job, cancel_job, read_artifact]
         self.agent = create_agent(
-            llm,
+            get_agent_model("recon"),
             tools=tools,
             system_prompt=RECON_SYSTEM_PROMPT,
             response_format=ReconOutput,
+            middleware=[FlagWatch(), TranscriptWindow("recon")],
         )
 
-    def invoke(self, state: State) -> ScoutState:
-        # We don't have a target yet - the agent needs to discover it
-        # Invoke the agent directly (create_agent returns a graph)
-        messages = state.get("messages", []) + [
-            HumanMessage(
-                content="Perform reconnaissance to identify and analyze the target. "
-                "First, discover the target endpoint(s) from the challenge information, "
-                "then identify open ports, services, and potential security findings for pentesting."
-                f"<targets>{state.get('target', [])}</targets>"
-            )
-        ]
-        result = self.agent.invoke({"messages": messages})
+    async def prerecon(self, state: State) -> Optional[SurfaceMap]:
+        """Deterministic surface map of the targets, or None when disabled or it failed."""
+        if not settings.PRERECON_ENABLED or not state.get("target"):
+            return None
+        try:
+            return await run_prerecon(state.get("target", []), get_target_session(state))
+        except FlagCaptured:
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"[Prerecon] Failed: {e}")
+            return None
+
+    async def crawl(self, state: State, surface: Optional[SurfaceMap]) -> List[str]:
+        """Crawl every web service found (or the first target) into the site map; one line per service."""
+        if not settings.CRAWL_ON_RECON:
+            return []
+        if surface is not None:
+            bases = [port.http.base_url for port in surface.ports if port.http is not None]
+        else:
+            bases = [base for base in [default_base_url(state)] if base]
+        session = get_target_session(state)
+        reports = await asyncio.gather(*(crawl(session, base, state=state) for base in bases), return_exceptions=True)
+        lines = []
+        for base, report in zip(bases, reports):
+            if isinstance(report, FlagCaptured):
+                raise report
+            if isinstance(report, BaseException):
+                print(f"[Crawler] {base} failed: {report}")
+                continue
+            lines.append(f"{base}: {report.fetched} pages crawled, {len(report.new)} endpoints recorded")
+        return lines
+
+    async def ainvoke(self, state: State, store: Optional[BaseStore] = None) -> ScoutState:
+        try:
+            with memory_context(store, state):
+                surface = await self.prerecon(state)
+                seed = surface.to_recon_output() if surface is not None else None
+                crawled = await self.crawl(state, surface)
+                # We don't have a target yet - the agent needs to discover it
+                # Invoke the agent directly (create_agent returns a graph)
+                content = (
+                    "Perform reconnaissance to identify and analyze the target. "
+                    "First, discover the target endpoint(s) from the challenge information, "
+                    "then identify open ports, services, and potential security findings for pentesting."
+                    f"<targets>{state.get('target', [])}</targets>"
+                )
+                if seed is not None:
+                    content += (
+                        "\nA port scan, HTTP fingerprint and common-path check already ran; build on it "
+                        f"instead of repeating it.<prerecon>{seed.report}</prerecon>"
+                    )
+                if crawled:
+                    content += (
+                        "\nThe web services were crawled into the site map; look endpoints and parameters "
+                        f"up with site_map instead of browsing for them.<crawl>{chr(10).join(crawled)}</crawl>"
+                    )
+                messages = state.get("messages", []) + [HumanMessage(content=content)]
+                result = await self.agent.ainvoke({"messages": messages})
+        except FlagCaptured as captured:
+            return captured.update()
+        seen = {message.id for message in state.get("messages", [])}
         print(result["structured_response"])
 
         # Extract target and findings from structured response
         structured_output = result["structured_response"]
+        report, findings, target = structured_output.report, structured_output.findings, structured_output.target
+        if seed is not None:
+            report = f"{report}\n\n{seed.report}"
+            known = {finding.description for finding in findings}
+            findings = findings + [finding for finding in seed.findings if finding.description not in known]
+            target = target or seed.target
 
         return {
             # "target": state.get("target", []),
-            "messages": state.get("messages", []) + result.get("messages", []),
+            "messages": [m for m in result.get("messages", []) if m.id not in seen],
 
-            "target": structured_output.target,
-            "recon": structured_output.report,
-            "findings": structured_output.findings,
+            "target": target,
+            "recon": report,
+            "findings": findings,
 
             "objective": "",
             "plan": state.get("plan"),
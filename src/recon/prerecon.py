@@ -0,0 +1,341 @@
+"""Deterministic surface mapping that runs before the Recon agent.
+
+Every target host gets a concurrent TCP connect scan of its own port plus
+``PRERECON_PORTS``; open ports are banner-grabbed, and those speaking HTTP
+are fingerprinted (headers, title, technology hints), have robots.txt and
+sitemap.xml read, and are checked for a list of commonly exposed paths. The
+result seeds ``ReconOutput`` so the agent starts from a surface map.
+"""
+
+import asyncio
+import json
+import re
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from src.output.flags import FlagCaptured, check_output
+from src.settings import settings
+from src.state import FindingWithFeedbackModel, ReconOutput, TargetModel
+from src.web.client import HTTPResult, TargetSession
+from src.web.crawler import ATTRIBUTE, FORM, INPUT, LINK, SITEMAP_LOC, TITLE
+
+BANNER_BYTES = 512
+BANNER_WAIT = 1.0
+HTTP_PORTS = {80, 443, 3000, 5000, 8000, 8008, 8080, 8081, 8443, 8888, 9000}
+TLS_PORTS = {443, 8443}
+# (path, why it matters, finding type)
+COMMON_PATHS: Sequence[Tuple[str, str, str]] = (
+    ("/.git/HEAD", "exposed git repository", "vulnerability"),
+    ("/.env", "exposed environment file", "vulnerability"),
+    ("/.DS_Store", "exposed directory listing metadata", "curiosity"),
+    ("/backup", "backup location", "curiosity"),
+    ("/admin", "admin interface", "curiosity"),
+    ("/login", "login form", "information"),
+    ("/register", "registration form", "information"),
+    ("/api", "API root", "information"),
+    ("/graphql", "GraphQL endpoint", "curiosity"),
+    ("/swagger.json", "API description", "curiosity"),
+    ("/openapi.json", "API description", "curiosity"),
+    ("/api-docs", "API documentation", "curiosity"),
+    ("/console", "debug console", "vulnerability"),
+    ("/actuator", "Spring actuator", "vulnerability"),
+    ("/server-status", "Apache server status", "curiosity"),
+    ("/phpinfo.php", "phpinfo page", "vulnerability"),
+    ("/upload", "upload handler", "curiosity"),
+    ("/uploads/", "upload directory", "curiosity"),
+    ("/static/", "static files", "information"),
+    ("/flag", "flag path", "curiosity"),
+    ("/flag.txt", "flag file", "curiosity"),
+)
+# (where to look, pattern, technology)
+TECH_HINTS: Sequence[Tuple[str, str, str]] = (
+    ("headers", r"werkzeug", "Werkzeug/Flask (Python)"),
+    ("headers", r"gunicorn|uvicorn", "Python WSGI/ASGI server"),
+    ("headers", r"express", "Express (Node.js)"),
+    ("headers", r"php", "PHP"),
+    ("headers", r"asp\.net", "ASP.NET"),
+    ("headers", r"tomcat|jetty|jsessionid", "Java servlet container"),
+    ("headers", r"phpsessid", "PHP sessions"),
+    ("headers", r"laravel_session|xsrf-token", "Laravel"),
+    ("headers", r"csrftoken|django", "Django"),
+    ("headers", r"connect\.sid", "Express sessions"),
+    ("headers", r"set-cookie: session=ey", "Flask signed session cookie"),
+    ("body", r"wp-content|wp-includes", "WordPress"),
+    ("body", r"__NEXT_DATA__", "Next.js"),
+    ("body", r"ng-version", "Angular"),
+    ("body", r"data-reactroot|react-dom", "React"),
+    ("body", r"csrfmiddlewaretoken", "Django"),
+    ("body", r"\{\{.*?\}\}|\{%.*?%\}", "unrendered template syntax"),
+    ("body", r"graphql", "GraphQL"),
+    ("body", r"jquery", "jQuery"),
+    ("body", r"bootstrap", "Bootstrap"),
+)
+GENERATOR = re.compile(r"<meta[^>]+name=[\"']generator[\"'][^>]+content=[\"']([^\"']+)", re.I)
+MAX_LINKS = 30
+
+
+@dataclass
+class HTTPService:
+    base_url: str
+    status: int = 0
+    title: str = ""
+    server: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    cookies: List[str] = field(default_factory=list)
+    tech: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    forms: List[str] = field(default_factory=list)
+    robots: List[str] = field(default_factory=list)
+    sitemap: List[str] = field(default_factory=list)
+    # path -> (status, bytes, why it matters, finding type)
+    paths: Dict[str, Tuple[int, int, str, str]] = field(default_factory=dict)
+
+
+@dataclass
+class PortResult:
+    ip: str
+    port: int
+    banner: str = ""
+    http: Optional[HTTPService] = None
+
+    @property
+    def service(self) -> str:
+        if self.http is not None:
+            title = f" '{self.http.title}'" if self.http.title else ""
+            return f"{self.http.base_url.split(':')[0]} {self.http.server or ''}{title}".strip()
+        return self.banner.splitlines()[0][:80] if self.banner else "open"
+
+
+@dataclass
+class SurfaceMap:
+    ports: List[PortResult] = field(default_factory=list)
+    closed: List[Tuple[str, int]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def render(self) -> str:
+        lines = [f"Pre-recon surface map ({self.elapsed:.1f}s):"]
+        if not self.ports:
+            lines.append("- No open ports answered; the targets may be down or filtered.")
+        for result in self.ports:
+            lines.append(f"- {result.ip}:{result.port} open: {result.service}")
+            if result.banner and result.http is None:
+                lines.append(f"  banner: {result.banner[:200]!r}")
+            http = result.http
+            if http is None:
+                continue
+            lines.append(f"  GET / -> {http.status}")
+            for name, value in http.headers.items():
+                lines.append(f"  {name}: {value}")
+            if http.cookies:
+                lines.append(f"  cookies: {', '.join(http.cookies)}")
+            if http.tech:
+                lines.append(f"  tech hints: {', '.join(http.tech)}")
+            if http.forms:
+                lines.extend(f"  form: {form}" for form in http.forms)
+            if http.links:
+                lines.append(f"  links: {' '.join(http.links)}")
+            if http.robots:
+                lines.append(f"  robots.txt: {'; '.join(http.robots)}")
+            if http.sitemap:
+                lines.append(f"  sitemap.xml: {' '.join(http.sitemap[:MAX_LINKS])}")
+            for path, (status, size, why, _) in http.paths.items():
+                lines.append(f"  {path} -> {status}, {size} bytes ({why})")
+        if self.closed:
+            lines.append(f"- Closed or filtered: {', '.join(f'{ip}:{port}' for ip, port in self.closed)}")
+        return "\n".join(lines)
+
+    def findings(self) -> List[FindingWithFeedbackModel]:
+        findings = []
+
+        def add(kind: str, description: str, confidence: float, **metadata: Any) -> None:
+            findings.append(
+                FindingWithFeedbackModel(
+                    type=kind,
+                    description=description,
+                    confidence=confidence,
+                    metadata_json=json.dumps(metadata),
+                    feedback="",
+                )
+            )
+
+        for result in self.ports:
+            where = f"{result.ip}:{result.port}"
+            http = result.http
+            if http is None:
+                add("information", f"{where} runs {result.service}", 0.9, banner=result.banner[:200])
+                continue
+            if http.tech:
+                add("information", f"{where} technology: {', '.join(http.tech)}", 0.6, server=http.server)
+            for form in http.forms:
+                add("curiosity", f"{where} form {form}", 0.8)
+            if http.robots:
+                add("curiosity", f"{where} robots.txt lists {'; '.join(http.robots)}", 0.8)
+            for path, (status, size, why, kind) in http.paths.items():
+                confidence = 0.7 if status == 200 else 0.4
+                add(kind, f"{where}{path} answers {status} ({why})", confidence, status=status, bytes=size)
+        return findings
+
+    def targets(self) -> List[TargetModel]:
+        return [TargetModel(ip=result.ip, port=result.port, annotation=result.service) for result in self.ports]
+
+    def to_recon_output(self) -> ReconOutput:
+        return ReconOutput(report=self.render(), findings=self.findings(), target=self.targets())
+
+
+def _address(target: Any) -> Tuple[str, Optional[int]]:
+    if isinstance(target, Mapping):
+        return str(target.get("ip", "")), target.get("port")
+    return str(getattr(target, "ip", "")), getattr(target, "port", None)
+
+
+async def _connect(ip: str, port: int) -> Optional[str]:
+    """The banner of an open port (``""`` if it sends none first), or ``None`` if it is closed."""
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(ip, port), settings.PRERECON_CONNECT_TIMEOUT
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        banner = await asyncio.wait_for(reader.read(BANNER_BYTES), BANNER_WAIT)
+    except (OSError, asyncio.TimeoutError):
+        banner = b""
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return banner.decode(errors="replace").strip()
+
+
+async def _get(session: TargetSession, url: str) -> Optional[HTTPResult]:
+    try:
+        async with session.probe_slots:
+            result = await session.request("GET", url, timeout=settings.PRERECON_HTTP_TIMEOUT, source="prerecon")
+    except Exception:  # pylint: disable=broad-except
+        return None
+    await check_output(result.content.decode(errors="replace"), "prerecon")
+    return result
+
+
+def _fingerprint(http: HTTPService, result: HTTPResult) -> None:
+    response = result.response
+    text = result.content.decode(errors="replace")
+    http.status = response.status_code
+    http.server = response.headers.get("server", "")
+    for name in ("server", "x-powered-by", "location", "www-authenticate", "content-type", "x-generator"):
+        if name in response.headers:
+            http.headers[name.title()] = response.headers[name]
+    http.cookies = sorted({cookie.split("=", 1)[0].strip() for cookie in response.headers.get_list("set-cookie")})
+    if match := TITLE.search(text):
+        http.title = " ".join(match.group(1).split())[:120]
+    raw_headers = "\n".join(f"{name}: {value}" for name, value in response.headers.multi_items()).lower()
+    tech = [name for where, pattern, name in TECH_HINTS if re.search(pattern, raw_headers if where == "headers" else text, re.I)]
+    if match := GENERATOR.search(text):
+        tech.insert(0, match.group(1))
+    http.tech = list(dict.fromkeys(tech))
+
+    host = urlsplit(http.base_url).netloc
+    links = []
+    for link in LINK.findall(text):
+        absolute = urlsplit(urljoin(http.base_url + "/", link))
+        if absolute.netloc == host and absolute.path not in links:
+            links.append(absolute.path + (f"?{absolute.query}" if absolute.query else ""))
+    http.links = links[:MAX_LINKS]
+    for attributes, inner in FORM.findall(text):
+        attrs = {name.lower(): value for name, value in ATTRIBUTE.findall(attributes)}
+        inputs = ", ".join(dict.fromkeys(INPUT.findall(inner)))
+        http.forms.append(f"{attrs.get('method', 'get').upper()} {attrs.get('action') or '/'} [{inputs}]")
+
+
+async def _map_http(ip: str, port: int, session: TargetSession) -> Optional[HTTPService]:
+    schemes = ["https", "http"] if port in TLS_PORTS else ["http", "https"]
+    for scheme in schemes:
+        base_url = f"{scheme}://{ip}:{port}"
+        root = await _get(session, base_url + "/")
+        if root is not None:
+            break
+    else:
+        return None
+
+    http = HTTPService(base_url)
+    _fingerprint(http, root)
+    # Soft-404 baseline: a status and size that mean "not here" on this server
+    missing, robots, sitemap, *paths = await asyncio.gather(
+        _get(session, f"{base_url}/{secrets.token_hex(6)}"),
+        _get(session, f"{base_url}/robots.txt"),
+        _get(session, f"{base_url}/sitemap.xml"),
+        *(_get(session, base_url + path) for path, _, _ in COMMON_PATHS),
+    )
+    baseline = (missing.response.status_code, len(missing.content)) if missing is not None else (404, -1)
+
+    def found(result: Optional[HTTPResult]) -> bool:
+        if result is None or result.response.status_code in (404, 400, 405, 410, 501):
+            return False
+        return (result.response.status_code, len(result.content)) != baseline
+
+    if found(robots):
+        http.robots = [
+            line.strip() for line in robots.content.decode(errors="replace").splitlines()
+            if line.split(":", 1)[0].strip().lower() in ("disallow", "allow", "sitemap") and line.split(":", 1)[-1].strip()
+        ][:MAX_LINKS]
+    if found(sitemap):
+        http.sitemap = SITEMAP_LOC.findall(sitemap.content.decode(errors="replace"))
+    for (path, why, kind), result in zip(COMMON_PATHS, paths):
+        if found(result):
+            http.paths[path] = (result.response.status_code, len(result.content), why, kind)
+    return http
+
+
+async def _map_port(ip: str, port: int, session: TargetSession) -> Optional[PortResult]:
+    banner = await _connect(ip, port)
+    if banner is None:
+        return None
+    result = PortResult(ip, port, banner)
+    # Services that greet first (SSH, FTP, SMTP, databases) are not HTTP
+    if not banner or port in HTTP_PORTS or banner.startswith("HTTP/"):
+        result.http = await _map_http(ip, port, session)
+    return result
+
+
+async def run_prerecon(targets: Sequence[Any], session: TargetSession) -> SurfaceMap:
+    """Map every target host within ``PRERECON_TIME_BUDGET`` seconds (what finished by then is kept)."""
+    started = time.monotonic()
+    declared: List[Tuple[str, int]] = []
+    addresses: List[Tuple[str, int]] = []
+    for target in targets:
+        ip, port = _address(target)
+        if not ip:
+            continue
+        if port:
+            declared.append((ip, int(port)))
+        for candidate in ([port] if port else []) + list(settings.PRERECON_PORTS):
+            if (ip, int(candidate)) not in addresses:
+                addresses.append((ip, int(candidate)))
+
+    tasks = [asyncio.create_task(_map_port(ip, port, session)) for ip, port in addresses]
+    surface = SurfaceMap()
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=settings.PRERECON_TIME_BUDGET)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for (ip, port), task in zip(addresses, tasks):
+            if task not in done:
+                continue
+            error = task.exception()
+            if isinstance(error, FlagCaptured):
+                raise error
+            if error is not None:
+                print(f"[Prerecon] {ip}:{port} failed: {type(error).__name__}: {error}")
+            elif task.result() is not None:
+                surface.ports.append(task.result())
+            elif (ip, port) in declared:
+                surface.closed.append((ip, port))
+    surface.elapsed = time.monotonic() - started
+    print(f"[Prerecon] {len(surface.ports)} open of {len(addresses)} ports in {surface.elapsed:.1f}s")
+    return surface
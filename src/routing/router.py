@@ -6,6 +6,9 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import END
 from langgraph.types import Command
 
+from src.memory.context import memory_context
+from src.output.flags import FlagCaptured, FlagWatch
+from src.routing.view import build_router_view
 from src.scout.state import ScoutState
 from src.scout.agents.base import BaseAgent
 from src.state import RedirectionModel, RedirectionWithSrc
@@ -27,6 +30,8 @@ Decide which agent should be pass to next
 """
 
 class Router(BaseAgent):
+    profile = "router"
+
     def __init__(self):
         super().__init__()
         self.agent = create_agent(
@@ -34,14 +39,20 @@ class Router(BaseAgent):
             tools=[submit_answer],
             system_prompt=SYSTEM,
             response_format=RedirectionModel,
+            middleware=[FlagWatch(), self.window],
         )
 
-    def route(self, state: ScoutState) -> Command[Literal["recon", "scout", END]]:
-        result = self.agent.invoke(
-            {
-                "messages": [HumanMessage(content=f"current state: {state}")]
-            }
-        )
+    async def aroute(self, state: ScoutState) -> Command[Literal["recon", "scout", END]]:
+        try:
+            with memory_context(None, state):
+                result = await self.agent.ainvoke(
+                    {
+                        "messages": [HumanMessage(content=f"current state:\n{build_router_view(state)}")]
+                    }
+                )
+        except FlagCaptured as captured:
+            # The router submitted the flag itself and it was accepted
+            return Command(goto=END, update=captured.update())
         result = result.get("structured_response")
         
         if result.dst == "end":
@@ -76,7 +87,7 @@ class Router(BaseAgent):
             return Command(
                 goto="recon",
                 update={
-                    "messages": state.get("messages", []) + [HumanMessage(content=f"Router insight: {result.insight}")],
+                    "messages": [HumanMessage(content=f"Router insight: {result.insight}")],
                     "redirection": redirection_list
                 }
             )
@@ -94,7 +105,7 @@ class Router(BaseAgent):
             return Command(
                 goto="scout",
                 update={
-                    "messages": state.get("messages", []) + [HumanMessage(content=f"Router insight: {result.insight}")],
+                    "messages": [HumanMessage(content=f"Router insight: {result.insight}")],
                     "redirection": redirection_list
                 }
             )
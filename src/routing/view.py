@@ -0,0 +1,146 @@
+"""Compact, token-budgeted view of the graph state for the router."""
+
+from typing import Any, Iterable, List, Optional
+
+from src.llm.tokens import count_tokens, truncate_to_tokens
+from src.output.flags import FLAG_PATTERN
+from src.settings import settings
+
+# How far back to look in the transcript, and per-item caps (tokens)
+RECENT_MESSAGES = 60
+FLAG_CONTEXT_CHARS = 160
+MAX_FINDINGS = 8
+MAX_REPORTS = 3
+MAX_NOTES = 4
+ITEM_TOKENS = 150
+REPORT_TOKENS = 400
+RECON_TOKENS = 500
+
+
+def _get(item: Any, key: str, default: Any = None) -> Any:
+    if isinstance(item, dict):
+        return item.get(key, default)
+    return getattr(item, key, default)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return str(content)
+
+
+class _Budget:
+    """Hands out a fixed token allowance across the sections of the view."""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+
+    def take(self, text: str, cap: Optional[int] = None) -> Optional[str]:
+        limit = self.remaining if cap is None else min(cap, self.remaining)
+        # Anything shorter than this is not worth including
+        if limit < 16:
+            return None
+        text = truncate_to_tokens(text, limit)
+        self.remaining -= count_tokens(text) + 1
+        return text
+
+
+def flag_candidates(messages: Iterable[Any]) -> List[str]:
+    """Flag-looking strings in recent messages, each with the text around it."""
+    seen: dict[str, str] = {}
+    for message in messages:
+        text = _text(_get(message, "content", ""))
+        source = _get(message, "name") or _get(message, "type", "message")
+        for match in FLAG_PATTERN.finditer(text):
+            if match.group() in seen:
+                continue
+            start = max(0, match.start() - FLAG_CONTEXT_CHARS)
+            context = text[start : match.end() + FLAG_CONTEXT_CHARS].replace("\n", " ")
+            seen[match.group()] = f"- {match.group()} (from {source}): …{context}…"
+    return list(seen.values())
+
+
+def _agent_reports(messages: List[Any]) -> List[str]:
+    """Final answers of agents: AI messages with text and no pending tool calls."""
+    reports = []
+    for message in reversed(messages):
+        if _get(message, "type") != "ai" or _get(message, "tool_calls"):
+            continue
+        text = _text(_get(message, "content", "")).strip()
+        if text:
+            reports.append(text)
+        if len(reports) >= MAX_REPORTS:
+            break
+    return reports
+
+
+def _plan_lines(state: Any) -> List[str]:
+    lines = []
+    objective = state.get("objective")
+    if objective:
+        lines.append(f"Objective: {objective}")
+    plan = state.get("plan")
+    for phase in (_get(plan, "phases", []) or []) if plan else []:
+        lines.append(
+            f"- [{str(_get(phase, 'status', 'pending')).upper()}] "
+            f"{_get(phase, 'title', '')} :: {_get(phase, 'criteria', '')}"
+        )
+    return lines
+
+
+def build_router_view(state: Any, max_tokens: Optional[int] = None) -> str:
+    """Render what the router needs to pick the next node within ``max_tokens``.
+
+    Sections are filled in priority order (flag candidates, targets, plan,
+    latest findings, earlier router insights, recent agent reports, recon
+    report) and each item is capped, so the view stays roughly the same size
+    however long the challenge has been running.
+    """
+    budget = _Budget(max_tokens or settings.ROUTER_CONTEXT_TOKENS)
+    messages = list(state.get("messages", []) or [])[-RECENT_MESSAGES:]
+    sections: List[str] = []
+
+    def section(title: str, items: Iterable[str], cap: int = ITEM_TOKENS) -> None:
+        header = budget.take(title)
+        if header is None:
+            return
+        lines = []
+        for item in items:
+            line = budget.take(item, cap)
+            if line is None:
+                break
+            lines.append(line)
+        sections.append("\n".join([header, *(lines or ["- none"])]))
+
+    section("FLAG CANDIDATES IN RECENT OUTPUT:", flag_candidates(messages))
+    section(
+        "TARGETS:",
+        [
+            f"- {_get(target, 'ip', '?')}:{_get(target, 'port', '?')} {_get(target, 'annotation', '') or ''}".rstrip()
+            for target in state.get("target", []) or []
+        ],
+    )
+    section("PLAN:", _plan_lines(state))
+    findings = list(state.get("findings", []) or [])[-MAX_FINDINGS:]
+    section(
+        "LATEST FINDINGS (newest first):",
+        [
+            f"- [{_get(finding, 'type', '?')}] {_get(finding, 'description', '')} "
+            f"(confidence {_get(finding, 'confidence', '?')})"
+            for finding in reversed(findings)
+        ],
+    )
+    notes = list(state.get("redirection", []) or [])[-MAX_NOTES:]
+    section(
+        "EARLIER ROUTER INSIGHTS:",
+        [f"- -> {_get(note, 'dst', '?')}: {_get(note, 'insight', '')}" for note in notes],
+    )
+    section("RECENT AGENT REPORTS (newest first):", _agent_reports(messages), REPORT_TOKENS)
+    recon = state.get("recon")
+    if recon:
+        section("RECON REPORT:", [recon], RECON_TOKENS)
+    return "\n\n".join(sections)
@@ -0,0 +1,115 @@
+"""Run a single challenge through the top-level graph."""
+
+import asyncio
+import traceback
+from typing import Any, Callable, Optional
+
+from langchain_core.messages import SystemMessage
+from langgraph.store.memory import InMemoryStore
+
+from src.budget import BudgetExceeded, BudgetTracker, ChallengeBudget, Preempted
+from src.checkpoint import Persistence, clear_finished_run, has_pending_run, thread_config
+from src.graph import build_graph
+from src.output.flags import close_detectors
+from src.runtime import close_jobs, close_kernels, close_shells
+from src.web import close_web_clients
+from src.state import State, Target
+from src.utils.problem_api import Challenge
+
+# Extra time given past the time budget before a hung step is cancelled outright
+HARD_TIMEOUT_GRACE = 120
+
+
+async def run_single_challenge(
+    challenge: Challenge,
+    graph_index: int,
+    resume_state: Optional[State] = None,
+    persistence: Optional[Persistence] = None,
+    on_event: Optional[Callable[[dict[str, Any]], None]] = None,
+):
+    """Run a single challenge in its own graph instance.
+
+    With ``persistence`` the run is checkpointed under the challenge code, so a
+    retry, later pass or process restart resumes at the last completed node.
+    ``on_event`` is called with a small dict each time a node finishes.
+    Returns the final state, a ``Preempted`` carrying the latest state when the
+    challenge's budget runs out, or ``None`` on error.
+    """
+    print(f"[Graph {graph_index}] Starting challenge: {challenge.challenge_code}")
+
+    # Share the durable store when checkpointing, otherwise isolate each graph
+    store = persistence.store if persistence else InMemoryStore()
+    graph = build_graph(checkpointer=persistence.checkpointer if persistence else None, store=store)
+
+    budget = ChallengeBudget.from_settings()
+    tracker = BudgetTracker(budget)
+    config = {"recursion_limit": 100, "callbacks": [tracker]}
+    if persistence is not None:
+        config = thread_config(challenge.challenge_code, **config)
+
+    pending = persistence is not None and await has_pending_run(graph, config)
+    if persistence is not None and not pending and await clear_finished_run(persistence, graph, config):
+        print(f"[Graph {graph_index}] Previous run of {challenge.challenge_code} finished, starting a fresh thread")
+
+    if pending:
+        print(f"[Graph {graph_index}] Resuming {challenge.challenge_code} from checkpoint")
+        initial_state = None
+    elif resume_state is not None:
+        print(f"[Graph {graph_index}] Resuming {challenge.challenge_code} from saved progress")
+        initial_state = resume_state
+    else:
+        # Prepare initial state with challenge information
+        initial_state = State(
+            messages=[
+                SystemMessage(
+                    content=f"Your challenge code is `{challenge.challenge_code}`. Use it for submitting answer or getting hint."
+                )
+            ],
+            challenge_code=challenge.challenge_code,
+            target=[
+                Target(ip=challenge.target_info.ip, port=port)
+                for port in challenge.target_info.port
+            ],
+            recon="",
+            findings=[],
+            flag="",
+            redirection=[],
+        )
+
+    hard_limit = budget.max_seconds + HARD_TIMEOUT_GRACE if budget.max_seconds else None
+    latest_state = initial_state or {}
+    try:
+        # Run the graph, keeping the latest state so a preempted run can resume
+        async with asyncio.timeout(hard_limit):
+            async for mode, chunk in graph.astream(
+                initial_state,
+                config=config,
+                stream_mode=["updates", "values"],
+            ):
+                if mode == "values":
+                    latest_state = chunk
+                elif on_event is not None:
+                    for node in chunk:
+                        on_event({"challenge": challenge.challenge_code, "node": node})
+        result = latest_state
+        print(f"[Graph {graph_index}] Completed challenge: {challenge.challenge_code}")
+        if result.get("flag"):
+            print(f"[Graph {graph_index}] Found flag: {result['flag']}")
+        return result
+    except (BudgetExceeded, TimeoutError) as e:
+        reason = e.reason if isinstance(e, BudgetExceeded) else "hard time limit reached"
+        print(
+            f"[Graph {graph_index}] Preempted challenge {challenge.challenge_code}: "
+            f"{reason} (usage: {tracker.usage()})"
+        )
+        return Preempted(reason=reason, state=latest_state, usage=tracker.usage())
+    except Exception as e:
+        print(f"[Graph {graph_index}] Error in challenge {challenge.challenge_code}: {str(e)}")
+        print(f"[Graph {graph_index}] Traceback:\n{traceback.format_exc()}")
+        return None
+    finally:
+        await close_shells(challenge.challenge_code)
+        await close_kernels(challenge.challenge_code)
+        await close_jobs(challenge.challenge_code)
+        await close_web_clients(challenge.challenge_code)
+        close_detectors(challenge.challenge_code)
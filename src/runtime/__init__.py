@@ -0,0 +1,21 @@
+"""Long-lived execution environments behind the agents' tools."""
+
+from .jobs import Job, close_jobs, get_job_table, start_background_job
+from .kernel import KernelResult, close_kernels, run_python, warm_kernels
+from .shell import ShellResult, close_shells, get_shell_pool, process_slot, run_shell
+
+__all__ = [
+    "Job",
+    "KernelResult",
+    "ShellResult",
+    "close_jobs",
+    "close_kernels",
+    "close_shells",
+    "get_job_table",
+    "get_shell_pool",
+    "process_slot",
+    "run_python",
+    "run_shell",
+    "start_background_job",
+    "warm_kernels",
+]
@@ -0,0 +1,102 @@
+"""Sentinel framing of output from long-lived interpreter processes."""
+
+import asyncio
+import secrets
+from asyncio import StreamReader
+from typing import Awaitable, Callable, Optional
+
+# Called with each piece of a command's output as it arrives
+OutputCallback = Callable[[bytes], Awaitable[None]]
+
+READ_CHUNK = 65536
+
+
+class SessionDied(RuntimeError):
+    """The process exited while a command was running (e.g. the command called ``exit``)."""
+
+
+def new_marker() -> bytes:
+    """A sentinel no command output will contain by accident."""
+    return f"__xboo_done_{secrets.token_hex(8)}__".encode()
+
+
+class OutputCapture:
+    """Keeps the head and tail of a command's output within ``limit`` bytes."""
+
+    def __init__(self, limit: int):
+        self.half = max(1, limit // 2)
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.omitted = 0
+
+    def add(self, data: bytes) -> None:
+        room = self.half - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        self.tail += data
+        if len(self.tail) > self.half:
+            excess = len(self.tail) - self.half
+            del self.tail[:excess]
+            self.omitted += excess
+
+    def text(self) -> str:
+        if not self.omitted:
+            return (self.head + self.tail).decode(errors="replace")
+        return (
+            self.head.decode(errors="ignore")
+            + f"\n[... {self.omitted} bytes of output dropped ...]\n"
+            + self.tail.decode(errors="ignore")
+        )
+
+
+async def read_framed(
+    stdout: StreamReader,
+    marker: bytes,
+    capture: OutputCapture,
+    on_output: Optional[OutputCallback] = None,
+) -> str:
+    """Feed output into ``capture`` up to a ``\\n<marker>`` line and return the rest of that line.
+
+    ``on_output`` is called with output as soon as it is read, including any
+    the capture later drops. If cancelled (e.g. by a timeout) everything read
+    so far is in ``capture``, so a later call can carry on reading the same
+    command's output.
+    """
+    window = b""  # read but not yet captured
+    streamed = 0  # bytes of ``window`` already passed to ``on_output``
+    hold = len(marker) + 1
+    try:
+        while True:
+            chunk = await stdout.read(READ_CHUNK)
+            window += chunk
+            index = window.find(b"\n" + marker)
+            if index >= 0:
+                end = index
+            elif chunk:
+                # The last bytes may be the start of a marker split across reads
+                end = max(0, len(window) - hold)
+            else:
+                end = len(window)
+            if on_output is not None and end > streamed:
+                data, streamed = window[streamed:end], end
+                await on_output(data)
+            if not chunk:
+                raise SessionDied()
+            if index >= 0:
+                capture.add(window[:index])
+                rest, window = window[index + len(marker) + 1 :], b""
+                while b"\n" not in rest:
+                    more = await stdout.read(READ_CHUNK)
+                    if not more:
+                        raise SessionDied()
+                    rest += more
+                return rest.split(b"\n", 1)[0].decode(errors="replace").strip()
+            # Hold back enough bytes to recognise a marker split across reads
+            if len(window) > hold:
+                capture.add(window[:-hold])
+                streamed = max(0, streamed - (len(window) - hold))
+                window = window[-hold:]
+    except BaseException:
+        capture.add(window)
+        raise
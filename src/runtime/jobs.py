@@ -0,0 +1,191 @@
+"""Detached background jobs for commands that outlive a single tool call."""
+
+import asyncio
+import itertools
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+from src.runtime.shell import get_shell_pool, workspace
+from src.settings import settings
+
+READ_CHUNK = 1 << 20
+
+
+@dataclass
+class Job:
+    id: str
+    command: str
+    path: str
+    max_runtime: float
+    process: Optional[asyncio.subprocess.Process] = None
+    started: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    exit_code: Optional[int] = None
+    # Why the job was stopped, if it did not exit on its own
+    stopped: str = ""
+    # Offset in the output file up to which output has been reported
+    offset: int = 0
+    # Callback fed everything read from the output, kept across polls
+    on_output: Optional[Callable[[bytes], Awaitable[None]]] = None
+    _reaper: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.finished is None
+
+    @property
+    def runtime(self) -> float:
+        return (self.finished or time.time()) - self.started
+
+    def status(self) -> str:
+        if self.running:
+            return f"running for {self.runtime:.0f}s"
+        if self.stopped:
+            return f"{self.stopped} after {self.runtime:.0f}s"
+        if self.exit_code is not None and self.exit_code < 0:
+            return f"killed by {signal.Signals(-self.exit_code).name} after {self.runtime:.0f}s"
+        return f"exited with status {self.exit_code} after {self.runtime:.0f}s"
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read_new(self) -> Iterator[bytes]:
+        """Output written since the last call, in chunks."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                while chunk := f.read(READ_CHUNK):
+                    self.offset += len(chunk)
+                    yield chunk
+        except OSError:
+            return
+
+    def kill(self, reason: str) -> None:
+        if self.running and self.process is not None:
+            self.stopped = reason
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+
+def _limited(command: str) -> str:
+    """``command`` run under the job limits: memory, output file size and a lower priority."""
+    limits = ["renice -n 10 $$ >/dev/null 2>&1"]
+    if settings.JOB_MAX_MEMORY_MB:
+        limits.append(f"ulimit -v {settings.JOB_MAX_MEMORY_MB * 1024}")
+    if settings.JOB_MAX_OUTPUT_MB:
+        limits.append(f"ulimit -f {settings.JOB_MAX_OUTPUT_MB * 1024}")
+    return "; ".join(limits) + "\n" + command
+
+
+class JobTable:
+    """Background jobs of one challenge.
+
+    Each job runs ``bash -c`` in its own process group, detached from the
+    agent's shells, with stdin from /dev/null and stdout/stderr appended to
+    ``job-<n>-<time>.log`` in the artifact directory. It starts in the
+    directory of the challenge's main shell and is killed after its maximum
+    runtime, on cancel, or when the challenge run ends.
+    """
+
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self.jobs: Dict[str, Job] = {}
+        self._ids = itertools.count(1)
+
+    def running(self) -> List[Job]:
+        return [job for job in self.jobs.values() if job.running]
+
+    async def start(
+        self,
+        command: str,
+        max_runtime: float,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> Job:
+        if len(self.running()) >= settings.JOB_MAX_PER_CHALLENGE:
+            raise RuntimeError(
+                f"{settings.JOB_MAX_PER_CHALLENGE} jobs are already running; "
+                f"poll or cancel one first"
+            )
+        job_id = f"job-{next(self._ids)}"
+        path = os.path.join(self.cwd, f"{job_id}-{time.strftime('%Y%m%d-%H%M%S')}.log")
+        job = Job(job_id, command, path, max_runtime)
+        with open(path, "ab") as output:
+            job.process = await asyncio.create_subprocess_exec(
+                "bash", "-c", _limited(command),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=output,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=cwd if cwd and os.path.isdir(cwd) else self.cwd,
+                env={**os.environ, **(env or {})},
+                start_new_session=True,
+            )
+        job._reaper = asyncio.create_task(self._reap(job))
+        self.jobs[job_id] = job
+        return job
+
+    async def _reap(self, job: Job) -> None:
+        try:
+            await asyncio.wait_for(job.process.wait(), job.max_runtime)
+        except asyncio.TimeoutError:
+            job.kill(f"stopped at its {job.max_runtime:.0f}s limit")
+        finally:
+            # Also takes down anything the job left running in its process group
+            try:
+                os.killpg(job.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            job.exit_code = await job.process.wait()
+            job.finished = time.time()
+
+    async def cancel(self, job_id: str) -> Job:
+        job = self.jobs[job_id]
+        job.kill("cancelled")
+        if job._reaper is not None:
+            await asyncio.gather(job._reaper, return_exceptions=True)
+        return job
+
+    async def close(self) -> None:
+        for job in self.running():
+            await self.cancel(job.id)
+
+
+_tables: Dict[str, JobTable] = {}
+
+
+def get_job_table(state: Optional[dict] = None) -> JobTable:
+    """The job table of the current challenge."""
+    key, cwd = workspace(state)
+    if key not in _tables:
+        _tables[key] = JobTable(cwd)
+    return _tables[key]
+
+
+async def start_background_job(
+    command: str,
+    max_runtime: Optional[float] = None,
+    state: Optional[dict] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Job:
+    """Start ``command`` in the background, in the directory and environment of the challenge's shells."""
+    pool = get_shell_pool(state)
+    cwd = pool.sessions[0].cwd if pool.sessions else pool.cwd
+    runtime = min(max_runtime or settings.JOB_MAX_RUNTIME, settings.JOB_MAX_RUNTIME)
+    return await get_job_table(state).start(command, runtime, cwd, {**pool.env, **(env or {})})
+
+
+async def close_jobs(challenge_code: Optional[str] = None) -> None:
+    """Kill the jobs of one challenge, or of every challenge when none is given."""
+    keys = [challenge_code] if challenge_code else list(_tables)
+    for key in keys:
+        table = _tables.pop(key, None)
+        if table is not None:
+            await table.close()
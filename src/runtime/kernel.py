@@ -0,0 +1,263 @@
+"""Long-lived IPython kernels, one per challenge, with pre-warmed spares."""
+
+import asyncio
+import base64
+import os
+import signal
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from src.runtime.framing import OutputCallback, OutputCapture, SessionDied, new_marker, read_framed
+from src.runtime.shell import process_slot, workspace
+from src.settings import settings
+
+KERNEL_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_server.py")
+START_TIMEOUT = 60
+
+
+@dataclass
+class KernelResult:
+    output: str
+    ok: bool
+    timed_out: bool = False
+    # The kernel did not stop when interrupted (or died) and was killed, losing its state
+    killed: bool = False
+    # The cell ran in a new kernel because the previous one had died between calls
+    fresh: bool = False
+    # Memory (MB) at which the kernel was recycled after this cell, losing its state
+    recycled_mb: float = 0.0
+    # Bytes dropped from the middle of the output to stay within the size limit
+    omitted: int = 0
+
+
+class Kernel:
+    """One IPython process (``kernel_server.py``) that runs cells one at a time.
+
+    On timeout the kernel's process group gets SIGINT, which raises
+    ``KeyboardInterrupt`` in the cell and keeps the namespace; a kernel that
+    does not return to its loop within ``KERNEL_INTERRUPT_GRACE`` seconds is
+    killed.
+    """
+
+    def __init__(self) -> None:
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", KERNEL_SERVER,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=cwd,
+            env={**os.environ, **(env or {})},
+            start_new_session=True,
+        )
+        try:
+            async with asyncio.timeout(START_TIMEOUT):
+                while True:
+                    line = await self.process.stdout.readline()
+                    if not line:
+                        raise RuntimeError("kernel exited during startup")
+                    if line.strip() == b"ready":
+                        return
+        except BaseException:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        """Kill the kernel and everything it started."""
+        if self.process is None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        await self.process.wait()
+        self.process = None
+
+    def rss_mb(self) -> float:
+        """Resident memory of the kernel process in MB (0 where /proc is unavailable)."""
+        try:
+            with open(f"/proc/{self.process.pid}/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError, AttributeError):
+            pass
+        return 0.0
+
+    async def setup(self, code: str) -> None:
+        """Run ``code`` silently (outside the history), e.g. to change directory."""
+        await self._send(new_marker(), "setup", code, OutputCapture(4096), START_TIMEOUT)
+
+    async def execute(
+        self, code: str, timeout: float, max_bytes: int, on_output: Optional[OutputCallback] = None
+    ) -> KernelResult:
+        marker = new_marker()
+        capture = OutputCapture(max_bytes)
+        try:
+            try:
+                ok = await self._send(marker, "cell", code, capture, timeout, on_output)
+                return KernelResult(capture.text(), ok, omitted=capture.omitted)
+            except asyncio.TimeoutError:
+                os.killpg(self.process.pid, signal.SIGINT)
+            try:
+                trailer = await asyncio.wait_for(
+                    read_framed(self.process.stdout, marker, capture, on_output),
+                    settings.KERNEL_INTERRUPT_GRACE,
+                )
+                return KernelResult(capture.text(), trailer == "1", timed_out=True, omitted=capture.omitted)
+            except asyncio.TimeoutError:
+                await self.close()
+                return KernelResult(capture.text(), False, timed_out=True, killed=True, omitted=capture.omitted)
+        except (SessionDied, BrokenPipeError, ConnectionResetError, ProcessLookupError):
+            await self.close()
+            return KernelResult(capture.text(), False, killed=True, omitted=capture.omitted)
+        except BaseException:
+            # Cancelled, or ``on_output`` raised: the cell is abandoned mid-way
+            await self.close()
+            raise
+
+    async def _send(
+        self,
+        marker: bytes,
+        mode: str,
+        code: str,
+        capture: OutputCapture,
+        timeout: float,
+        on_output: Optional[OutputCallback] = None,
+    ) -> bool:
+        payload = base64.b64encode(code.encode()).decode()
+        self.process.stdin.write(f"{marker.decode()} {mode} {payload}\n".encode())
+        await self.process.stdin.drain()
+        trailer = await asyncio.wait_for(
+            read_framed(self.process.stdout, marker, capture, on_output), timeout
+        )
+        return trailer == "1"
+
+
+class KernelManager:
+    """Assigns one kernel per challenge and keeps ``KERNEL_WARM_POOL`` spares started.
+
+    A challenge's first cell takes a spare (already past interpreter and
+    IPython startup) and a replacement is started in the background. Cells of
+    one challenge run one at a time. A kernel whose memory exceeds
+    ``KERNEL_MAX_RSS_MB`` after a cell is replaced before the next one.
+    """
+
+    def __init__(self) -> None:
+        self.kernels: Dict[str, Kernel] = {}
+        self.spares: List[Kernel] = []
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._warming: Set[asyncio.Task] = set()
+
+    def warm(self) -> None:
+        """Start spare kernels in the background up to ``KERNEL_WARM_POOL``."""
+        missing = settings.KERNEL_WARM_POOL - len(self.spares) - len(self._warming)
+        for _ in range(max(0, missing)):
+            task = asyncio.create_task(self._start_spare())
+            self._warming.add(task)
+            task.add_done_callback(self._warming.discard)
+
+    async def _start_spare(self) -> None:
+        kernel = Kernel()
+        try:
+            await kernel.start()
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"[Kernel] Failed to start a spare kernel: {e}")
+            return
+        self.spares.append(kernel)
+
+    async def _take(self, cwd: str, env: Dict[str, str]) -> Kernel:
+        kernel = None
+        while self.spares:
+            spare = self.spares.pop(0)
+            if spare.alive:
+                kernel = spare
+                break
+        if kernel is None:
+            kernel = Kernel()
+            await kernel.start(cwd, env)
+        else:
+            await kernel.setup(f"import os as _os; _os.chdir({cwd!r}); _os.environ.update({env!r}); del _os")
+        self.warm()
+        return kernel
+
+    async def execute(
+        self,
+        key: str,
+        cwd: str,
+        code: str,
+        timeout: float,
+        on_output: Optional[OutputCallback] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> KernelResult:
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            kernel = self.kernels.get(key)
+            fresh = kernel is not None and not kernel.alive
+            if kernel is None or not kernel.alive:
+                kernel = self.kernels[key] = await self._take(cwd, env or {})
+
+            try:
+                result = await kernel.execute(code, timeout, settings.SHELL_MAX_OUTPUT_BYTES, on_output)
+            finally:
+                if not kernel.alive:
+                    self.kernels.pop(key, None)
+            result.fresh = fresh
+            if kernel.alive and settings.KERNEL_MAX_RSS_MB and kernel.rss_mb() > settings.KERNEL_MAX_RSS_MB:
+                result.recycled_mb = kernel.rss_mb()
+                print(f"[Kernel] Recycling kernel of {key} at {result.recycled_mb:.0f} MB")
+                await kernel.close()
+                self.kernels.pop(key, None)
+            return result
+
+    async def close(self, key: Optional[str] = None) -> None:
+        """Close one challenge's kernel, or every kernel and spare when no key is given."""
+        if key is not None:
+            kernel = self.kernels.pop(key, None)
+            self._locks.pop(key, None)
+            if kernel is not None:
+                await kernel.close()
+            return
+        for task in list(self._warming):
+            task.cancel()
+        await asyncio.gather(*self._warming, return_exceptions=True)
+        for kernel in [*self.kernels.values(), *self.spares]:
+            await kernel.close()
+        self.kernels.clear()
+        self.spares.clear()
+        self._locks.clear()
+
+
+_manager = KernelManager()
+
+
+async def run_python(
+    code: str,
+    timeout: float,
+    on_output: Optional[OutputCallback] = None,
+    state: Optional[dict] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> KernelResult:
+    """Run ``code`` in the current challenge's kernel, started in its artifact directory.
+
+    ``env`` is added to the environment of a kernel assigned to the challenge by this call.
+    """
+    key, cwd = workspace(state)
+    async with process_slot(key):
+        return await _manager.execute(key, cwd, code, timeout, on_output, env)
+
+
+def warm_kernels() -> None:
+    """Start the spare kernels now so the first cell of a challenge does not wait for them."""
+    _manager.warm()
+
+
+async def close_kernels(challenge_code: Optional[str] = None) -> None:
+    """Close the kernel of one challenge, or all kernels when none is given."""
+    await _manager.close(challenge_code)
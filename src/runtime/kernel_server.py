@@ -0,0 +1,59 @@
+"""IPython execution loop run in a kernel subprocess; see ``src.runtime.kernel``.
+
+Started by path (not imported), so it has no dependency on the rest of the
+package. Each request on stdin is ``<marker> <cell|setup> <base64 code>``;
+a cell's output goes to stdout and is followed by ``\\n<marker> <0|1>``.
+Setup code (e.g. changing directory) runs silently and outside the history.
+The process's own stdin is replaced by /dev/null, so ``input()`` cannot read
+requests. SIGINT is ignored except while code runs, where it raises
+``KeyboardInterrupt`` in that code.
+"""
+
+import base64
+import os
+import signal
+import sys
+
+
+def main() -> None:
+    requests = os.fdopen(os.dup(0), "rb")
+    null = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null, 0)
+    os.close(null)
+    sys.stdin = open(os.devnull, encoding="utf-8")
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from IPython.core.interactiveshell import InteractiveShell
+
+    shell = InteractiveShell.instance(colors="nocolor")
+    shell.InteractiveTB.set_mode(mode="Plain")
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    for line in requests:
+        marker, mode, payload = (line.decode().split() + ["", "", ""])[:3]
+        if not marker:
+            continue
+        code = base64.b64decode(payload).decode()
+        ok = False
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        try:
+            if mode == "setup":
+                shell.ex(code)
+                ok = True
+            else:
+                ok = shell.run_cell(code, store_history=True).success
+        except KeyboardInterrupt:
+            print("KeyboardInterrupt")
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"{type(e).__name__}: {e}")
+        finally:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.stdout.write(f"\n{marker} {int(ok)}\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Long-lived bash sessions reused across an agent's tool calls."""
+
+import asyncio
+import base64
+import os
+import signal
+from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from src.memory.context import get_current_state
+from src.output.artifacts import artifact_dir
+from src.runtime.framing import OutputCallback, OutputCapture, SessionDied, new_marker, read_framed
+from src.settings import settings
+
+# Session setup: no pagers or colour codes, no history file
+SESSION_INIT = "export TERM=dumb PAGER=cat GIT_PAGER=cat SYSTEMD_PAGER=; unset HISTFILE\n"
+
+
+@dataclass
+class ShellResult:
+    output: str
+    exit_code: Optional[int]
+    cwd: str
+    timed_out: bool = False
+    # The shell had to be started again, losing variables and functions
+    restarted: bool = False
+    # Bytes dropped from the middle of the output to stay within the size limit
+    omitted: int = 0
+
+
+class ShellSession:
+    """One ``bash`` process that runs commands one at a time.
+
+    Each command is sent base64-encoded and ``eval``-ed with stdin from
+    ``/dev/null`` (so nothing it runs can read the framing), followed by a
+    ``printf`` of a per-command sentinel with the exit status and working
+    directory. A command that times out or kills the shell gets the whole
+    process group killed; the next command starts a fresh shell in the last
+    known working directory.
+    """
+
+    def __init__(self, cwd: str, env: Optional[Dict[str, str]] = None):
+        self.cwd = cwd
+        # Added to the environment whenever the shell is (re)started
+        self.env = env if env is not None else {}
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.busy = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            "bash", "--noprofile", "--norc",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=self.cwd if os.path.isdir(self.cwd) else None,
+            env={**os.environ, **self.env},
+            start_new_session=True,
+        )
+        self.process.stdin.write(SESSION_INIT.encode())
+        await self.process.stdin.drain()
+
+    async def close(self) -> None:
+        """Kill the shell and everything it started."""
+        if self.process is None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        await self.process.wait()
+        self.process = None
+
+    async def run(
+        self, code: str, timeout: float, max_bytes: int, on_output: Optional[OutputCallback] = None
+    ) -> ShellResult:
+        # A shell that died between commands (rather than one we killed) lost its state unannounced
+        restarted = self.process is not None and not self.alive
+        if not self.alive:
+            await self.start()
+
+        marker = new_marker()
+        script = base64.b64encode(code.encode()).decode()
+        command = (
+            f'eval "$(printf %s {script} | base64 -d)" < /dev/null\n'
+            f"printf '\\n%s %s %s\\n' '{marker.decode()}' \"$?\" \"$PWD\"\n"
+        )
+        capture = OutputCapture(max_bytes)
+        try:
+            self.process.stdin.write(command.encode())
+            await self.process.stdin.drain()
+            trailer = await asyncio.wait_for(
+                read_framed(self.process.stdout, marker, capture, on_output), timeout
+            )
+        except asyncio.TimeoutError:
+            await self.close()
+            return ShellResult(capture.text(), None, self.cwd, timed_out=True, restarted=restarted,
+                               omitted=capture.omitted)
+        except (SessionDied, BrokenPipeError, ConnectionResetError):
+            await self.close()
+            return ShellResult(capture.text(), None, self.cwd, restarted=restarted, omitted=capture.omitted)
+        except BaseException:
+            # Cancelled, or ``on_output`` raised: the command is abandoned mid-way
+            await self.close()
+            raise
+        status, _, cwd = trailer.partition(" ")
+        self.cwd = cwd or self.cwd
+        return ShellResult(capture.text(), int(status) if status.isdigit() else None, self.cwd,
+                           restarted=restarted, omitted=capture.omitted)
+
+
+class ShellPool:
+    """Warm shell sessions for one challenge.
+
+    Calls go to the first idle session, so sequential commands share one
+    shell (and its cwd, variables and functions); concurrent calls spill
+    over to further shells (``size`` in total) started in the same directory.
+    """
+
+    def __init__(self, cwd: str, size: int):
+        self.cwd = cwd
+        self.size = max(1, size)
+        self.sessions: List[ShellSession] = []
+        # Environment additions shared by every session of the pool
+        self.env: Dict[str, str] = {}
+        self._idle = asyncio.Condition()
+
+    async def run(
+        self,
+        code: str,
+        timeout: float,
+        max_bytes: Optional[int] = None,
+        on_output: Optional[OutputCallback] = None,
+    ) -> ShellResult:
+        session = await self._acquire()
+        try:
+            return await session.run(code, timeout, max_bytes or settings.SHELL_MAX_OUTPUT_BYTES, on_output)
+        finally:
+            async with self._idle:
+                session.busy = False
+                self._idle.notify()
+
+    async def _acquire(self) -> ShellSession:
+        async with self._idle:
+            while True:
+                for session in self.sessions:
+                    if not session.busy:
+                        session.busy = True
+                        return session
+                if len(self.sessions) < self.size:
+                    cwd = self.sessions[0].cwd if self.sessions else self.cwd
+                    session = ShellSession(cwd, self.env)
+                    session.busy = True
+                    self.sessions.append(session)
+                    return session
+                await self._idle.wait()
+
+    async def close(self) -> None:
+        for session in self.sessions:
+            await session.close()
+        self.sessions.clear()
+
+
+_pools: Dict[str, ShellPool] = {}
+_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def workspace(state: Optional[dict] = None) -> Tuple[str, str]:
+    """``(key, directory)`` of the current challenge: its code and artifact directory."""
+    if state is None:
+        state = get_current_state(optional=True)
+    cwd = artifact_dir(state)
+    return (state or {}).get("challenge_code") or os.path.basename(cwd), cwd
+
+
+@asynccontextmanager
+async def process_slot(key: str) -> AsyncIterator[None]:
+    """Hold one of the challenge's ``TOOL_PROCESSES_PER_CHALLENGE`` slots for running a command."""
+    if key not in _slots:
+        _slots[key] = asyncio.Semaphore(max(1, settings.TOOL_PROCESSES_PER_CHALLENGE))
+    async with _slots[key]:
+        yield
+
+
+async def run_shell(
+    code: str,
+    timeout: float,
+    on_output: Optional[OutputCallback] = None,
+    state: Optional[dict] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> ShellResult:
+    """Run ``code`` in one of the current challenge's shell sessions.
+
+    ``env`` is added to the environment of shells started from now on.
+    """
+    key, _ = workspace(state)
+    pool = get_shell_pool(state)
+    pool.env.update(env or {})
+    async with process_slot(key):
+        return await pool.run(code, timeout, on_output=on_output)
+
+
+def get_shell_pool(state: Optional[dict] = None) -> ShellPool:
+    """The session pool for the current challenge, started in its artifact directory."""
+    key, cwd = workspace(state)
+    if key not in _pools:
+        _pools[key] = ShellPool(cwd, settings.SHELL_SESSIONS_PER_CHALLENGE)
+    return _pools[key]
+
+
+async def close_shells(challenge_code: Optional[str] = None) -> None:
+    """Close the sessions of one challenge, or of every challenge when none is given.
+
+    The challenge's process slots are released with them.
+    """
+    keys = [challenge_code] if challenge_code else list({*_pools, *_slots})
+    for key in keys:
+        _slots.pop(key, None)
+        pool = _pools.pop(key, None)
+        if pool is not None:
+            await pool.close()
@@ -0,0 +1,153 @@
+"""Bounded, priority-aware scheduler for competition challenges."""
+
+import asyncio
+import itertools
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from src.budget import Preempted
+from src.utils.problem_api import Challenge
+
+# Relative cost of a challenge by difficulty; unknown labels count as medium.
+DIFFICULTY_COST: Dict[str, float] = {
+    "easy": 1.0,
+    "medium": 2.0,
+    "hard": 4.0,
+}
+DEFAULT_DIFFICULTY_COST = 2.0
+
+# A viewed hint is already paid for and usually shortens the solve.
+HINT_VIEWED_DISCOUNT = 0.75
+
+
+def challenge_score(challenge: Challenge) -> float:
+    """Expected points per unit of effort; higher runs first."""
+    cost = DIFFICULTY_COST.get(challenge.difficulty.strip().lower(), DEFAULT_DIFFICULTY_COST)
+    if challenge.hint_viewed:
+        cost *= HINT_VIEWED_DISCOUNT
+    return challenge.points / cost
+
+
+def challenge_priority(challenge: Challenge, requeued: int = 0) -> tuple:
+    """Queue ordering key: fresh challenges before requeued ones, then best score first."""
+    return (requeued, -challenge_score(challenge), challenge.challenge_code)
+
+
+@dataclass(order=True)
+class ScheduledChallenge:
+    priority: tuple
+    seq: int
+    challenge: Challenge = field(compare=False)
+    index: int = field(compare=False)
+    # Budget preemptions and failed runs so far, counted against max_passes and max_attempts
+    passes: int = field(default=0, compare=False)
+    failures: int = field(default=0, compare=False)
+    resume: Any = field(default=None, compare=False)
+
+
+Runner = Callable[[Challenge, int, Any], Awaitable[Any]]
+
+
+class ChallengeScheduler:
+    """Runs challenges through a fixed number of worker slots.
+
+    Challenges are pulled from a priority queue, so a slot is refilled with the
+    next best challenge as soon as the previous one finishes. A run that raises
+    or returns ``None`` is requeued behind fresh work until it has failed
+    ``max_attempts`` times; a run preempted by its budget is requeued the same
+    way, carrying its saved progress, until it has had ``max_passes`` passes.
+    Failures and preemptions are counted separately.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        max_workers: int,
+        max_attempts: int = 2,
+        max_passes: int = 3,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_attempts = max(1, max_attempts)
+        self.max_passes = max(1, max_passes)
+        self._queue: asyncio.PriorityQueue[ScheduledChallenge] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._results: Dict[str, Any] = {}
+
+    def submit(
+        self,
+        challenge: Challenge,
+        index: int,
+        passes: int = 0,
+        failures: int = 0,
+        resume: Any = None,
+    ) -> None:
+        """Queue a challenge behind those requeued fewer times."""
+        self._queue.put_nowait(
+            ScheduledChallenge(
+                priority=challenge_priority(challenge, passes + failures),
+                seq=next(self._seq),
+                challenge=challenge,
+                index=index,
+                passes=passes,
+                failures=failures,
+                resume=resume,
+            )
+        )
+
+    def _requeue(self, item: ScheduledChallenge, result: Any) -> None:
+        code = item.challenge.challenge_code
+        if isinstance(result, Preempted):
+            if item.passes + 1 >= self.max_passes:
+                print(f"[Scheduler] {code} preempted ({result.reason}), no passes left")
+                return
+            print(f"[Scheduler] {code} preempted ({result.reason}), requeueing for a later pass")
+            self.submit(
+                item.challenge, item.index, item.passes + 1, item.failures, result.state
+            )
+        elif result is None or isinstance(result, Exception):
+            if item.failures + 1 >= self.max_attempts:
+                return
+            print(f"[Scheduler] Requeueing {code} for another attempt")
+            self.submit(
+                item.challenge, item.index, item.passes, item.failures + 1, item.resume
+            )
+
+    async def _worker(self, slot: int) -> None:
+        while True:
+            item = await self._queue.get()
+            code = item.challenge.challenge_code
+            try:
+                print(
+                    f"[Scheduler] Slot {slot} -> {code} "
+                    f"(pass {item.passes + 1}, attempt {item.failures + 1}, {self._queue.qsize()} queued)"
+                )
+                try:
+                    result: Any = await self.runner(item.challenge, item.index, item.resume)
+                except Exception as e:  # pylint: disable=broad-except
+                    print(f"[Scheduler] {code} raised: {str(e)}")
+                    print(f"[Scheduler] Traceback:\n{traceback.format_exc()}")
+                    result = e
+                self._results[code] = result
+                self._requeue(item, result)
+            finally:
+                self._queue.task_done()
+
+    async def run(self, challenges: Iterable[Challenge]) -> Dict[str, Any]:
+        """Run every challenge and return the last result keyed by challenge code."""
+        for index, challenge in enumerate(challenges):
+            self.submit(challenge, index)
+
+        workers = [
+            asyncio.create_task(self._worker(slot)) for slot in range(self.max_workers)
+        ]
+        try:
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return dict(self._results)
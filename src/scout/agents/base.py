@@ -1,13 +1,14 @@
 from langchain_openai import ChatOpenAI
 
-from src.settings import settings
+from src.llm import get_agent_model
+from src.memory.window import TranscriptWindow
 
 
 class BaseAgent:
+    # Settings profile (<PROFILE>_LLM) that selects this agent's model
+    profile: str = "executor"
+
     def __init__(self):
-        self.model: ChatOpenAI = ChatOpenAI(
-            model=settings.MODEL,
-            base_url=settings.API_BASE,
-            api_key=settings.API_KEY,
-            max_retries=5,
-        )
+        self.model: ChatOpenAI = get_agent_model(self.profile)
+        # Keeps long transcripts within this agent's context budget
+        self.window = TranscriptWindow(self.profile)
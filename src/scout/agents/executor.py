@@ -1,6 +1,6 @@
 """Executor agent for script generation and task execution."""
 
-from typing import Any, Optional
+from typing import Optional
 from pydantic import Field
 
 from langchain.agents import create_agent
@@ -8,15 +8,27 @@ from langchain_core.messages import HumanMessage
 from langgraph.graph.state import BaseModel
 from langgraph.store.base import BaseStore
 
+from src.budget import BudgetExceeded
 from src.memory.context import memory_context
+from src.output.flags import FlagCaptured, FlagWatch
 from src.scout.utils.message import MessageBuilder
 
 from ..prompt import EXECUTOR_PROMPT
 from src.tool import (
+    batch_probe,
+    cancel_job,
+    crawl_site,
     get_plan,
+    get_response,
+    http_request,
     list_memories,
+    poll_job,
+    read_artifact,
     run_bash,
     run_ipython,
+    search_traffic,
+    site_map,
+    start_job,
     store_memory,
     store_plan,
     submit_answer,
@@ -33,29 +45,33 @@ class ExecutorOutput(BaseModel):
 class Executor(BaseAgent):
     """Executor agent for executing tasks with tools."""
 
+    profile = "executor"
+
     def __init__(self):
         super().__init__()
         self.agent = create_agent(
             self.model,
-            tools=[run_bash, run_ipython, store_plan, get_plan, list_memories, store_memory, submit_answer, get_hint],
+            tools=[run_bash, run_ipython, http_request, batch_probe, crawl_site, site_map, search_traffic, get_response, start_job, poll_job, cancel_job, read_artifact, store_plan, get_plan, list_memories, store_memory, submit_answer, get_hint],
             system_prompt=EXECUTOR_PROMPT,
-            response_format=None
+            response_format=None,
+            middleware=[FlagWatch(), self.window],
         )
 
     # NOTE: executor should return a state type of parent graph
-    def invoke(self, state: ScoutState, store: Optional[BaseStore] = None) -> dict:
+    async def ainvoke(self, state: ScoutState, store: Optional[BaseStore] = None) -> dict:
         try:
             with memory_context(store, state):
-                result = self.agent.invoke(
+                result = await self.agent.ainvoke(
                     {
                         "messages": [HumanMessage(content=MessageBuilder.build_executor_message(state))]
                     }
                 )
-            # Convert state to dict for merging
-            state_dict = state.model_dump() if hasattr(state, 'model_dump') else dict(state)
-            return {**state_dict, "messages": state.get("messages", []) + result.get("messages", [])}
+            return {"messages": result.get("messages", [])}
+        except FlagCaptured as captured:
+            return captured.update()
+        except BudgetExceeded:
+            raise
         except Exception as e:  # pylint: disable=broad-except
             # Always return a dict to satisfy LangGraph's state update contract
-            state_dict = state.model_dump() if hasattr(state, 'model_dump') else dict[str, Any](state)
             error_message = HumanMessage(content=f"Error during execution: {str(e)}")
-            return {**state_dict, "messages": state.get("messages", []) + [error_message]} 
\ No newline at end of file
+            return {"messages": [error_message]} 
\ No newline at end of file
@@ -11,34 +11,35 @@ from src.scout.agents.base import BaseAgent
 from src.scout.prompt import PATHFINDER_PROMPT
 from src.scout.state import ScoutState
 from src.scout.utils.message import MessageBuilder
+from src.tool import site_map
 
 
 class Pathfinder(BaseAgent):
     """Pathfinder agent for formulating strategic objectives."""
 
+    profile = "pathfinder"
+
     def __init__(self) -> None:
         super().__init__()
         self.agent = create_agent(
             self.model,
-            tools=[],
+            tools=[site_map],
             system_prompt=PATHFINDER_PROMPT,
             response_format=None,
+            middleware=[self.window],
         )
 
-    def invoke(self, state: ScoutState, store: Optional[BaseStore] = None) -> dict:
+    async def ainvoke(self, state: ScoutState, store: Optional[BaseStore] = None) -> dict:
         with memory_context(store, state):
-            result = self.agent.invoke(
+            result = await self.agent.ainvoke(
                 {
                     "messages": [
                         HumanMessage(content=MessageBuilder.build_pathfinder_message(state))
                     ]
                 }
             )
-        # Convert state to dict for merging
-        state_dict = state.model_dump() if hasattr(state, 'model_dump') else dict(state)
         return {
-            **state_dict,
-            "messages": state.get("messages", []) + result.get("messages", []),
+            "messages": result.get("messages", []),
             "objective": result.get("messages", [])[-1].content # TODO: think if necessary to ResponseFormat it, since redundant
         }
 
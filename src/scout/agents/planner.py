@@ -10,7 +10,7 @@ from langgraph.store.base import BaseStore
 from pydantic import ValidationError
 
 from src.memory.context import memory_context
-from src.memory.utils import save_plan
+from src.memory.utils import asave_plan
 from src.scout.agents.base import BaseAgent
 from src.scout.model import PlanResponse
 from src.scout.prompt import PLANNER_PROMPT
@@ -19,19 +19,22 @@ from src.scout.utils.message import MessageBuilder
 
 
 class Planner(BaseAgent):
+    profile = "planner"
+
     def __init__(self) -> None:
         super().__init__()
         self.agent = create_agent(
             self.model,
             system_prompt=PLANNER_PROMPT,
             response_format=PlanResponse,
+            middleware=[self.window],
         )
 
-    def invoke(self, state: ScoutState, store: Optional[BaseStore] = None) -> dict:
+    async def ainvoke(self, state: ScoutState, store: Optional[BaseStore] = None) -> dict:
         """Execute planner agent and return plan + memory aware state."""
         with memory_context(store, state):
             try:
-                result = self.agent.invoke(
+                result = await self.agent.ainvoke(
                     {
                         "messages": [
                             HumanMessage(
@@ -55,18 +58,15 @@ class Planner(BaseAgent):
             plan_payload["objective"] = state.get("objective", "")
 
         try:
-            save_plan(plan_payload, state=state, store=store)
+            await asave_plan(plan_payload, state=state, store=store)
         except ValueError:
             # Gracefully degrade if persistence fails (e.g., invalid payload)
             pass
 
         updated_memory = state.get("memory", []) + memory_payload
 
-        # Convert state to dict for merging
-        state_dict = state.model_dump() if hasattr(state, 'model_dump') else dict(state)
         return {
-            **state_dict,
-            "messages": state.get("messages", []) + result.get("messages", []),
+            "messages": result.get("messages", []),
             "plan": plan_payload,
             "memory": updated_memory,
         }
\ No newline at end of file
@@ -1,10 +1,26 @@
 """Configuration management for Scout agent."""
 
+import functools
 from dataclasses import dataclass, field
 from typing import Optional
 from pydantic import Field, AliasChoices
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+
+class ScoutSettings(BaseSettings):
+    """Environment / .env source for ScoutConfig."""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    model_name: str = Field(validation_alias=AliasChoices("MODEL"))
+    base_url: str = Field(validation_alias=AliasChoices("API_BASE"))
+    api_key: str = Field(validation_alias=AliasChoices("API_KEY"))
+    temperature: float = Field(default=0.7, validation_alias=AliasChoices("SCOUT_TEMPERATURE"))
+    execution_timeout: int = Field(default=60, validation_alias=AliasChoices("SCOUT_EXECUTION_TIMEOUT"))
+    max_output_size: int = Field(default=16000, validation_alias=AliasChoices("SCOUT_MAX_OUTPUT_SIZE"))
+    distill_min_size: int = Field(default=3000, validation_alias=AliasChoices("SCOUT_DISTILL_MIN_SIZE"))
+
+
 @dataclass
 class ScoutConfig:
     """Configuration for Scout agent and its components."""
@@ -16,8 +32,9 @@ class ScoutConfig:
     temperature: float = 0.7
     
     # Tool execution safety settings
-    execution_timeout: int = 30  # seconds
-    max_output_size: int = 100000  # bytes
+    execution_timeout: int = 60  # seconds, default per bash/Python command
+    max_output_size: int = 16000  # bytes returned inline; larger tool output is spooled to an artifact
+    distill_min_size: int = 3000  # bytes of HTTP/HTML output above which a digest replaces it
     
     # Dangerous command patterns to block
     dangerous_commands: list[str] = field(default_factory=lambda: [
@@ -33,16 +50,23 @@ class ScoutConfig:
     def from_env(cls) -> "ScoutConfig":
         """Create configuration from environment variables and .env automatically."""
         s = ScoutSettings()
-        print("TEST:", s.model_name, s.base_url, s.api_key, s.temperature, s.execution_timeout)
         return cls(
             model_name=s.model_name,
             base_url=s.base_url,
             api_key=s.api_key,
             temperature=s.temperature,
             execution_timeout=s.execution_timeout,
+            max_output_size=s.max_output_size,
+            distill_min_size=s.distill_min_size,
         )
     
     def is_command_dangerous(self, command: str) -> bool:
         """Check if a command contains dangerous patterns."""
         return any(pattern in command for pattern in self.dangerous_commands)
 
+
+@functools.lru_cache(maxsize=1)
+def get_scout_config() -> ScoutConfig:
+    """Process-wide ScoutConfig, read from the environment once."""
+    return ScoutConfig.from_env()
+
@@ -1,26 +1,23 @@
-from typing import Optional
+from typing import Literal, Optional
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, StateGraph
-from langgraph.store.base import BaseStore
-from langgraph.store.memory import InMemoryStore
 
 from src.scout.agents import Executor, Pathfinder, Planner
 from src.scout.state import ScoutState
 
 
-def build_graph(store: Optional[BaseStore] = None):
-    if store is None:
-        store = InMemoryStore()
-
+def build_graph(checkpointer: Optional[BaseCheckpointSaver | Literal[True]] = None):
+    """The scout subgraph; run inside the top-level graph, it uses that graph's store."""
     pathfinder = Pathfinder()
     planner = Planner()
     executor = Executor()
 
     graph = (
         StateGraph(ScoutState)
-        .add_node("pathfinder", pathfinder.invoke)
-        .add_node("planner", planner.invoke)
-        .add_node("executor", executor.invoke)
+        .add_node("pathfinder", pathfinder.ainvoke)
+        .add_node("planner", planner.ainvoke)
+        .add_node("executor", executor.ainvoke)
 
         .set_entry_point("pathfinder")
         .add_edge("pathfinder", "planner")
@@ -28,4 +25,4 @@ def build_graph(store: Optional[BaseStore] = None):
         .add_edge("executor", END)
     )
 
-    return graph.compile(store=store)
\ No newline at end of file
+    return graph.compile(checkpointer=checkpointer)
\ No newline at end of file
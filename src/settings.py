@@ -1,7 +1,33 @@
-from typing import Optional
-from pydantic import Field, AliasChoices
+import os
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, AliasChoices
 from pydantic_settings import BaseSettings
 
+
+class LLMEndpoint(BaseModel):
+    """An extra OpenAI-compatible endpoint serving the same models as API_BASE."""
+
+    base_url: str
+    api_key: str = ""
+    weight: float = 1.0
+
+
+class ModelProfile(BaseModel):
+    """Model selection for one agent; empty fields inherit MODEL / API_BASE / API_KEY."""
+
+    # "fast" uses FAST_MODEL when it is set, "strong" always MODEL; unset uses the agent's default
+    tier: Optional[Literal["fast", "strong"]] = None
+    model: str = ""
+    base_url: str = ""
+    api_key: str = ""
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    # Models tried in order when this one keeps failing (default: MODEL, if different)
+    fallbacks: list[str] = Field(default_factory=list)
+    # Transcript budget before older turns are summarised (default: CONTEXT_MAX_TOKENS)
+    context_tokens: Optional[int] = None
+
+
 class Settings(BaseSettings):
     
     # langsmith_api_key: Optional[str] = Field(None, validation_alias="LANGSMITH_API_KEY")
@@ -14,13 +40,132 @@ class Settings(BaseSettings):
     API_KEY: str = Field(default=..., validation_alias=AliasChoices("API_KEY"))
     API_BASE: str = Field(default=..., validation_alias=AliasChoices("API_BASE"))
     MODEL: str = Field(default=..., validation_alias=AliasChoices("MODEL"))
+    # Extra endpoints balanced with API_BASE, as JSON: [{"base_url": ..., "api_key": ..., "weight": ...}]
+    API_ENDPOINTS: list[LLMEndpoint] = Field(default_factory=list, validation_alias=AliasChoices("API_ENDPOINTS"))
+    # Cheap model for light classification and summarisation (empty uses MODEL everywhere)
+    FAST_MODEL: str = Field(default="", validation_alias=AliasChoices("FAST_MODEL"))
+
+    # Per-agent model profiles, e.g. ROUTER_LLM__MODEL or EXECUTOR_LLM__TEMPERATURE
+    # (router, pathfinder and summarizer default to the fast tier, the rest to the strong one)
+    RECON_LLM: ModelProfile = Field(default_factory=ModelProfile, validation_alias=AliasChoices("RECON_LLM"))
+    ROUTER_LLM: ModelProfile = Field(default_factory=ModelProfile, validation_alias=AliasChoices("ROUTER_LLM"))
+    PATHFINDER_LLM: ModelProfile = Field(default_factory=ModelProfile, validation_alias=AliasChoices("PATHFINDER_LLM"))
+    PLANNER_LLM: ModelProfile = Field(default_factory=ModelProfile, validation_alias=AliasChoices("PLANNER_LLM"))
+    EXECUTOR_LLM: ModelProfile = Field(default_factory=ModelProfile, validation_alias=AliasChoices("EXECUTOR_LLM"))
+    SUMMARIZER_LLM: ModelProfile = Field(default_factory=ModelProfile, validation_alias=AliasChoices("SUMMARIZER_LLM"))
+
+    # Transcript windowing: per-call token budget, share kept verbatim, summary size
+    CONTEXT_MAX_TOKENS: int = Field(default=60000, validation_alias=AliasChoices("CONTEXT_MAX_TOKENS"))
+    CONTEXT_KEEP_RATIO: float = Field(default=0.5, validation_alias=AliasChoices("CONTEXT_KEEP_RATIO"))
+    CONTEXT_SUMMARY_TOKENS: int = Field(default=1500, validation_alias=AliasChoices("CONTEXT_SUMMARY_TOKENS"))
+
+    # Pooled HTTP transport shared by every LLM client in a process
+    LLM_HTTP2: bool = Field(default=False, validation_alias=AliasChoices("LLM_HTTP2"))
+    LLM_MAX_CONNECTIONS: int = Field(default=100, validation_alias=AliasChoices("LLM_MAX_CONNECTIONS"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, validation_alias=AliasChoices("LLM_MAX_KEEPALIVE_CONNECTIONS"))
+    LLM_KEEPALIVE_EXPIRY: float = Field(default=30.0, validation_alias=AliasChoices("LLM_KEEPALIVE_EXPIRY"))
+    LLM_REQUEST_TIMEOUT: float = Field(default=300.0, validation_alias=AliasChoices("LLM_REQUEST_TIMEOUT"))
+
+    # Shared adaptive limiter for LLM calls (0 disables the per-minute caps)
+    LLM_MAX_RPM: int = Field(default=0, validation_alias=AliasChoices("LLM_MAX_RPM"))
+    LLM_MAX_TPM: int = Field(default=0, validation_alias=AliasChoices("LLM_MAX_TPM"))
+    LLM_INITIAL_CONCURRENCY: int = Field(default=8, validation_alias=AliasChoices("LLM_INITIAL_CONCURRENCY"))
+    LLM_MAX_CONCURRENCY: int = Field(default=32, validation_alias=AliasChoices("LLM_MAX_CONCURRENCY"))
+    LLM_MAX_RETRIES: int = Field(default=5, validation_alias=AliasChoices("LLM_MAX_RETRIES"))
+
+    # Per-endpoint circuit breaker: consecutive failures to open it, seconds before a probe
+    LLM_BREAKER_FAILURES: int = Field(default=3, validation_alias=AliasChoices("LLM_BREAKER_FAILURES"))
+    LLM_BREAKER_COOLDOWN: float = Field(default=30.0, validation_alias=AliasChoices("LLM_BREAKER_COOLDOWN"))
+
+    # Opt-in SQLite cache of LLM responses (empty path disables; 0 disables TTL/size limits)
+    LLM_CACHE_PATH: str = Field(default="", validation_alias=AliasChoices("LLM_CACHE_PATH"))
+    LLM_CACHE_TTL: float = Field(default=86400, validation_alias=AliasChoices("LLM_CACHE_TTL"))
+    LLM_CACHE_MAX_MB: int = Field(default=512, validation_alias=AliasChoices("LLM_CACHE_MAX_MB"))
+
+    # Commands (bash or Python) running at once per challenge
+    TOOL_PROCESSES_PER_CHALLENGE: int = Field(default=3, validation_alias=AliasChoices("TOOL_PROCESSES_PER_CHALLENGE"))
+    # Persistent bash sessions: shells per challenge; the timeout cap (s) and output kept also apply
+    # to kernels (the default timeout is SCOUT_EXECUTION_TIMEOUT)
+    SHELL_SESSIONS_PER_CHALLENGE: int = Field(default=2, validation_alias=AliasChoices("SHELL_SESSIONS_PER_CHALLENGE"))
+    SHELL_MAX_TIMEOUT: float = Field(default=600, validation_alias=AliasChoices("SHELL_MAX_TIMEOUT"))
+    SHELL_MAX_OUTPUT_BYTES: int = Field(default=4_000_000, validation_alias=AliasChoices("SHELL_MAX_OUTPUT_BYTES"))
+
+    # Background jobs: running at once per challenge, default/maximum runtime (s),
+    # address-space and output-file limits in MB (0 disables a limit)
+    JOB_MAX_PER_CHALLENGE: int = Field(default=3, validation_alias=AliasChoices("JOB_MAX_PER_CHALLENGE"))
+    JOB_MAX_RUNTIME: float = Field(default=1800, validation_alias=AliasChoices("JOB_MAX_RUNTIME"))
+    JOB_MAX_MEMORY_MB: int = Field(default=4096, validation_alias=AliasChoices("JOB_MAX_MEMORY_MB"))
+    JOB_MAX_OUTPUT_MB: int = Field(default=200, validation_alias=AliasChoices("JOB_MAX_OUTPUT_MB"))
+
+    # http_request tool: per-request timeout (s), pooled connections per challenge, body bytes kept
+    HTTP_TIMEOUT: float = Field(default=20, validation_alias=AliasChoices("HTTP_TIMEOUT"))
+    HTTP_MAX_CONNECTIONS: int = Field(default=20, validation_alias=AliasChoices("HTTP_MAX_CONNECTIONS"))
+    HTTP_MAX_BODY_BYTES: int = Field(default=5_000_000, validation_alias=AliasChoices("HTTP_MAX_BODY_BYTES"))
+    HTTP_VERIFY_TLS: bool = Field(default=False, validation_alias=AliasChoices("HTTP_VERIFY_TLS"))
+
+    # batch_probe tool: requests in flight per target, values per call
+    HTTP_PROBE_CONCURRENCY: int = Field(default=10, validation_alias=AliasChoices("HTTP_PROBE_CONCURRENCY"))
+    HTTP_PROBE_MAX_REQUESTS: int = Field(default=1000, validation_alias=AliasChoices("HTTP_PROBE_MAX_REQUESTS"))
+
+    # Pre-recon before the Recon agent: extra ports scanned on every target host, TCP connect and
+    # HTTP timeouts (s), and the time after which the stage stops and keeps what it has
+    PRERECON_ENABLED: bool = Field(default=True, validation_alias=AliasChoices("PRERECON_ENABLED"))
+    PRERECON_PORTS: list[int] = Field(
+        default=[21, 22, 80, 443, 3000, 3306, 5000, 5432, 6379, 8000, 8080, 8443, 8888, 9000, 27017],
+        validation_alias=AliasChoices("PRERECON_PORTS"),
+    )
+    PRERECON_CONNECT_TIMEOUT: float = Field(default=2, validation_alias=AliasChoices("PRERECON_CONNECT_TIMEOUT"))
+    PRERECON_HTTP_TIMEOUT: float = Field(default=5, validation_alias=AliasChoices("PRERECON_HTTP_TIMEOUT"))
+    PRERECON_TIME_BUDGET: float = Field(default=30, validation_alias=AliasChoices("PRERECON_TIME_BUDGET"))
+
+    # Traffic log: recording proxy exported to tool processes as HTTP_PROXY, body bytes full-text indexed
+    TRAFFIC_PROXY: bool = Field(default=True, validation_alias=AliasChoices("TRAFFIC_PROXY"))
+    TRAFFIC_MAX_INDEX_BYTES: int = Field(default=200_000, validation_alias=AliasChoices("TRAFFIC_MAX_INDEX_BYTES"))
+
+    # Site-map crawler: link depth, pages fetched and time (s) per crawl, requests per second
+    # (0 disables pacing) and in flight, and whether the Recon stage crawls every web service
+    CRAWL_MAX_DEPTH: int = Field(default=3, validation_alias=AliasChoices("CRAWL_MAX_DEPTH"))
+    CRAWL_MAX_PAGES: int = Field(default=150, validation_alias=AliasChoices("CRAWL_MAX_PAGES"))
+    CRAWL_TIME_BUDGET: float = Field(default=60, validation_alias=AliasChoices("CRAWL_TIME_BUDGET"))
+    CRAWL_RATE: float = Field(default=20, validation_alias=AliasChoices("CRAWL_RATE"))
+    CRAWL_CONCURRENCY: int = Field(default=5, validation_alias=AliasChoices("CRAWL_CONCURRENCY"))
+    CRAWL_ON_RECON: bool = Field(default=True, validation_alias=AliasChoices("CRAWL_ON_RECON"))
+
+    # IPython kernels: spares kept started, memory (MB) that triggers a restart (0 disables),
+    # seconds an interrupted cell gets to stop before the kernel is killed
+    KERNEL_WARM_POOL: int = Field(default=1, validation_alias=AliasChoices("KERNEL_WARM_POOL"))
+    KERNEL_MAX_RSS_MB: int = Field(default=1024, validation_alias=AliasChoices("KERNEL_MAX_RSS_MB"))
+    KERNEL_INTERRUPT_GRACE: float = Field(default=5, validation_alias=AliasChoices("KERNEL_INTERRUPT_GRACE"))
+
+    # Token budget of the compact state view the router decides from
+    ROUTER_CONTEXT_TOKENS: int = Field(default=3000, validation_alias=AliasChoices("ROUTER_CONTEXT_TOKENS"))
 
     CHALLENGE_API_KEY: str = Field(default=..., validation_alias=AliasChoices("CHALLENGE_API_KEY"))
     CHALLENGE_API_BASE: str = Field(default=..., validation_alias=AliasChoices("CHALLENGE_API_BASE"))
 
+    # Competition scheduling
+    MAX_CONCURRENT_CHALLENGES: int = Field(default=4, validation_alias=AliasChoices("MAX_CONCURRENT_CHALLENGES"))
+    MAX_CHALLENGE_ATTEMPTS: int = Field(default=2, validation_alias=AliasChoices("MAX_CHALLENGE_ATTEMPTS"))
+    MAX_CHALLENGE_PASSES: int = Field(default=3, validation_alias=AliasChoices("MAX_CHALLENGE_PASSES"))
+
+    # "async" runs every challenge in this process; "process" spreads them over worker processes
+    EXECUTION_MODE: Literal["async", "process"] = Field(default="async", validation_alias=AliasChoices("EXECUTION_MODE"))
+    WORKER_PROCESSES: int = Field(default_factory=lambda: os.cpu_count() or 1, validation_alias=AliasChoices("WORKER_PROCESSES"))
+
+    # Per-pass challenge budgets (0 disables a limit)
+    CHALLENGE_TIME_BUDGET: float = Field(default=1200, validation_alias=AliasChoices("CHALLENGE_TIME_BUDGET"))
+    CHALLENGE_TOKEN_BUDGET: int = Field(default=2_000_000, validation_alias=AliasChoices("CHALLENGE_TOKEN_BUDGET"))
+    CHALLENGE_TOOL_CALL_BUDGET: int = Field(default=200, validation_alias=AliasChoices("CHALLENGE_TOOL_CALL_BUDGET"))
+
+    # SQLite file for graph checkpoints and the memory store (empty disables)
+    CHECKPOINT_DB: str = Field(default=".xboo/checkpoints.sqlite", validation_alias=AliasChoices("CHECKPOINT_DB"))
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
+        env_nested_delimiter = "__"
+        # .env is shared with ScoutSettings (SCOUT_*) and LangSmith (LANGSMITH_*)
+        extra = "ignore"
 
 settings = Settings()
\ No newline at end of file
@@ -1,7 +1,8 @@
 import json
-from typing import Any, Dict, List, Literal, NotRequired, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Literal, NotRequired, Optional, TypedDict
 
 from langchain_core.messages import AnyMessage
+from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
 
@@ -75,7 +76,9 @@ class RedirectionModel(BaseModel):
 
 
 class State(TypedDict):
-    messages: list[AnyMessage]
+    # Appended by id: nodes return only their new messages, re-sent ids are replaced
+    messages: Annotated[list[AnyMessage], add_messages]
+    challenge_code: NotRequired[str]
 
     target: list[Target]
     recon: str
@@ -1,21 +1,49 @@
 """LangGraph-aware tools for scout agents."""
 
-import os
-import subprocess
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Union
 
-import asyncer
 from langchain_core.tools import tool
 
 from src.memory.tools import get_plan, list_memories, store_memory, store_plan
 from src.memory.utils import save_plan
+from src.output import process_tool_output
+from src.output.artifacts import read_artifact_text, save_artifact
+from src.output.flags import FlagCaptured, check_output, output_watcher
+from src.runtime import Job, get_job_table, run_python, run_shell, start_background_job
+from src.scout.config import get_scout_config
+from src.settings import settings
+from src.web import (
+    crawl,
+    default_base_url,
+    describe,
+    expand_values,
+    get_target_session,
+    get_traffic_log,
+    proxy_env,
+    query_site_map,
+    record_request,
+    run_probe,
+)
 from src.utils.problem_api import ProblemAPIClient, AnswerResponse, HintResponse
 
 __all__ = [
+    "batch_probe",
+    "cancel_job",
+    "crawl_site",
     "get_plan",
+    "get_response",
+    "http_request",
     "list_memories",
+    "poll_job",
+    "read_artifact",
     "run_bash",
     "run_ipython",
     "save_plan",
+    "search_traffic",
+    "site_map",
+    "start_job",
     "store_memory",
     "store_plan",
     "get_hint",
@@ -23,85 +51,510 @@ __all__ = [
 ]
 
 
-def get_execution_timeout() -> int:
-    """Get execution timeout from environment or use default."""
-    return int(os.getenv("SCOUT_EXECUTION_TIMEOUT", "30"))
+def get_execution_timeout(requested: Optional[float] = None) -> float:
+    """Timeout for one command: ``requested`` or SCOUT_EXECUTION_TIMEOUT, capped at SHELL_MAX_TIMEOUT."""
+    return min(requested or get_scout_config().execution_timeout, settings.SHELL_MAX_TIMEOUT)
 
 
 # @JettChenT's tool
 @tool
-def run_bash(code: str) -> str:
+async def run_bash(code: str, timeout: Optional[int] = None) -> str:
     """
     Run the given code in a Bash shell.
     like ping, curl, dig, whois, traceroute, nmap, etc.
+    * The shell is persistent for this challenge: cd, exported variables, shell
+      functions and files carry over between calls. Commands get no stdin, so
+      pass input through files, here-strings or pipes.
     * Limit your output if it's possibly too long to be helpful.
+    * Large HTTP/HTML responses are returned as a digest (status, headers, forms,
+      links, scripts, comments, errors) and other long output as head/tail; the full
+      output is saved to an artifact file - use read_artifact to grep or slice it.
 
     store all output (temp) file, under /tmp/<ip.replace('.', '-')>-<target-port>/
 
     Args:
         code: The bash command to run.
+        timeout: Seconds before the command is killed (default: the configured execution timeout).
 
     Returns:
         The output of the command.
     """
+    timeout = get_execution_timeout(timeout)
     try:
         print("Running bash code:")
         print(code)
-        result = subprocess.run(["bash", "-c", code], capture_output=True, text=True, timeout=60)
-        print(result.stdout + result.stderr)
-        if (
-            "Licensed under MIT (https://github.com/twbs/bootstrap/blob/main/LICENSE)"
-            in result.stdout
-        ):
+        # Flags are submitted from the live output, before it is distilled or spooled
+        result = await run_shell(
+            code, timeout, on_output=output_watcher("run_bash", exclude=code), env=await proxy_env()
+        )
+        output = result.output
+        print(output)
+        if "Licensed under MIT (https://github.com/twbs/bootstrap/blob/main/LICENSE)" in output:
             return "Why are you curl bootstrap? This response is too long and not helpful."  # NOTE: might cause unintended behavior
-        return result.stdout + result.stderr
-    except subprocess.TimeoutExpired:
-        return "Command timed out after 60 seconds"
+        notes = []
+        if result.restarted:
+            notes.append("[The shell had been restarted: exported variables and functions were reset]")
+        if result.timed_out:
+            notes.append(
+                f"[Command timed out after {timeout:g} seconds and was killed; the shell restarts "
+                f"in {result.cwd} with exported variables and functions reset]"
+            )
+        elif result.exit_code is None:
+            notes.append(f"[The shell exited; it restarts in {result.cwd} on the next command]")
+        elif result.exit_code:
+            notes.append(f"[exit status {result.exit_code}]")
+        return "\n".join([await process_tool_output(output, "bash"), *notes])
+    except FlagCaptured:
+        raise
     except Exception as e:  # pylint: disable=broad-except
         return f"Error running bash command: {str(e)}"
 
 
 @tool
-def run_ipython(code: str) -> str:
+async def run_ipython(code: str, timeout: Optional[int] = None) -> str:
     """
     Run the given code in an IPython shell.
     We recommend use this for elaborate or repetitive tasks. (e.g., emulation/exploit)
+    The kernel is persistent for this challenge: imports, variables, functions and
+    objects such as a requests.Session carry over between calls, so define helpers once.
+    Long output is saved to an artifact file; use read_artifact to grep or slice it.
 
     Args:
         code: The code to run.
+        timeout: Seconds before the code is interrupted (default: the configured execution timeout).
 
     Returns:
         The output of the code.
     """
+    timeout = get_execution_timeout(timeout)
     try:
         print("Running IPython code:")
         print(code)
-        result = subprocess.run(["ipython", "-c", code], capture_output=True, text=True, timeout=60)
-        print(result.stdout + result.stderr)
-        return result.stdout + result.stderr
-    except subprocess.TimeoutExpired:
-        return "Command timed out after 60 seconds"
+        result = await run_python(
+            code, timeout, on_output=output_watcher("run_ipython", exclude=code), env=await proxy_env()
+        )
+        output = result.output
+        print(output)
+        notes = []
+        if result.fresh:
+            notes.append("[The previous kernel had died; this ran in a new kernel without earlier variables]")
+        if result.killed:
+            reason = "Timed out and did not stop when interrupted" if result.timed_out else "The kernel exited"
+            notes.append(f"[{reason}; the next call starts a new kernel without earlier variables]")
+        elif result.timed_out:
+            notes.append(f"[Interrupted after {timeout:g} seconds; the kernel and its variables are kept]")
+        if result.recycled_mb:
+            notes.append(
+                f"[The kernel used {result.recycled_mb:.0f} MB and was restarted; "
+                f"earlier variables and imports are gone]"
+            )
+        return "\n".join([await process_tool_output(output, "ipython"), *notes])
+    except FlagCaptured:
+        raise
     except Exception as e:  # pylint: disable=broad-except
         return f"Error running IPython command: {str(e)}"
 
 
-async def _submit_answer_async(challenge_code: str, answer: str) -> str:
-    """Async implementation of submit_answer."""
+@tool
+async def start_job(command: str, max_runtime: Optional[int] = None) -> str:
+    """
+    Start a long-running bash command in the background and return at once with a job id.
+    Use this instead of run_bash for anything that may take more than a minute
+    (full port scans, directory or parameter brute forcing, cracking), and keep
+    working on other hypotheses while it runs. The job starts in the current
+    directory of your shell; its output goes to a log file.
+    Check on it with poll_job and stop it with cancel_job.
+
+    Args:
+        command: The bash command to run.
+        max_runtime: Seconds after which the job is killed (default and max 1800).
+
+    Returns:
+        The job id and the path of its output file.
+    """
     try:
-        print(f"Submitting answer for challenge {challenge_code}: {answer}")
-        async with ProblemAPIClient() as client:
-            response: AnswerResponse = await client.submit_answer(challenge_code, answer)
+        job = await start_background_job(command, max_runtime, env=await proxy_env())
+        print(f"Started {job.id}: {command}")
+        return f"Started {job.id}; output goes to {job.path}. Check it with poll_job(\"{job.id}\")."
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error starting job: {str(e)}"
 
-            if response.correct:
-                return f"Correct! Earned {response.earned_points} points. Challenge is {'solved' if response.is_solved else 'not yet fully solved'}."
-            else:
-                return f"Incorrect answer. Challenge is {'solved' if response.is_solved else 'not solved'}."
+
+async def _job_report(job: Job) -> str:
+    """Status line of ``job`` plus the output it wrote since the last report."""
+    if job.on_output is None:
+        job.on_output = output_watcher(job.id, exclude=job.command)
+    limit = int(get_scout_config().max_output_size * 0.75)
+    tail, total = b"", 0
+    for chunk in job.read_new():
+        await job.on_output(chunk)
+        total += len(chunk)
+        tail = (tail + chunk)[-limit:]
+    text = tail.decode(errors="replace")
+    if total > len(tail):
+        text = f"[... {total - len(tail)} earlier bytes of new output; use read_artifact on {job.path} ...]\n{text}"
+    header = f"{job.id} ({job.command[:120]}): {job.status()}, {job.size()} bytes in {job.path}"
+    return f"{header}\n{text}" if total else f"{header}\n(no new output)"
+
+
+@tool
+async def poll_job(job_id: Optional[str] = None) -> str:
+    """
+    Check background jobs started with start_job.
+    With a job id, returns its status and the output written since the last poll
+    (the full log can be searched with read_artifact). Without one, lists all jobs.
+
+    Args:
+        job_id: The id returned by start_job, e.g. "job-1".
+
+    Returns:
+        The job status and its new output, or the list of jobs.
+    """
+    table = get_job_table()
+    try:
+        if job_id is None:
+            if not table.jobs:
+                return "No background jobs."
+            return "\n".join(
+                f"{job.id} ({job.command[:120]}): {job.status()}, {job.size()} bytes of output"
+                for job in table.jobs.values()
+            )
+        if job_id not in table.jobs:
+            return f"No job {job_id!r}; known jobs: {', '.join(table.jobs) or 'none'}"
+        return await _job_report(table.jobs[job_id])
+    except FlagCaptured:
+        raise
     except Exception as e:  # pylint: disable=broad-except
-        return f"Error submitting answer: {str(e)}"
+        return f"Error polling job: {str(e)}"
+
+
+@tool
+async def cancel_job(job_id: str) -> str:
+    """
+    Stop a background job started with start_job and everything it spawned.
+
+    Args:
+        job_id: The id returned by start_job, e.g. "job-1".
+
+    Returns:
+        The job's final status and any output not yet reported.
+    """
+    table = get_job_table()
+    try:
+        if job_id not in table.jobs:
+            return f"No job {job_id!r}; known jobs: {', '.join(table.jobs) or 'none'}"
+        return await _job_report(await table.cancel(job_id))
+    except FlagCaptured:
+        raise
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error cancelling job: {str(e)}"
+
+
+@tool
+async def http_request(
+    url: str,
+    method: str = "GET",
+    headers: Optional[Union[str, Dict[str, str]]] = None,
+    body: Optional[str] = None,
+    form: Optional[Dict[str, Any]] = None,
+    json_body: Optional[Any] = None,
+    params: Optional[Dict[str, Any]] = None,
+    follow_redirects: bool = False,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Send one HTTP request to the target without spawning curl. Prefer this for web requests.
+    Connections are kept alive and cookies persist across calls in a jar shared with the
+    shell (cookies.txt in the target's artifact directory; use `curl -b cookies.txt -c cookies.txt`).
+    The response is returned like `curl -i` (status line, headers, body); large HTML
+    responses come back as a digest with the full response saved as an artifact.
+
+    Args:
+        url: Absolute URL, or a path such as "/login?next=/" relative to the target.
+        method: HTTP method (GET, POST, PUT, ...).
+        headers: Extra headers, as a dict or as raw "Name: value" lines (order and duplicates kept).
+        body: Raw request body (sent as is; set Content-Type yourself).
+        form: Form fields, sent as application/x-www-form-urlencoded.
+        json_body: Value sent as a JSON body.
+        params: Query-string parameters added to the URL.
+        follow_redirects: Follow redirects; every hop is shown. Off by default so Location
+            and Set-Cookie headers stay visible.
+        timeout: Seconds before the request is abandoned (default 20).
+
+    Returns:
+        The response, curl -i style, preceded by a line with timing and size.
+    """
+    try:
+        print(f"HTTP {method} {url}")
+        result = await get_target_session().request(
+            method, url, headers, body, form, json_body, params, follow_redirects, timeout
+        )
+        output = await result.render()
+        await check_output(output, "http_request", exclude=f"{url} {headers} {body} {form} {json_body} {params}")
+        await record_request(result, form or json_body)
+        return await process_tool_output(output, "http")
+    except FlagCaptured:
+        raise
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error sending HTTP request: {type(e).__name__}: {str(e)}"
+
+
+@tool
+async def batch_probe(
+    url: str,
+    values: Optional[List[str]] = None,
+    ranges: Optional[List[str]] = None,
+    encodings: Optional[List[str]] = None,
+    method: str = "GET",
+    headers: Optional[Union[str, Dict[str, str]]] = None,
+    body: Optional[str] = None,
+    form: Optional[Dict[str, Any]] = None,
+    json_body: Optional[Any] = None,
+    separator: str = ":",
+    follow_redirects: bool = False,
+) -> str:
+    """
+    Send one request template for many values at once (IDOR/ID sweeps, parameter and
+    path fuzzing, credential pairs) and get back only what stands out. Use this instead
+    of calling http_request in a loop. Requests run concurrently (a few at a time per
+    target) with the same cookies as http_request; responses are clustered by status,
+    redirect target and body (with the value itself masked), and only the responses
+    outside the largest cluster are shown.
+
+    Put {{value}} wherever the value goes: in the url, headers, body, form or json_body.
+    For values holding several parts, e.g. "admin:admin", {{value.0}} and {{value.1}}
+    are the parts split on `separator`.
+
+    Args:
+        url: Absolute URL or path relative to the target, e.g. "/api/users/{{value}}".
+        values: Literal values, e.g. ["admin", "guest", "../etc/passwd"].
+        ranges: Integer ranges "start-end" or "start-end:step"; "001-100" keeps the padding.
+        encodings: Send every value in each of these forms instead of raw: raw, url,
+            double_url, base64, hex, md5, sha1.
+        method: HTTP method.
+        headers: Extra headers, as a dict or raw "Name: value" lines.
+        body: Raw request body.
+        form: Form fields, sent as application/x-www-form-urlencoded.
+        json_body: Value sent as a JSON body.
+        separator: Separator for {{value.N}}.
+        follow_redirects: Follow redirects before comparing responses.
+
+    Returns:
+        The response clusters with sample values, the outlying responses with a
+        text excerpt, and an artifact with the status/size of every value.
+    """
+    try:
+        candidates = expand_values(values or [], ranges or [], encodings or [])
+        if not candidates:
+            return "Error running batch probe: give values and/or ranges"
+        print(f"HTTP probe {method} {url} x {len(candidates)}")
+        output = await run_probe(
+            get_target_session(), url, candidates, method, headers, body, form, json_body, separator, follow_redirects
+        )
+        return await process_tool_output(output, "http")
+    except FlagCaptured:
+        raise
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error running batch probe: {type(e).__name__}: {str(e)}"
+
+
+@tool
+async def crawl_site(
+    start: Optional[List[str]] = None,
+    base_url: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    refresh: bool = False,
+) -> str:
+    """
+    Crawl the target web application and add what it finds to the shared site map:
+    pages, links, forms with their fields, query parameters, redirects, robots.txt and
+    sitemap.xml entries, and API paths referenced from JavaScript. Only GET requests are
+    sent (forms are recorded, not submitted; logout links are not followed), with the
+    same cookies as http_request, so crawl again after logging in to map the
+    authenticated area. Pages crawled before are skipped unless refresh is set.
+
+    Args:
+        start: Paths or URLs to start from (default ["/"]).
+        base_url: Web service to crawl, e.g. "http://10.0.0.5:8080" (default: the target).
+        max_depth: Links to follow away from the start pages (default 3).
+        max_pages: Pages to fetch at most (default 150).
+        refresh: Fetch pages again even if an earlier crawl already did.
+
+    Returns:
+        The number of pages fetched and the endpoints found that were not in the site map.
+        Query everything with site_map.
+    """
+    try:
+        base = base_url or default_base_url()
+        if not base:
+            return "Error crawling: no target to crawl; pass base_url"
+        print(f"Crawl {base}")
+        report = await crawl(get_target_session(), base, start or ["/"], max_depth, max_pages, refresh)
+        entries = {entry["url"]: entry for entry in await query_site_map()}
+        lines = [
+            f"Crawled {report.fetched} pages of {report.base_url} in {report.elapsed:.1f}s"
+            f"{f' ({report.stopped})' if report.stopped else ''}; "
+            f"{len(report.new)} new endpoints, {len(entries)} in the site map."
+        ]
+        lines.extend(describe(entries[url]) for url in report.new if url in entries)
+        return await process_tool_output("\n".join(lines), "crawl")
+    except FlagCaptured:
+        raise
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error crawling: {type(e).__name__}: {str(e)}"
+
+
+@tool
+async def site_map(
+    pattern: Optional[str] = None,
+    param: Optional[str] = None,
+    method: Optional[str] = None,
+    limit: int = 100,
+) -> str:
+    """
+    Look up endpoints in the target's site map, which is filled by crawl_site, by
+    reconnaissance and by every http_request. Use it before exploring by hand to see
+    which URLs, methods and parameters are already known.
+
+    Args:
+        pattern: Regular expression matched against the URL, e.g. "api|admin" or "\\.php$".
+        param: Only endpoints taking a parameter whose name contains this, e.g. "id".
+        method: Only endpoints accepting this method, e.g. "POST".
+        limit: Maximum number of endpoints listed.
+
+    Returns:
+        One line per endpoint: methods, URL, parameter names, the status of fetching it,
+        content type and title, and where it was found.
+    """
+    try:
+        entries = await query_site_map(pattern, param, method)
+        if not entries:
+            return "No matching endpoints in the site map; run crawl_site to build it."
+        lines = [f"{len(entries)} matching endpoints" + (f", first {limit}:" if len(entries) > limit else ":")]
+        lines.extend(describe(entry) for entry in entries[:limit])
+        return "\n".join(lines)
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error reading the site map: {type(e).__name__}: {str(e)}"
+
+
+@tool
+async def search_traffic(
+    query: Optional[str] = None,
+    url: Optional[str] = None,
+    method: Optional[str] = None,
+    status: Optional[int] = None,
+    source: Optional[str] = None,
+    limit: int = 20,
+) -> str:
+    """
+    Search the HTTP traffic already exchanged with the target, newest first, instead
+    of sending a request again just to look at its response. Everything is recorded:
+    http_request, batch_probe, crawl_site, reconnaissance, and curl, wget or Python
+    requests run through run_bash, run_ipython or start_job (plain HTTP goes through a
+    recording proxy set in HTTP_PROXY; HTTPS through it is tunnelled and not readable).
+    Open a full exchange with get_response.
+
+    Args:
+        query: Full-text search over URLs, headers and bodies, e.g. "password", "flag",
+            "set-cookie admin" or a quoted phrase.
+        url: Only URLs containing this text, e.g. "/api/".
+        method: Only this method, e.g. "POST".
+        status: Only this status code, e.g. 500.
+        source: Only traffic from "http_request", "batch_probe", "crawler", "prerecon" or "proxy".
+        limit: Maximum number of exchanges listed.
+
+    Returns:
+        One line per exchange: id, time, method, URL, status, type, size, source, and
+        for full-text searches the matching text.
+    """
+    try:
+        rows = await get_traffic_log().search(query, url, method, status, source, limit)
+        if not rows:
+            return "No recorded traffic matches."
+        lines = []
+        for row in rows:
+            outcome = row["error"] or f"{row['status']} {row['content_type']} {row['length']} bytes"
+            line = (
+                f"#{row['id']} {time.strftime('%H:%M:%S', time.localtime(row['time']))} "
+                f"{row['method']} {row['url']} -> {outcome}, {row['elapsed_ms']} ms [{row['source']}]"
+            )
+            if row["snippet"]:
+                line += "\n    " + " ".join(row["snippet"].split())
+            lines.append(line)
+        return "\n".join(lines)
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error searching traffic: {type(e).__name__}: {str(e)}"
+
+
+@tool
+async def get_response(exchange_id: int, include_request: bool = False) -> str:
+    """
+    Show a recorded exchange from search_traffic without sending anything: the
+    response like `curl -i` (status, headers, body), optionally preceded by the request.
+    Large HTML responses come back as a digest with the full text saved as an artifact.
+
+    Args:
+        exchange_id: The number shown by search_traffic (without the #).
+        include_request: Also show the request headers and body.
+
+    Returns:
+        The recorded response (and request).
+    """
+    try:
+        row = await get_traffic_log().get(int(exchange_id))
+        if row is None:
+            return f"Error reading exchange: no exchange #{exchange_id}"
+        lines = [f"[#{row['id']} {row['method']} {row['url']} ({row['source']}, {row['elapsed_ms']} ms)]"]
+        if include_request:
+            lines.extend([row["request_headers"], ""])
+            if row["request_body"]:
+                lines.extend([bytes(row["request_body"]).decode(errors="replace"), ""])
+        if row["error"]:
+            lines.append(f"[No response: {row['error']}]")
+            return "\n".join(lines)
+        body = bytes(row["response_body"] or b"")
+        lines.extend([f"HTTP {row['status']}", row["response_headers"], ""])
+        if b"\x00" in body[:4096]:
+            path = await save_artifact(body, "http-body")
+            kind = row["content_type"] or "unknown type"
+            lines.append(f"[binary body ({kind}), {len(body)} bytes saved as {path}]")
+        else:
+            lines.append(body.decode(errors="replace"))
+        return await process_tool_output("\n".join(lines), "http")
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error reading exchange: {type(e).__name__}: {str(e)}"
 
 
 @tool
-def submit_answer(challenge_code: str, answer: str) -> str:
+async def read_artifact(
+    handle: str,
+    pattern: Optional[str] = None,
+    start_line: int = 1,
+    end_line: Optional[int] = None,
+    context: int = 0,
+) -> str:
+    """
+    Read part of a saved tool-output artifact instead of re-running the command.
+
+    Args:
+        handle: The artifact path (or file name) reported in the truncated output.
+        pattern: Optional regex; only matching lines (with line numbers) are returned.
+        start_line: First line to consider (1-based).
+        end_line: Last line to consider (inclusive); defaults to the end of the file.
+        context: Lines of context to include around each match.
+
+    Returns:
+        The selected lines, prefixed with their line numbers.
+    """
+    try:
+        return await asyncio.to_thread(read_artifact_text, handle, pattern, start_line, end_line, context)
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error reading artifact: {str(e)}"
+
+
+@tool
+async def submit_answer(challenge_code: str, answer: str) -> str:
     """
     Submit an answer for a challenge.
     If returned 429, retry again after 1 second.
@@ -113,29 +566,21 @@ def submit_answer(challenge_code: str, answer: str) -> str:
     Returns:
         A string describing the result of the submission.
     """
-    return asyncer.runnify(_submit_answer_async)(challenge_code, answer)
-
-
-async def _get_hint_async(challenge_code: str) -> str:
-    """Async implementation of get_hint."""
     try:
+        print(f"Submitting answer for challenge {challenge_code}: {answer}")
         async with ProblemAPIClient() as client:
-            response: HintResponse = await client.get_hint(challenge_code)
-            hint_intro = (
-                "First time using this hint."
-                if response.first_use
-                else "Hint was previously viewed."
-            )
-            return (
-                f"{hint_intro} Penalty: {response.penalty_points} points. "
-                f"Hint content: {response.hint_content}"
-            )
+            response: AnswerResponse = await client.submit_answer(challenge_code, answer)
+
+            if response.correct:
+                return f"Correct! Earned {response.earned_points} points. Challenge is {'solved' if response.is_solved else 'not yet fully solved'}."
+            else:
+                return f"Incorrect answer. Challenge is {'solved' if response.is_solved else 'not solved'}."
     except Exception as e:  # pylint: disable=broad-except
-        return f"Error retrieving hint: {str(e)}"
+        return f"Error submitting answer: {str(e)}"
 
 
 @tool
-def get_hint(challenge_code: str) -> str:
+async def get_hint(challenge_code: str) -> str:
     """
     Retrieve a hint for the specified challenge.
     (NOTE THAT GET HINT WILL BE PENALIZED, DON'T USE IT UNLESS WE HAVE NO CLUE!)
@@ -147,27 +592,34 @@ def get_hint(challenge_code: str) -> str:
     Returns:
         A string summarizing the hint content and penalty information.
     """
-    return asyncer.runnify(_get_hint_async)(challenge_code)
+    try:
+        async with ProblemAPIClient() as client:
+            response: HintResponse = await client.get_hint(challenge_code)
+            hint_intro = (
+                "First time using this hint."
+                if response.first_use
+                else "Hint was previously viewed."
+            )
+            return (
+                f"{hint_intro} Penalty: {response.penalty_points} points. "
+                f"Hint content: {response.hint_content}"
+            )
+    except Exception as e:  # pylint: disable=broad-except
+        return f"Error retrieving hint: {str(e)}"
 
 
 if __name__ == "__main__":
-    from src.settings import settings
-    from langchain_openai import ChatOpenAI
     from langchain.agents import create_agent
     from langchain_core.messages import HumanMessage
 
-    llm = ChatOpenAI(
-        api_key=settings.API_KEY,
-        base_url=settings.API_BASE,
-        model=settings.MODEL,
-        max_retries=5,
-    )
+    from src.llm import get_chat_model
+
     agent = create_agent(
-        llm,
+        get_chat_model(),
         tools=[submit_answer],
         system_prompt="Submit the answer to the challenge. (anything works! this is for debugging)",
     )
-    result = agent.invoke(
+    result = asyncio.run(agent.ainvoke(
         {
             "messages": [
                 HumanMessage(
@@ -175,5 +627,5 @@ if __name__ == "__main__":
                 )
             ]
         }
-    )
+    ))
     print(result)
@@ -0,0 +1,23 @@
+"""Direct access to the challenge's web targets."""
+
+from .client import HTTPResult, close_web_clients, get_target_session
+from .crawler import crawl, default_base_url, describe, query_site_map, record_request
+from .probe import expand_values, run_probe
+from .proxy import close_proxies, proxy_env
+from .traffic import get_traffic_log
+
+__all__ = [
+    "HTTPResult",
+    "close_proxies",
+    "close_web_clients",
+    "crawl",
+    "default_base_url",
+    "describe",
+    "expand_values",
+    "get_target_session",
+    "get_traffic_log",
+    "proxy_env",
+    "query_site_map",
+    "record_request",
+    "run_probe",
+]
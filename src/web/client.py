@@ -0,0 +1,261 @@
+"""Pooled HTTP client per challenge for talking to web targets without curl."""
+
+import asyncio
+import os
+import time
+from http.cookiejar import LoadError, MozillaCookieJar
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from src.memory.context import get_current_state
+from src.output.artifacts import save_artifact
+from src.runtime.shell import workspace
+from src.settings import settings
+from src.web.proxy import close_proxies
+from src.web.traffic import TrafficLog, close_traffic_logs, get_traffic_log
+
+# Netscape-format jar in the artifact directory, shared with curl -b/-c
+COOKIE_FILE = "cookies.txt"
+TEXT_TYPES = ("text/", "json", "xml", "javascript", "html", "x-www-form-urlencoded")
+
+HeaderInput = Union[str, Mapping[str, str], Sequence[Tuple[str, str]], None]
+
+
+class CurlCookieJar(MozillaCookieJar):
+    """Netscape cookie file that round-trips session cookies with curl.
+
+    curl writes session cookies with an expiry of ``0`` and ignores lines
+    with an empty one, while ``MozillaCookieJar`` does the opposite.
+    """
+
+    def load(
+        self, filename: Optional[str] = None, ignore_discard: bool = False, ignore_expires: bool = False
+    ) -> None:
+        super().load(filename, ignore_discard, ignore_expires)
+        for cookie in self:
+            if cookie.expires == 0:
+                cookie.expires, cookie.discard = None, True
+
+    def save(
+        self, filename: Optional[str] = None, ignore_discard: bool = False, ignore_expires: bool = False
+    ) -> None:
+        session = [cookie for cookie in self if cookie.expires is None]
+        for cookie in session:
+            cookie.expires = 0
+        try:
+            super().save(filename, ignore_discard, ignore_expires)
+        finally:
+            for cookie in session:
+                cookie.expires = None
+
+
+def parse_headers(headers: HeaderInput) -> List[Tuple[str, str]]:
+    """Headers as ordered ``(name, value)`` pairs; a string is read as raw ``Name: value`` lines."""
+    if not headers:
+        return []
+    if isinstance(headers, str):
+        pairs = []
+        for line in headers.splitlines():
+            name, sep, value = line.partition(":")
+            if sep and name.strip():
+                pairs.append((name.strip(), value.strip()))
+        return pairs
+    if isinstance(headers, Mapping):
+        return [(str(name), str(value)) for name, value in headers.items()]
+    return [(str(name), str(value)) for name, value in headers]
+
+
+def target_base_url(state: Optional[Mapping[str, Any]]) -> str:
+    """``http(s)://ip:port`` of the challenge's first target, or ``""`` if it has none."""
+    targets = (state or {}).get("target") or []
+    if not targets:
+        return ""
+    target = targets[0]
+    ip = target.get("ip") if isinstance(target, Mapping) else getattr(target, "ip", None)
+    port = target.get("port") if isinstance(target, Mapping) else getattr(target, "port", None)
+    scheme = "https" if port in (443, 8443) else "http"
+    return f"{scheme}://{ip}:{port}" if port else f"{scheme}://{ip}"
+
+
+class TargetSession:
+    """Keep-alive connections and a persistent cookie jar for one challenge.
+
+    Relative URLs resolve against the first target. The cookie jar is the
+    ``cookies.txt`` file in the artifact directory: it is reloaded when
+    something else (e.g. ``curl -c``) changed it and saved after every
+    request, so cookies are shared between this client and the shell. Every
+    exchange is recorded in the challenge's traffic log.
+    """
+
+    def __init__(self, cwd: str, base_url: str, log: Optional[TrafficLog] = None):
+        self.log = log
+        self.jar = CurlCookieJar(os.path.join(cwd, COOKIE_FILE))
+        self._jar_mtime = 0.0
+        self._load_jar()
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            cookies=self.jar,
+            verify=settings.HTTP_VERIFY_TLS,
+            trust_env=False,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=min(10.0, settings.HTTP_TIMEOUT)),
+        )
+        # Caps the requests of batch probes in flight against this target
+        self.probe_slots = asyncio.Semaphore(settings.HTTP_PROBE_CONCURRENCY)
+
+    def _load_jar(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.jar.filename)
+        except OSError:
+            return
+        if mtime > self._jar_mtime:
+            try:
+                self.jar.load(ignore_discard=True, ignore_expires=True)
+            except (LoadError, OSError) as e:
+                print(f"[HTTP] Could not load {self.jar.filename}: {e}")
+            self._jar_mtime = mtime
+
+    def _save_jar(self) -> None:
+        try:
+            self.jar.save(ignore_discard=True, ignore_expires=True)
+            self._jar_mtime = os.path.getmtime(self.jar.filename)
+        except OSError as e:
+            print(f"[HTTP] Could not save {self.jar.filename}: {e}")
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: HeaderInput = None,
+        body: Optional[Union[str, bytes]] = None,
+        form: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        params: Optional[Mapping[str, Any]] = None,
+        follow_redirects: bool = False,
+        timeout: Optional[float] = None,
+        source: str = "http_request",
+    ) -> "HTTPResult":
+        self._load_jar()
+        request = self.client.build_request(
+            method.upper(),
+            url,
+            headers=parse_headers(headers),
+            content=body.encode() if isinstance(body, str) else body,
+            data=form,
+            json=json,
+            params=params,
+            timeout=timeout or httpx.USE_CLIENT_DEFAULT,
+        )
+        started = time.monotonic()
+        try:
+            response = await self.client.send(request, follow_redirects=follow_redirects, stream=True)
+        except httpx.HTTPError as e:
+            self._record(source, request, None, b"", time.monotonic() - started, f"{type(e).__name__}: {e}")
+            raise
+        try:
+            content = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                content += chunk
+                if len(content) > settings.HTTP_MAX_BODY_BYTES:
+                    del content[settings.HTTP_MAX_BODY_BYTES :]
+                    truncated = True
+                    break
+        finally:
+            await response.aclose()
+        self._save_jar()
+        elapsed = time.monotonic() - started
+        for hop in response.history:
+            self._record(source, hop.request, hop, b"", elapsed)
+        self._record(source, response.request, response, bytes(content), elapsed)
+        return HTTPResult(response, bytes(content), elapsed, truncated)
+
+    def _record(
+        self,
+        source: str,
+        request: httpx.Request,
+        response: Optional[httpx.Response],
+        content: bytes,
+        elapsed: float,
+        error: str = "",
+    ) -> None:
+        if self.log is None:
+            return
+        # The body was decoded while reading, so its content encoding no longer applies
+        headers = [
+            (name, value) for name, value in (response.headers.multi_items() if response is not None else [])
+            if name.lower() != "content-encoding"
+        ]
+        try:
+            self.log.record(
+                source, request.method, str(request.url), response.status_code if response is not None else None,
+                request.headers.multi_items(), request.content, headers, content, elapsed, error,
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"[HTTP] Could not record {request.url}: {e}")
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class HTTPResult:
+    """A response with its body, rendered like ``curl -i`` (every hop of a redirect chain)."""
+
+    def __init__(self, response: httpx.Response, content: bytes, elapsed: float, truncated: bool):
+        self.response = response
+        self.content = content
+        self.elapsed = elapsed
+        self.truncated = truncated
+
+    async def body_text(self) -> str:
+        content_type = self.response.headers.get("content-type", "").lower()
+        textual = any(kind in content_type for kind in TEXT_TYPES) or not content_type
+        if not textual or b"\x00" in self.content[:4096]:
+            path = await save_artifact(self.content, "http-body")
+            return f"[binary body ({content_type or 'unknown type'}), {len(self.content)} bytes saved as {path}]"
+        text = self.content.decode(self.response.encoding or "utf-8", errors="replace")
+        if self.truncated:
+            text += f"\n[... body cut at {len(self.content)} bytes ...]"
+        return text
+
+    async def render(self) -> str:
+        final = self.response
+        lines = [
+            f"[{final.request.method} {final.request.url} -> {final.status_code} in "
+            f"{self.elapsed * 1000:.0f} ms, {len(self.content)} bytes"
+            f"{f', {len(final.history)} redirects' if final.history else ''}]"
+        ]
+        for hop in [*final.history, final]:
+            lines.append(f"{hop.http_version} {hop.status_code} {hop.reason_phrase}")
+            lines.extend(f"{name}: {value}" for name, value in hop.headers.multi_items())
+            lines.append("")
+        lines.append(await self.body_text())
+        return "\n".join(lines)
+
+
+_sessions: Dict[str, TargetSession] = {}
+
+
+def get_target_session(state: Optional[dict] = None) -> TargetSession:
+    """The HTTP session of the current challenge."""
+    if state is None:
+        state = get_current_state(optional=True)
+    key, cwd = workspace(state)
+    if key not in _sessions or _sessions[key].client.is_closed:
+        _sessions[key] = TargetSession(cwd, target_base_url(state), get_traffic_log(state))
+    return _sessions[key]
+
+
+async def close_web_clients(challenge_code: Optional[str] = None) -> None:
+    """Close the HTTP sessions, recording proxies and traffic logs of one challenge, or all of them."""
+    keys = [challenge_code] if challenge_code else list(_sessions)
+    for key in keys:
+        session = _sessions.pop(key, None)
+        if session is not None:
+            await session.aclose()
+    await close_proxies(challenge_code)
+    await close_traffic_logs(challenge_code)
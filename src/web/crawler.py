@@ -0,0 +1,382 @@
+"""Site map of each target, built by crawling and kept in the LangGraph store.
+
+Every endpoint (origin plus path) is one store item under the
+``("scout", <target>, "sitemap")`` namespace, holding the methods and
+parameter names seen for it, where it was found (link, form, script,
+robots.txt, sitemap.xml, an agent's own request) and what fetching it
+returned. Crawls are incremental: pages already fetched are skipped unless a
+refresh is asked for, and endpoints found but not yet fetched (because of
+the depth or page limits) are picked up by the next crawl.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urljoin, urlsplit
+
+from langgraph.config import get_store
+from langgraph.store.base import BaseStore
+from langgraph.store.memory import InMemoryStore
+
+from src.memory.context import get_current_state, get_current_store
+from src.memory.utils import memory_namespace
+from src.output.flags import check_output
+from src.settings import settings
+from src.web.client import HTTPResult, TargetSession, target_base_url
+
+TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+LINK = re.compile(r"(?:href|src|action)=[\"']([^\"'#]+)", re.I)
+FORM = re.compile(r"<form\b([^>]*)>(.*?)</form>", re.I | re.S)
+ATTRIBUTE = re.compile(r"(\w+)=[\"']([^\"']*)", re.I)
+INPUT = re.compile(r"<(?:input|textarea|select|button)\b[^>]*\bname=[\"']([^\"']+)", re.I)
+SCRIPT = re.compile(r"<script\b[^>]*>(.*?)</script>", re.I | re.S)
+# Quoted absolute paths in JavaScript, e.g. fetch("/api/users?id=") or url: '/admin/stats'
+JS_PATH = re.compile(r"[\"'`](/[A-Za-z0-9_\-][A-Za-z0-9_\-./{}:$?=&%]*)[\"'`]")
+JS_CALL = re.compile(r"\b(?:axios|\$|http|api)\.(get|post|put|patch|delete)\(\s*[\"'`]([^\"'`]+)", re.I)
+ROBOTS_PATH = re.compile(r"^\s*(?:dis)?allow\s*:\s*(\S+)", re.I | re.M)
+SITEMAP_LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+# Recorded but never fetched
+STATIC = re.compile(r"\.(?:png|jpe?g|gif|ico|svg|webp|css|woff2?|ttf|eot|map|pdf|zip|gz|tar|mp4|mp3)$", re.I)
+LOGOUT = re.compile(r"log-?out|sign-?out", re.I)
+
+# Only for callers outside a graph run (scripts, tests); graph nodes share the graph's store
+_fallback_store = InMemoryStore()
+
+
+def _store() -> BaseStore:
+    """The graph's store, or a process-wide one outside a graph run."""
+    store = get_current_store(optional=True)
+    if store is not None:
+        return store
+    try:
+        store = get_store()
+    except RuntimeError:
+        return _fallback_store
+    if store is None:
+        raise RuntimeError("The graph was compiled without a store; the site map needs one")
+    return store
+
+
+def _namespace(state: Optional[dict]) -> Tuple[str, ...]:
+    return memory_namespace(state if state is not None else get_current_state(optional=True), "sitemap")
+
+
+def _split(url: str) -> Tuple[str, str, List[str]]:
+    """``(origin, path, query parameter names)`` of an absolute URL."""
+    parts = urlsplit(url)
+    names = [name for name, _ in parse_qsl(parts.query, keep_blank_values=True)]
+    return f"{parts.scheme}://{parts.netloc}", parts.path or "/", names
+
+
+def _merge(entry: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(entry)
+    for name in ("methods", "params", "sources"):
+        merged[name] = sorted(set(entry.get(name, [])) | set(update.get(name, [])))
+    for name, value in update.items():
+        if name in ("methods", "params", "sources"):
+            continue
+        if name == "depth" and entry.get("depth") is not None:
+            value = min(entry["depth"], value)
+        if name == "found_on" and entry.get("found_on"):
+            continue
+        if name == "crawled":
+            value = bool(value or entry.get("crawled"))
+        if value not in (None, ""):
+            merged[name] = value
+    merged["updated_at"] = datetime.now(timezone.utc).isoformat()
+    return merged
+
+
+class SiteIndex:
+    """Endpoints of one target, read from and written back to the store in batches."""
+
+    def __init__(self, store: BaseStore, namespace: Tuple[str, ...]):
+        self.store = store
+        self.namespace = namespace
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+
+    async def load(self) -> "SiteIndex":
+        offset = 0
+        while True:
+            items = await self.store.asearch(self.namespace, limit=500, offset=offset)
+            for item in items:
+                self.entries[item.key] = item.value
+            if len(items) < 500:
+                return self
+            offset += len(items)
+
+    def note(
+        self,
+        url: str,
+        source: str,
+        method: str = "GET",
+        params: Iterable[str] = (),
+        **fields: Any,
+    ) -> bool:
+        """Record an endpoint; returns True if it was not known before."""
+        origin, path, query = _split(url)
+        key = origin + path
+        new = key not in self.entries
+        update = {
+            "url": key,
+            "path": path,
+            "methods": [method.upper()],
+            "params": [*query, *params],
+            "sources": [source],
+            **fields,
+        }
+        self.entries[key] = _merge(self.entries.get(key, {"crawled": False}), update)
+        self._dirty.add(key)
+        return new
+
+    async def save(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            # Re-read so entries written meanwhile by another request are merged, not replaced
+            stored = await self.store.aget(self.namespace, key)
+            value = _merge(stored.value, self.entries[key]) if stored else self.entries[key]
+            self.entries[key] = value
+            await self.store.aput(self.namespace, key, value, index=False)
+
+
+def _parse_html(index: SiteIndex, url: str, text: str, depth: int) -> List[str]:
+    """Record the links, forms and script endpoints of a page; returns the URLs to visit."""
+    found = []
+    origin = _split(url)[0]
+    for link in LINK.findall(text):
+        absolute = urljoin(url, link.strip())
+        # Other sites are not part of this target's map
+        if _split(absolute)[0] == origin:
+            index.note(absolute, "link", found_on=url, depth=depth)
+            found.append(absolute)
+    for attributes, inner in FORM.findall(text):
+        attrs = {name.lower(): value for name, value in ATTRIBUTE.findall(attributes)}
+        action = urljoin(url, attrs.get("action") or url)
+        method = attrs.get("method", "GET").upper()
+        index.note(action, "form", method, INPUT.findall(inner), found_on=url, depth=depth)
+        if method == "GET":
+            found.append(action)
+    for script in SCRIPT.findall(text):
+        found.extend(_parse_js(index, url, script, depth))
+    return found
+
+
+def _parse_js(index: SiteIndex, url: str, text: str, depth: int) -> List[str]:
+    found = []
+    for method, path in JS_CALL.findall(text):
+        absolute = urljoin(url, path.split("${")[0])
+        index.note(absolute, "js", method, found_on=url, depth=depth)
+    for path in JS_PATH.findall(text):
+        if path.startswith("//") or " " in path:
+            continue
+        absolute = urljoin(url, path.split("${")[0])
+        index.note(absolute, "js", found_on=url, depth=depth)
+        found.append(absolute)
+    return found
+
+
+class _Pacer:
+    """Spaces requests at most ``rate`` per second (0 disables)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        delay = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class CrawlReport:
+    base_url: str
+    fetched: int = 0
+    new: List[str] = field(default_factory=list)
+    # Why the crawl ended before running out of pages
+    stopped: str = ""
+    elapsed: float = 0.0
+
+
+async def crawl(
+    session: TargetSession,
+    base_url: str,
+    start: Iterable[str] = ("/",),
+    max_depth: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    refresh: bool = False,
+    state: Optional[dict] = None,
+) -> CrawlReport:
+    """Crawl ``base_url``'s origin breadth first from ``start`` and update the site map."""
+    max_depth = settings.CRAWL_MAX_DEPTH if max_depth is None else max_depth
+    max_pages = max_pages or settings.CRAWL_MAX_PAGES
+    index = await SiteIndex(_store(), _namespace(state)).load()
+    origin = _split(urljoin(base_url, "/"))[0]
+    report = CrawlReport(origin)
+    known = set(index.entries)
+    started = time.monotonic()
+
+    queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+    queued: Set[str] = set()
+
+    def enqueue(url: str, depth: int) -> None:
+        url = url.split("#")[0]
+        page = "".join(_split(url)[:2])
+        if (
+            depth > max_depth
+            or not url.startswith(origin + "/")
+            or page in queued
+            or STATIC.search(urlsplit(url).path)
+            or LOGOUT.search(url)
+            or (not refresh and index.entries.get(page, {}).get("crawled"))
+        ):
+            return
+        queued.add(page)
+        queue.put_nowait((url, depth))
+
+    for path in start:
+        enqueue(urljoin(origin + "/", path), 0)
+    enqueue(origin + "/robots.txt", 0)
+    enqueue(origin + "/sitemap.xml", 0)
+    # Endpoints an earlier crawl found but did not reach
+    for key, entry in index.entries.items():
+        if key.startswith(origin + "/") and not entry.get("crawled") and "GET" in entry.get("methods", []):
+            enqueue(key, entry.get("depth") or 0)
+
+    pacer = _Pacer(settings.CRAWL_RATE)
+
+    async def fetch(url: str, depth: int) -> None:
+        await pacer.wait()
+        try:
+            async with session.probe_slots:
+                result: HTTPResult = await session.request("GET", url, source="crawler")
+        except Exception as e:  # pylint: disable=broad-except
+            index.note(url, "crawl", crawled=True, status=f"error: {type(e).__name__}", depth=depth)
+            return
+        report.fetched += 1
+        text = result.content.decode(errors="replace")
+        await check_output(text, "crawler")
+        response = result.response
+        content_type = response.headers.get("content-type", "").split(";")[0]
+        title = TITLE.search(text)
+        index.note(
+            url, "crawl",
+            crawled=True,
+            status=response.status_code,
+            content_type=content_type,
+            title=" ".join(title.group(1).split())[:120] if title else "",
+            length=len(result.content),
+            depth=depth,
+        )
+        found: List[str] = []
+        if location := response.headers.get("location"):
+            target = urljoin(url, location)
+            index.note(target, "redirect", found_on=url, depth=depth + 1)
+            found.append(target)
+        if url.endswith("/robots.txt") and response.status_code == 200:
+            for path in ROBOTS_PATH.findall(text):
+                index.note(urljoin(url, path.replace("*", "")), "robots", found_on=url, depth=depth + 1)
+                found.append(urljoin(url, path.replace("*", "")))
+        elif url.endswith("/sitemap.xml") and response.status_code == 200:
+            for loc in SITEMAP_LOC.findall(text):
+                index.note(loc, "sitemap", found_on=url, depth=depth + 1)
+                found.append(loc)
+        elif "javascript" in content_type or urlsplit(url).path.endswith(".js"):
+            found.extend(_parse_js(index, url, text, depth + 1))
+        elif "html" in content_type or not content_type:
+            found.extend(_parse_html(index, url, text, depth + 1))
+        for link in found:
+            enqueue(link, depth + 1)
+
+    async def worker() -> None:
+        while True:
+            url, depth = await queue.get()
+            try:
+                if report.fetched < max_pages:
+                    await fetch(url, depth)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, settings.CRAWL_CONCURRENCY))]
+    drained = asyncio.ensure_future(queue.join())
+    try:
+        # Workers only finish by raising (a captured flag); that ends the crawl
+        done, _ = await asyncio.wait(
+            [drained, *workers], timeout=settings.CRAWL_TIME_BUDGET, return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            report.stopped = f"time budget of {settings.CRAWL_TIME_BUDGET:.0f}s reached"
+        for task in workers:
+            if task in done:
+                raise task.exception()
+    finally:
+        for task in [drained, *workers]:
+            task.cancel()
+        await asyncio.gather(drained, *workers, return_exceptions=True)
+        await index.save()
+    if report.fetched >= max_pages and not report.stopped:
+        report.stopped = f"page limit of {max_pages} reached"
+    report.new = [key for key in index.entries if key not in known]
+    report.elapsed = time.monotonic() - started
+    print(f"[Crawler] {origin}: {report.fetched} pages, {len(report.new)} new endpoints in {report.elapsed:.1f}s")
+    return report
+
+
+def describe(entry: Dict[str, Any]) -> str:
+    """One line per endpoint: methods, path, parameters, what fetching it returned and its sources."""
+    methods = ",".join(entry.get("methods", [])) or "GET"
+    params = f" ?{'&'.join(entry['params'])}" if entry.get("params") else ""
+    status = entry.get("status")
+    fetched = f" -> {status}" if status is not None else " (not fetched)"
+    details = [value for value in (entry.get("content_type"), entry.get("title") and repr(entry["title"])) if value]
+    if entry.get("length") is not None:
+        details.append(f"{entry['length']} bytes")
+    detail = f" [{', '.join(details)}]" if details else ""
+    return f"{methods} {entry.get('url', '')}{params}{fetched}{detail} from {'/'.join(entry.get('sources', []))}"
+
+
+async def query_site_map(
+    pattern: Optional[str] = None,
+    param: Optional[str] = None,
+    method: Optional[str] = None,
+    state: Optional[dict] = None,
+) -> List[Dict[str, Any]]:
+    """Endpoints whose URL matches the regex ``pattern``, that take ``param`` or accept ``method``."""
+    index = await SiteIndex(_store(), _namespace(state)).load()
+    regex = re.compile(pattern, re.I) if pattern else None
+    matches = []
+    for entry in sorted(index.entries.values(), key=lambda entry: entry.get("url", "")):
+        if regex is not None and not regex.search(entry.get("url", "")):
+            continue
+        if param and not any(param.lower() in name.lower() for name in entry.get("params", [])):
+            continue
+        if method and method.upper() not in entry.get("methods", []):
+            continue
+        matches.append(entry)
+    return matches
+
+
+async def record_request(result: HTTPResult, fields: Any = None, state: Optional[dict] = None) -> None:
+    """Add an endpoint an agent requested itself, with the form or JSON field names it sent."""
+    first = result.response.history[0] if result.response.history else result.response
+    index = SiteIndex(_store(), _namespace(state))
+    index.note(
+        str(first.request.url), "request", first.request.method,
+        list(fields) if isinstance(fields, dict) else [],
+        status=first.status_code,
+        content_type=first.headers.get("content-type", "").split(";")[0],
+    )
+    try:
+        await index.save()
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"[Crawler] Could not record {first.request.url}: {e}")
+
+
+def default_base_url(state: Optional[dict] = None) -> str:
+    return target_base_url(state if state is not None else get_current_state(optional=True))
@@ -0,0 +1,224 @@
+"""Concurrent request sweeps whose responses are clustered to surface outliers."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.output.artifacts import save_artifact
+from src.output.flags import check_output
+from src.settings import settings
+from src.web.client import HTTPResult, TargetSession, parse_headers
+
+PLACEHOLDER = re.compile(r"\{\{value(?:\.(\d+))?\}\}")
+RANGE = re.compile(r"^\s*(-?\d+)\s*-\s*(-?\d+)(?:\s*:\s*(\d+))?\s*$")
+TAG = re.compile(r"<[^>]*>")
+ENCODINGS = {
+    "raw": lambda value: value,
+    "url": lambda value: urllib.parse.quote(value, safe=""),
+    "double_url": lambda value: urllib.parse.quote(urllib.parse.quote(value, safe=""), safe=""),
+    "base64": lambda value: base64.b64encode(value.encode()).decode(),
+    "hex": lambda value: value.encode().hex(),
+    "md5": lambda value: hashlib.md5(value.encode()).hexdigest(),
+    "sha1": lambda value: hashlib.sha1(value.encode()).hexdigest(),
+}
+MAX_OUTLIERS = 20
+EXCERPT_CHARS = 500
+SAMPLE_VALUES = 5
+
+
+def expand_values(
+    values: Sequence[str] = (),
+    ranges: Sequence[str] = (),
+    encodings: Sequence[str] = (),
+    max_values: Optional[int] = None,
+) -> List[str]:
+    """Literal values plus ``"start-end[:step]"`` ranges, each in every requested encoding.
+
+    A range keeps the zero padding of its start (``"001-120"`` gives 001..120).
+    Raises ``ValueError`` before building more than ``max_values`` (default
+    ``HTTP_PROBE_MAX_REQUESTS``) variants.
+    """
+    max_values = settings.HTTP_PROBE_MAX_REQUESTS if max_values is None else max_values
+    variants = max(1, len(encodings))
+
+    def check(count: int) -> None:
+        if count * variants > max_values:
+            raise ValueError(f"{count * variants}+ values; at most {max_values} per call")
+
+    expanded = [str(value) for value in values]
+    check(len(expanded))
+    for spec in ranges:
+        match = RANGE.match(spec)
+        if not match:
+            raise ValueError(f"Bad range {spec!r}; use 'start-end' or 'start-end:step'")
+        start, end, step = int(match[1]), int(match[2]), int(match[3] or 1)
+        width = len(match[1].lstrip("-")) if match[1].lstrip("-").startswith("0") else 0
+        direction = 1 if end >= start else -1
+        numbers = range(start, end + direction, direction * max(1, step))
+        check(len(expanded) + len(numbers))
+        expanded.extend(str(number).zfill(width) for number in numbers)
+    unknown = [name for name in encodings if name not in ENCODINGS]
+    if unknown:
+        raise ValueError(f"Unknown encodings {unknown}; choose from {sorted(ENCODINGS)}")
+    if encodings:
+        expanded = [ENCODINGS[name](value) for value in expanded for name in encodings]
+    return list(OrderedDict.fromkeys(expanded))
+
+
+def substitute(template: Any, value: str, separator: str) -> Any:
+    """Replace ``{{value}}`` (or ``{{value.N}}``, the Nth ``separator``-split part) in ``template``."""
+    if isinstance(template, str):
+        parts = value.split(separator) if separator else [value]
+
+        def part(match: re.Match) -> str:
+            if match.group(1) is None:
+                return value
+            index = int(match.group(1))
+            return parts[index] if index < len(parts) else ""
+
+        return PLACEHOLDER.sub(part, template)
+    if isinstance(template, dict):
+        return {substitute(k, value, separator): substitute(v, value, separator) for k, v in template.items()}
+    if isinstance(template, (list, tuple)):
+        return [substitute(item, value, separator) for item in template]
+    return template
+
+
+@dataclass
+class Probe:
+    value: str
+    status: Any = None
+    length: int = 0
+    words: int = 0
+    location: str = ""
+    digest: str = ""
+    elapsed: float = 0.0
+    excerpt: str = ""
+    cluster: str = ""
+
+
+def _fingerprint(probe: Probe, result: HTTPResult, value: str, separator: str) -> None:
+    response = result.response
+    text = result.content.decode(errors="replace")
+    probe.status = response.status_code
+    probe.length = len(result.content)
+    probe.words = len(text.split())
+    probe.elapsed = result.elapsed
+    probe.location = response.headers.get("location", "")
+    # Reflections of the probed value would make every response unique
+    normalised = text
+    parts = [part for part in value.split(separator) if len(part) > 1] if separator else []
+    for part in sorted({value, *parts}, key=len, reverse=True):
+        for form in {part, urllib.parse.quote(part, safe=""), urllib.parse.quote_plus(part)}:
+            if form:
+                normalised = normalised.replace(form, "\x00")
+    probe.digest = hashlib.sha1(normalised.encode(errors="replace")).hexdigest()[:10]
+    probe.location = probe.location.replace(value, "{{value}}") if value else probe.location
+    probe.excerpt = " ".join(TAG.sub(" ", text).split())[:EXCERPT_CHARS]
+
+
+def _cluster(probes: List[Probe]) -> "OrderedDict[tuple, List[Probe]]":
+    """Group by status, redirect target and normalised body; fall back to word counts when
+    (e.g. because of per-request tokens) nearly every body is different."""
+    keyed: "OrderedDict[tuple, List[Probe]]" = OrderedDict()
+    for probe in probes:
+        keyed.setdefault((probe.status, probe.location, probe.digest), []).append(probe)
+    if len(probes) > 5 and len(keyed) > len(probes) / 2:
+        keyed = OrderedDict()
+        for probe in probes:
+            keyed.setdefault((probe.status, probe.location, probe.words), []).append(probe)
+    return OrderedDict(sorted(keyed.items(), key=lambda item: -len(item[1])))
+
+
+async def run_probe(
+    session: TargetSession,
+    url: str,
+    values: List[str],
+    method: str = "GET",
+    headers: Any = None,
+    body: Optional[str] = None,
+    form: Optional[Dict[str, Any]] = None,
+    json_body: Any = None,
+    separator: str = ":",
+    follow_redirects: bool = False,
+) -> str:
+    """Send the templated request once per value and report the clusters and their outliers."""
+    if len(values) > settings.HTTP_PROBE_MAX_REQUESTS:
+        raise ValueError(f"{len(values)} values; at most {settings.HTTP_PROBE_MAX_REQUESTS} per call")
+    template = {"url": url, "headers": parse_headers(headers), "body": body, "form": form, "json": json_body}
+    rendered = json.dumps(template, default=str)
+    if not PLACEHOLDER.search(rendered):
+        raise ValueError("Put {{value}} (or {{value.0}}, {{value.1}} for split values) in the request")
+
+    async def one(value: str) -> Probe:
+        request = substitute(template, value, separator)
+        probe = Probe(value)
+        async with session.probe_slots:
+            try:
+                result = await session.request(
+                    method, request["url"], request["headers"], request["body"], request["form"],
+                    request["json"], follow_redirects=follow_redirects, source="batch_probe",
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                probe.status, probe.digest = f"error:{type(e).__name__}", ""
+                probe.excerpt = str(e)[:EXCERPT_CHARS]
+                return probe
+        _fingerprint(probe, result, value, separator)
+        await check_output(result.content.decode(errors="replace"), "batch_probe", exclude=f"{value} {rendered}")
+        return probe
+
+    started = time.monotonic()
+    tasks = [asyncio.ensure_future(one(value)) for value in values]
+    try:
+        probes = await asyncio.gather(*tasks)
+    except BaseException:
+        # A captured flag (or cancellation) ends the sweep; drop the requests still queued
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    elapsed = time.monotonic() - started
+
+    clusters = _cluster(list(probes))
+    lines = [
+        f"Sent {len(probes)} {method.upper()} requests for {url} in {elapsed:.1f}s "
+        f"({settings.HTTP_PROBE_CONCURRENCY} at a time); {len(clusters)} response clusters:"
+    ]
+    for index, ((status, location, _), members) in enumerate(clusters.items()):
+        label = chr(ord("A") + index) if index < 26 else f"#{index + 1}"
+        for probe in members:
+            probe.cluster = label
+        lengths = sorted(probe.length for probe in members)
+        size = f"{lengths[0]}" if lengths[0] == lengths[-1] else f"{lengths[0]}-{lengths[-1]}"
+        sample = ", ".join(repr(probe.value) for probe in members[:SAMPLE_VALUES])
+        more = f" +{len(members) - SAMPLE_VALUES} more" if len(members) > SAMPLE_VALUES else ""
+        redirect = f" -> {location}" if location else ""
+        baseline = " [baseline]" if index == 0 and len(clusters) > 1 else ""
+        lines.append(f"  {label}: {len(members)} x {status}{redirect}, {size} bytes: {sample}{more}{baseline}")
+
+    outliers = [probe for members in list(clusters.values())[1:] for probe in members]
+    if outliers:
+        lines.append(f"Outliers (everything outside cluster A), first {min(len(outliers), MAX_OUTLIERS)}:")
+        for probe in outliers[:MAX_OUTLIERS]:
+            lines.append(
+                f"--- {probe.value!r} [{probe.cluster}] {probe.status}, {probe.length} bytes, "
+                f"{probe.elapsed * 1000:.0f} ms\n{probe.excerpt}"
+            )
+    elif len(clusters) == 1:
+        first = probes[0]
+        lines.append(f"All responses alike; e.g. {first.value!r}: {first.excerpt[:200]}")
+
+    table = "\n".join(
+        f"{probe.value}\t{probe.cluster}\t{probe.status}\t{probe.length}\t{probe.words}\t{probe.digest}"
+        for probe in probes
+    )
+    path = await save_artifact(f"value\tcluster\tstatus\tbytes\twords\tdigest\n{table}\n".encode(), "probe")
+    lines.append(f"Per-value results saved as {path} (read_artifact can grep it).")
+    return "\n".join(lines)
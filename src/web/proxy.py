@@ -0,0 +1,221 @@
+"""Recording HTTP proxy for the tool processes of a challenge.
+
+Shells, kernels and background jobs get ``HTTP_PROXY``/``http_proxy``
+pointing at a proxy on 127.0.0.1 that forwards plain-HTTP requests and
+records each exchange in the challenge's traffic log. ``CONNECT`` (HTTPS
+through the proxy) is tunnelled without inspection; only the tunnel itself
+is recorded. Upstream requests go out through a bare httpx transport, so the
+proxy adds no cookies, redirects or decoding of its own.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from src.runtime.shell import workspace
+from src.settings import settings
+from src.web.traffic import TrafficLog, get_traffic_log
+
+# Meaningful for one connection only; never forwarded in either direction
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-connection", "proxy-authorization", "proxy-authenticate",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length",
+}
+MAX_HEAD_BYTES = 1 << 16
+
+
+class ProxyError(Exception):
+    pass
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: List[Tuple[str, str]]) -> bytes:
+    fields = {name.lower(): value for name, value in headers}
+    if "chunked" in fields.get("transfer-encoding", "").lower():
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Trailers, up to the empty line
+                while (await reader.readline()).strip():
+                    pass
+                return bytes(body)
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+    length = int(fields.get("content-length", "0") or 0)
+    return await reader.readexactly(length) if length else b""
+
+
+class RecordingProxy:
+    """Forward proxy for one challenge, listening on an ephemeral loopback port."""
+
+    def __init__(self, log: TrafficLog):
+        self.log = log
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.transport = httpx.AsyncHTTPTransport(
+            verify=settings.HTTP_VERIFY_TLS,
+            limits=httpx.Limits(max_connections=settings.HTTP_MAX_CONNECTIONS),
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> "RecordingProxy":
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0, limit=MAX_HEAD_BYTES)
+        print(f"[Proxy] Recording HTTP traffic on {self.url} into {self.log.path}")
+        return self
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        await self.transport.aclose()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await self._exchange(reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ProxyError):
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"[Proxy] Connection failed: {type(e).__name__}: {e}")
+        finally:
+            writer.close()
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Relay one request; returns whether the client connection stays open."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line, *lines = head.decode("latin-1").split("\r\n")
+        parts = request_line.split(" ")
+        if len(parts) != 3:
+            raise ProxyError(f"bad request line {request_line!r}")
+        method, target, version = parts
+        headers = [
+            (name.strip(), value.strip())
+            for name, _, value in (line.partition(":") for line in lines)
+            if name
+        ]
+        if method.upper() == "CONNECT":
+            await self._tunnel(target, reader, writer)
+            return False
+        body = await _read_body(reader, headers)
+        if not target.startswith(("http://", "https://")):
+            await self._reply(writer, 400, "Bad Request", [], b"xboo proxy: absolute URL expected\n")
+            return False
+
+        forwarded = [(name, value) for name, value in headers if name.lower() not in HOP_HEADERS]
+        request = httpx.Request(method, target, headers=forwarded, content=body)
+        request.extensions["timeout"] = httpx.Timeout(settings.SHELL_MAX_TIMEOUT, connect=10.0).as_dict()
+        started = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+            try:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            finally:
+                await response.aclose()
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {e}"
+            elapsed = time.monotonic() - started
+            self.log.record("proxy", method, target, None, forwarded, body, [], b"", elapsed, error)
+            await self._reply(writer, 502, "Bad Gateway", [], f"xboo proxy: {error}\n".encode())
+            return False
+
+        response_headers = list(response.headers.multi_items())
+        self.log.record(
+            "proxy", method, target, response.status_code, forwarded, body, response_headers, raw,
+            time.monotonic() - started,
+        )
+        keep_alive = version == "HTTP/1.1" and not any(
+            name.lower() in ("connection", "proxy-connection") and value.lower() == "close"
+            for name, value in headers
+        )
+        reason = response.extensions.get("reason_phrase", b"").decode("latin-1") or "OK"
+        passed = [(name, value) for name, value in response_headers if name.lower() not in HOP_HEADERS]
+        if method.upper() == "HEAD":
+            passed += [(name, value) for name, value in response_headers if name.lower() == "content-length"]
+            raw = b""
+        await self._reply(
+            writer, response.status_code, reason, passed, raw, keep_alive, method.upper() != "HEAD"
+        )
+        return keep_alive
+
+    async def _reply(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        reason: str,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        keep_alive: bool = False,
+        with_length: bool = True,
+    ) -> None:
+        lines = [f"HTTP/1.1 {status} {reason}", *(f"{name}: {value}" for name, value in headers)]
+        if with_length:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _tunnel(self, target: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        host, _, port = target.rpartition(":")
+        started = time.monotonic()
+        try:
+            upstream_reader, upstream_writer = await asyncio.wait_for(
+                asyncio.open_connection(host.strip("[]"), int(port)), 10
+            )
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            elapsed = time.monotonic() - started
+            self.log.record("proxy", "CONNECT", target, None, [], b"", [], b"", elapsed, str(e))
+            await self._reply(writer, 502, "Bad Gateway", [], b"")
+            return
+        self.log.record("proxy", "CONNECT", target, 200, [], b"", [], b"", time.monotonic() - started)
+        writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        await writer.drain()
+
+        async def pipe(source: asyncio.StreamReader, sink: asyncio.StreamWriter) -> None:
+            try:
+                while chunk := await source.read(1 << 16):
+                    sink.write(chunk)
+                    await sink.drain()
+            except ConnectionError:
+                pass
+            finally:
+                sink.close()
+
+        await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+
+
+_proxies: Dict[str, RecordingProxy] = {}
+_starting: Dict[str, asyncio.Lock] = {}
+
+
+async def proxy_env(state: Optional[dict] = None) -> Dict[str, str]:
+    """Environment for tool processes of the current challenge: its recording proxy, started on first use.
+
+    Empty when ``TRAFFIC_PROXY`` is off or the proxy could not start.
+    """
+    if not settings.TRAFFIC_PROXY:
+        return {}
+    key, _ = workspace(state)
+    async with _starting.setdefault(key, asyncio.Lock()):
+        if key not in _proxies:
+            try:
+                _proxies[key] = await RecordingProxy(get_traffic_log(state)).start()
+            except OSError as e:
+                print(f"[Proxy] Could not start the recording proxy: {e}")
+                return {}
+    url = _proxies[key].url
+    return {"HTTP_PROXY": url, "http_proxy": url}
+
+
+async def close_proxies(challenge_code: Optional[str] = None) -> None:
+    """Stop the proxy of one challenge, or every proxy when none is given."""
+    keys = [challenge_code] if challenge_code else list(_proxies)
+    for key in keys:
+        _starting.pop(key, None)
+        proxy = _proxies.pop(key, None)
+        if proxy is not None:
+            await proxy.close()
@@ -0,0 +1,236 @@
+"""Searchable record of the HTTP traffic sent to a challenge's targets.
+
+Every exchange (from ``http_request``, ``batch_probe``, the crawler, or any
+tool process going through the recording proxy) is one row of the
+``traffic.sqlite`` database in the artifact directory, with the request and
+response text also indexed for SQLite FTS5 full-text search.
+"""
+
+import asyncio
+import gzip
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.runtime.shell import workspace
+from src.settings import settings
+
+TRAFFIC_FILE = "traffic.sqlite"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS traffic (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    source TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER,
+    request_headers TEXT NOT NULL,
+    request_body BLOB,
+    response_headers TEXT NOT NULL,
+    response_body BLOB,
+    content_type TEXT NOT NULL DEFAULT '',
+    length INTEGER NOT NULL DEFAULT 0,
+    elapsed_ms INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS traffic_text USING fts5(url, request, response);
+"""
+
+Headers = Sequence[Tuple[str, str]]
+
+
+def decode_body(body: bytes, headers: Headers) -> bytes:
+    """``body`` without its gzip/deflate content encoding (as is if it has another or none)."""
+    encoding = next((value.lower() for name, value in headers if name.lower() == "content-encoding"), "")
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+    except (OSError, EOFError, zlib.error):
+        pass
+    return body
+
+
+def _text(headers: Headers, body: bytes) -> str:
+    head = "\n".join(f"{name}: {value}" for name, value in headers)
+    if b"\x00" in body[:4096]:
+        return head
+    return f"{head}\n\n{body[: settings.TRAFFIC_MAX_INDEX_BYTES].decode(errors='replace')}"
+
+
+def _fts_phrase(query: str) -> str:
+    return '"' + query.replace('"', '""') + '"'
+
+
+class TrafficLog:
+    """One challenge's traffic database.
+
+    ``record`` only queues an exchange: a single writer task inserts whatever
+    has queued up in one transaction on a worker thread, so a sweep of many
+    requests costs a few commits and never blocks the event loop. Reads wait
+    for queued writes first and also run on a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        # One connection, used from worker threads one call at a time
+        self._db_lock = threading.Lock()
+        self._queue: List[tuple] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def record(
+        self,
+        source: str,
+        method: str,
+        url: str,
+        status: Optional[int],
+        request_headers: Headers,
+        request_body: bytes,
+        response_headers: Headers,
+        response_body: bytes,
+        elapsed: float = 0.0,
+        error: str = "",
+    ) -> None:
+        """Queue one exchange (bodies decoded, cut at ``HTTP_MAX_BODY_BYTES``) for the writer."""
+        response_body = decode_body(response_body, response_headers)[: settings.HTTP_MAX_BODY_BYTES]
+        request_body = (request_body or b"")[: settings.HTTP_MAX_BODY_BYTES]
+        content_type = next((value for name, value in response_headers if name.lower() == "content-type"), "")
+        self._queue.append((
+            (
+                time.time(), source, method.upper(), url, status,
+                "\n".join(f"{name}: {value}" for name, value in request_headers), request_body,
+                "\n".join(f"{name}: {value}" for name, value in response_headers), response_body,
+                content_type.split(";")[0].strip(), len(response_body), int(elapsed * 1000), error,
+            ),
+            (url, _text(request_headers, request_body), _text(response_headers, response_body)),
+        ))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._write())
+
+    async def _write(self) -> None:
+        while self._queue:
+            batch, self._queue = self._queue, []
+            try:
+                await asyncio.to_thread(self._insert, batch)
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"[Traffic] Could not record {len(batch)} exchanges in {self.path}: {e}")
+
+    def _insert(self, batch: List[tuple]) -> None:
+        with self._db_lock:
+            db = self._connection()
+            with db:
+                for row, text in batch:
+                    cursor = db.execute(
+                        "INSERT INTO traffic (time, source, method, url, status, request_headers, request_body,"
+                        " response_headers, response_body, content_type, length, elapsed_ms, error)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                    db.execute(
+                        "INSERT INTO traffic_text (rowid, url, request, response) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, *text),
+                    )
+
+    async def flush(self) -> None:
+        """Wait until every queued exchange is written."""
+        while self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+
+    async def _read(self, sql: str, args: Sequence[Any]) -> List[sqlite3.Row]:
+        await self.flush()
+
+        def run() -> List[sqlite3.Row]:
+            with self._db_lock:
+                return self._connection().execute(sql, args).fetchall()
+
+        return await asyncio.to_thread(run)
+
+    async def search(
+        self,
+        query: Optional[str] = None,
+        url: Optional[str] = None,
+        method: Optional[str] = None,
+        status: Optional[int] = None,
+        source: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[sqlite3.Row]:
+        """Newest exchanges first, filtered by a full-text ``query``, URL substring and exact fields."""
+        clauses, args = [], []
+        if url:
+            clauses.append("t.url LIKE ?")
+            args.append(f"%{url}%")
+        if method:
+            clauses.append("t.method = ?")
+            args.append(method.upper())
+        if status is not None:
+            clauses.append("t.status = ?")
+            args.append(status)
+        if source:
+            clauses.append("t.source = ?")
+            args.append(source)
+        columns = (
+            "t.id, t.time, t.source, t.method, t.url, t.status, t.content_type, t.length, "
+            "t.elapsed_ms, t.error"
+        )
+        if not query:
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            return await self._read(
+                f"SELECT {columns}, '' AS snippet FROM traffic t {where} ORDER BY t.id DESC LIMIT ?",
+                (*args, limit),
+            )
+        where = " AND ".join(["traffic_text MATCH ?", *clauses])
+        sql = (
+            f"SELECT {columns}, snippet(traffic_text, -1, '[', ']', '...', 12) AS snippet "
+            f"FROM traffic_text JOIN traffic t ON t.id = traffic_text.rowid WHERE {where} "
+            "ORDER BY t.id DESC LIMIT ?"
+        )
+        try:
+            return await self._read(sql, (query, *args, limit))
+        except sqlite3.OperationalError:
+            # Not valid FTS5 query syntax (e.g. "flag{" or a path): search it as a phrase
+            return await self._read(sql, (_fts_phrase(query), *args, limit))
+
+    async def get(self, exchange_id: int) -> Optional[sqlite3.Row]:
+        rows = await self._read("SELECT * FROM traffic WHERE id = ?", (exchange_id,))
+        return rows[0] if rows else None
+
+    async def aclose(self) -> None:
+        await self.flush()
+        if self._db is not None:
+            db, self._db = self._db, None
+            await asyncio.to_thread(db.close)
+
+
+_logs: Dict[str, TrafficLog] = {}
+
+
+def get_traffic_log(state: Optional[dict] = None) -> TrafficLog:
+    """The traffic database of the current challenge."""
+    key, cwd = workspace(state)
+    if key not in _logs:
+        _logs[key] = TrafficLog(os.path.join(cwd, TRAFFIC_FILE))
+    return _logs[key]
+
+
+async def close_traffic_logs(challenge_code: Optional[str] = None) -> None:
+    """Write out and close the traffic database of one challenge, or all of them when none is given."""
+    keys: Iterable[str] = [challenge_code] if challenge_code else list(_logs)
+    for key in keys:
+        log = _logs.pop(key, None)
+        if log is not None:
+            await log.aclose()
@@ -0,0 +1,256 @@
+"""Multi-process worker pool for running challenges across cores.
+
+The coordinator keeps the scheduler and its queue; worker processes each run
+their own event loop, compiled graphs and checkpoint connections, taking
+challenges from their own task queue and streaming events and results back.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import threading
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from src.checkpoint import open_persistence
+from src.llm import aclose_clients
+from src.llm.ratelimit import set_limiter_share
+from src.runner import run_single_challenge
+from src.runtime import close_jobs, close_kernels, close_shells, warm_kernels
+from src.utils.problem_api import Challenge
+from src.web import close_web_clients
+
+# Times a crashed worker process is replaced before its slot is given up
+MAX_RESPAWNS = 3
+
+
+def _worker_main(
+    worker_id: int, tasks: Any, events: Any, concurrency: int, processes: int
+) -> None:
+    """Entry point of a worker process."""
+    # Each worker gets an equal share of the LLM rate limits
+    set_limiter_share(1 / processes)
+    try:
+        asyncio.run(_worker_loop(worker_id, tasks, events, concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_loop(worker_id: int, tasks: Any, events: Any, concurrency: int) -> None:
+    loop = asyncio.get_running_loop()
+    warm_kernels()
+
+    async with open_persistence() as persistence:
+
+        async def consume() -> None:
+            while True:
+                task = await loop.run_in_executor(None, tasks.get)
+                if task is None:
+                    return
+                task_id, challenge_data, index, resume = task
+                challenge = Challenge.model_validate(challenge_data)
+                events.put(("started", task_id, worker_id, None))
+
+                def on_event(event: dict) -> None:
+                    events.put(("event", task_id, worker_id, event))
+
+                try:
+                    result = await run_single_challenge(
+                        challenge,
+                        index,
+                        resume,
+                        persistence=persistence,
+                        on_event=on_event,
+                    )
+                    events.put(("result", task_id, worker_id, result))
+                except BaseException:  # pylint: disable=broad-except
+                    events.put(("error", task_id, worker_id, traceback.format_exc()))
+                    raise
+
+        try:
+            await asyncio.gather(*(consume() for _ in range(concurrency)))
+        finally:
+            await close_shells()
+            await close_kernels()
+            await close_jobs()
+            await close_web_clients()
+            await aclose_clients()
+
+
+class ProcessWorkerPool:
+    """Runs challenges in ``processes`` worker processes.
+
+    ``run`` has the scheduler's runner signature, so the pool drops in for
+    ``run_single_challenge`` while the scheduler keeps ordering and requeueing.
+    Each worker runs up to ``concurrency`` challenges on its own event loop.
+
+    A challenge is assigned to a worker before it is put on that worker's task
+    queue, so when a worker dies the pool knows every challenge it held: those
+    it had started fail, the rest go back to the pool for another worker.
+    """
+
+    def __init__(self, processes: int, concurrency: int = 1):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.processes = processes
+        self.concurrency = max(1, concurrency)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queues: Dict[int, Any] = {}
+        self._events: Any = None
+        self._workers: list[Optional[Any]] = []
+        self._respawns: Dict[int, int] = {}
+        self._closing = False
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        # task id -> (worker id, the task queue it was put on, the task)
+        self._assigned: Dict[int, Tuple[int, Any, tuple]] = {}
+        self._started: Set[int] = set()
+        self._backlog: Deque[Tuple[int, tuple]] = deque()
+        self._ids = itertools.count()
+
+    async def __aenter__(self) -> "ProcessWorkerPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._events = self._ctx.Queue()
+        self._workers = [self._spawn(worker_id) for worker_id in range(self.processes)]
+        self._reader = threading.Thread(target=self._read_events, daemon=True)
+        self._reader.start()
+        print(
+            f"[Pool] Started {self.processes} worker processes "
+            f"({self.concurrency} challenges each)"
+        )
+
+    def _spawn(self, worker_id: int) -> Any:
+        # A fresh queue, so nothing meant for a dead predecessor reaches the replacement
+        self._queues[worker_id] = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._queues[worker_id], self._events, self.concurrency, self.processes),
+            name=f"xboo-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def close(self) -> None:
+        """Stop the workers once their current challenges finish."""
+        self._closing = True
+        for tasks in self._queues.values():
+            for _ in range(self.concurrency):
+                tasks.put(None)
+        for process in self._workers:
+            if process is not None:
+                process.join()
+        self._events.put(None)
+        if self._reader is not None:
+            self._reader.join()
+        self._workers.clear()
+
+    def _read_events(self) -> None:
+        while True:
+            self._check_workers()
+            try:
+                message = self._events.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _check_workers(self) -> None:
+        """Replace worker processes that died without reporting, failing their challenges."""
+        for worker_id, process in enumerate(self._workers):
+            if process is None or process.exitcode in (None, 0):
+                continue
+            print(f"[Pool] Worker {worker_id} exited with code {process.exitcode}")
+            # Only the challenges put on the dead worker's queue, not its replacement's
+            self._loop.call_soon_threadsafe(self._fail_worker, worker_id, self._queues.get(worker_id))
+            if self._closing or self._respawns.get(worker_id, 0) >= MAX_RESPAWNS:
+                self._workers[worker_id] = None
+                continue
+            self._respawns[worker_id] = self._respawns.get(worker_id, 0) + 1
+            self._workers[worker_id] = self._spawn(worker_id)
+        if not self._closing and all(process is None for process in self._workers):
+            self._loop.call_soon_threadsafe(self._fail_pending)
+
+    def _fail_worker(self, worker_id: int, tasks: Any) -> None:
+        """Fail the challenges a dead worker started and hand the rest to other workers."""
+        requeued = []
+        for task_id, (owner, assigned_to, task) in list(self._assigned.items()):
+            if owner != worker_id or assigned_to is not tasks:
+                continue
+            if task_id in self._started:
+                self._dispatch(("error", task_id, worker_id, "worker process exited"))
+            else:
+                del self._assigned[task_id]
+                requeued.append((task_id, task))
+        self._backlog.extendleft(reversed(requeued))
+        self._assign()
+
+    def _fail_pending(self) -> None:
+        """Fail every waiting challenge once no worker process is left to run it."""
+        self._backlog.clear()
+        for task_id in list(self._pending):
+            self._dispatch(("error", task_id, -1, "no worker processes left"))
+
+    def _assign(self) -> None:
+        """Put waiting challenges on the queues of the least busy live workers with a free slot."""
+        while self._backlog:
+            load = Counter(owner for owner, _, _ in self._assigned.values())
+            free = [
+                worker_id
+                for worker_id, process in enumerate(self._workers)
+                if process is not None and process.exitcode is None and load[worker_id] < self.concurrency
+            ]
+            if not free:
+                return
+            task_id, task = self._backlog.popleft()
+            if task_id not in self._pending:
+                continue
+            worker_id = min(free, key=lambda worker_id: load[worker_id])
+            tasks = self._queues[worker_id]
+            self._assigned[task_id] = (worker_id, tasks, task)
+            tasks.put(task)
+
+    def _dispatch(self, message: tuple) -> None:
+        kind, task_id, worker_id, payload = message
+        if kind == "started":
+            if self._assigned.get(task_id, (None,))[0] == worker_id:
+                self._started.add(task_id)
+            return
+        if kind == "event":
+            print(f"[Worker {worker_id}] {payload['challenge']}: {payload['node']} finished")
+            return
+        self._assigned.pop(task_id, None)
+        self._started.discard(task_id)
+        future = self._pending.pop(task_id, None)
+        self._assign()
+        if future is None or future.done():
+            return
+        if kind == "result":
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(f"worker {worker_id} crashed:\n{payload}"))
+
+    async def run(self, challenge: Challenge, index: int, resume: Any = None) -> Any:
+        """Hand a challenge to the next free worker and wait for its result."""
+        if all(process is None for process in self._workers):
+            raise RuntimeError("no worker processes left")
+        task_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[task_id] = future
+        self._backlog.append((task_id, (task_id, challenge.model_dump(), index, resume)))
+        self._assign()
+        try:
+            return await future
+        finally:
+            self._pending.pop(task_id, None)
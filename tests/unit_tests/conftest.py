@@ -0,0 +1,11 @@
+import os
+
+# Settings has required fields; give them dummy values so src modules import without a .env
+for name, value in {
+    "API_KEY": "test",
+    "API_BASE": "http://127.0.0.1:9/v1",
+    "MODEL": "test-model",
+    "CHALLENGE_API_KEY": "test",
+    "CHALLENGE_API_BASE": "http://127.0.0.1:9",
+}.items():
+    os.environ.setdefault(name, value)
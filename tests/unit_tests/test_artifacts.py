@@ -0,0 +1,56 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.memory.context import memory_context
+from src.output import artifacts, process_tool_output
+from src.output.artifacts import read_artifact_text, resolve_artifact, spool_output
+
+FIRST = {"target": [{"ip": "10.0.0.1", "port": 80}]}
+SECOND = {"target": [{"ip": "10.0.0.2", "port": 80}]}
+
+
+@pytest.fixture(autouse=True)
+def artifact_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(artifacts, "ARTIFACT_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def test_spooled_output_is_readable_only_by_its_own_challenge(artifact_root: Path):
+    output = "\n".join(f"line {number}" for number in range(5000))
+
+    async def spool() -> str:
+        with memory_context(None, FIRST):
+            return await spool_output(output, "bash", limit=1000)
+
+    spooled = asyncio.run(spool())
+    path = spooled.split("saved as artifact ")[1].split(" - ")[0]
+    (artifact_root / "notes.txt").write_text("not an artifact")
+
+    with memory_context(None, FIRST):
+        assert resolve_artifact(path) == path
+        assert read_artifact_text(Path(path).name, pattern="line 4321$") == "4322: line 4321"
+        with pytest.raises(FileNotFoundError):
+            resolve_artifact(str(artifact_root / "notes.txt"))
+        with pytest.raises(FileNotFoundError):
+            resolve_artifact("../notes.txt")
+    with memory_context(None, SECOND):
+        with pytest.raises(FileNotFoundError):
+            resolve_artifact(path)
+
+
+def test_web_output_is_distilled_with_the_raw_response_saved(artifact_root: Path):
+    page = "<html><head><title>Shop</title></head><body>" + "<div>item</div>" * 500 + "</body></html>"
+    output = "HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n" + page
+
+    async def process() -> str:
+        with memory_context(None, FIRST):
+            return await process_tool_output(output, "http")
+
+    digest = asyncio.run(process())
+
+    assert digest.startswith("[Web response digest")
+    assert "Title: Shop" in digest
+    saved = list((artifact_root / "10-0-0-1-80").glob("http-*.txt"))
+    assert len(saved) == 1 and saved[0].read_bytes() == output.encode()
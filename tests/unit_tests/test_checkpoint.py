@@ -0,0 +1,142 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END
+from langgraph.types import Command
+
+from src.budget import BudgetExceeded
+from src.checkpoint import clear_finished_run, has_pending_run, open_persistence, thread_config
+from src.graph import build_graph
+from src.memory.utils import memory_namespace
+from src.recon.agent import Recon
+from src.routing.router import Router
+from src.scout.agents import executor, pathfinder, planner
+from src.scout.model import PlanModel, PlanPhase, PlanResponse
+
+TARGET = [{"ip": "10.0.0.5", "port": 80}]
+
+
+class FakeAgent:
+    """Stands in for a ``create_agent`` graph, replaying scripted results in order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def ainvoke(self, payload):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    plan = PlanModel(
+        objective="log in as admin",
+        current_phase=1,
+        total_phases=1,
+        phases=[PlanPhase(id=1, title="login", status="active", criteria="admin session")],
+    )
+    fakes = {
+        "pathfinder": FakeAgent({"messages": [AIMessage(content="log in as admin")]}),
+        "planner": FakeAgent({"messages": [], "structured_response": PlanResponse(plan=plan)}),
+        "executor": FakeAgent(BudgetExceeded("token budget"), {"messages": [AIMessage(content="done")]}),
+    }
+    for module in (pathfinder, planner, executor):
+        name = module.__name__.rsplit(".", 1)[-1]
+        monkeypatch.setattr(module, "create_agent", lambda *args, _fake=fakes[name], **kwargs: _fake)
+
+    async def recon(self, state, store=None):
+        return {"recon": "web app on port 80"}
+
+    async def route(self, state):
+        return Command(goto=END, update={"flag": "flag{resumed}"})
+
+    monkeypatch.setattr(Recon, "ainvoke", recon)
+    monkeypatch.setattr(Router, "aroute", route)
+    return fakes
+
+
+def initial_state():
+    return {
+        "messages": [HumanMessage(content="challenge")],
+        "target": TARGET,
+        "recon": "",
+        "findings": [],
+        "flag": "",
+        "redirection": [],
+    }
+
+
+def test_resumed_run_persists_plan_in_sqlite_store(tmp_path: Path, agents):
+    db = str(tmp_path / "checkpoints.db")
+    config = thread_config("web-1", recursion_limit=50)
+
+    async def first_run():
+        async with open_persistence(db) as persistence:
+            graph = build_graph(checkpointer=persistence.checkpointer, store=persistence.store)
+            with pytest.raises(BudgetExceeded):
+                await graph.ainvoke(initial_state(), config=config)
+            return await has_pending_run(graph, config)
+
+    async def resumed_run():
+        async with open_persistence(db) as persistence:
+            graph = build_graph(checkpointer=persistence.checkpointer, store=persistence.store)
+            assert await has_pending_run(graph, config)
+            return await graph.ainvoke(None, config=config)
+
+    async def read_plan():
+        async with open_persistence(db) as persistence:
+            return await persistence.store.aget(memory_namespace({"target": TARGET}, "plan"), "active")
+
+    assert asyncio.run(first_run())
+    result = asyncio.run(resumed_run())
+    item = asyncio.run(read_plan())
+
+    assert result["flag"] == "flag{resumed}"
+    assert agents["executor"].calls == 2
+    assert item is not None
+    assert item.value["plan"]["objective"] == "log in as admin"
+
+
+def test_finished_thread_is_cleared_before_a_fresh_run(tmp_path: Path, agents):
+    agents["executor"].results = [{"messages": [AIMessage(content="done")]}]
+    db = str(tmp_path / "checkpoints.db")
+    config = thread_config("web-2", recursion_limit=50)
+
+    async def run_twice():
+        async with open_persistence(db) as persistence:
+            graph = build_graph(checkpointer=persistence.checkpointer, store=persistence.store)
+            first = await graph.ainvoke(initial_state(), config=config)
+            assert not await has_pending_run(graph, config)
+            assert await clear_finished_run(persistence, graph, config)
+            assert not await clear_finished_run(persistence, graph, config)
+            second = await graph.ainvoke(initial_state(), config=config)
+            return first, second
+
+    first, second = asyncio.run(run_twice())
+
+    assert len(second["messages"]) == len(first["messages"])
+
+
+def test_worker_connections_share_the_database_in_wal_mode(tmp_path: Path):
+    db = str(tmp_path / "checkpoints.db")
+
+    async def journal_modes():
+        async with open_persistence(db) as first, open_persistence(db) as second:
+            modes = []
+            for conn in (first.checkpointer.conn, first.store.conn, second.checkpointer.conn):
+                async with conn.execute("PRAGMA journal_mode") as cursor:
+                    modes.append((await cursor.fetchone())[0])
+            await second.store.aput(("scout", "shared"), "key", {"value": 1})
+            item = await first.store.aget(("scout", "shared"), "key")
+            return modes, item.value
+
+    modes, value = asyncio.run(journal_modes())
+
+    assert modes == ["wal", "wal", "wal"]
+    assert value == {"value": 1}
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.graph import END
+from langgraph.store.memory import InMemoryStore
+from langgraph.types import Command
+
+from src.graph import build_graph
+from src.memory.context import memory_context
+from src.memory.utils import memory_namespace
+from src.output import flags
+from src.output.flags import FlagCaptured, close_detectors
+from src.recon import agent as recon_agent
+from src.routing.router import Router
+from src.scout.agents import Executor, Planner, pathfinder
+from src.settings import settings
+from src.state import ReconOutput, TargetModel
+from src.web import client, crawler
+from src.web.client import TargetSession
+from src.web.crawler import crawl, query_site_map
+
+PAGES: Dict[str, str] = {
+    "/": '<title>Home</title><a href="/about">About</a><a href="https://other.test/x">x</a>'
+    '<form action="/login" method="post"><input name="user"><input name="pass"></form>'
+    '<a href="/logout">Log out</a><script>fetch("/api/items?page=1")</script>',
+    "/about": '<a href="/team">Team</a>',
+    "/team": "team",
+    "/api/items": "[]",
+    "/robots.txt": "Disallow: /secret-admin",
+    "/secret-admin": "flag{crawled_flag}",
+}
+
+
+def session_for(tmp_path: Path, host: str, pages: Dict[str, str]) -> TargetSession:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        page = pages.get(request.url.path)
+        if page is None:
+            return httpx.Response(404, text="not found")
+        return httpx.Response(200, text=page, headers={"content-type": "text/html"})
+
+    session = TargetSession(str(tmp_path), f"http://{host}")
+    session.client = httpx.AsyncClient(base_url=f"http://{host}", transport=httpx.MockTransport(handler))
+    return session
+
+
+def test_crawl_maps_same_origin_links_forms_and_scripts(tmp_path: Path):
+    pages = {path: text for path, text in PAGES.items() if path != "/secret-admin"}
+    # The site map is kept per target, so each test crawls its own host
+    state = {"challenge_code": "crawl-map", "target": [{"ip": "map.test", "port": 80}]}
+
+    async def scenario() -> None:
+        session = session_for(tmp_path, "map.test", pages)
+        report = await crawl(session, "http://map.test", state=state)
+        assert report.fetched >= 6 and not report.stopped
+        entries = {entry["path"]: entry for entry in await query_site_map(state=state)}
+        assert "POST" in entries["/login"]["methods"]
+        assert entries["/login"]["params"] == ["pass", "user"]
+        assert entries["/api/items"]["params"] == ["page"]
+        assert entries["/team"]["crawled"]
+        assert "status" not in entries["/logout"]
+        assert all(entry["url"].startswith("http://map.test/") for entry in entries.values())
+
+        # A second crawl only fetches what the first one did not
+        again = await crawl(session, "http://map.test", state=state)
+        assert again.fetched == 0
+        await session.client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_captured_flag_ends_the_crawl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    class API:
+        async def __aenter__(self) -> "API":
+            return self
+
+        async def __aexit__(self, *args: object) -> None:
+            return None
+
+        async def submit_answer(self, challenge_code: str, answer: str) -> SimpleNamespace:
+            return SimpleNamespace(correct=answer == "flag{crawled_flag}")
+
+    monkeypatch.setattr(flags, "ProblemAPIClient", API)
+    state = {"challenge_code": "crawl-flag", "target": [{"ip": "flag.test", "port": 80}]}
+
+    async def scenario() -> None:
+        session = session_for(tmp_path, "flag.test", PAGES)
+        started = time.monotonic()
+        with memory_context(None, state):
+            with pytest.raises(FlagCaptured):
+                await crawl(session, "http://flag.test", state=state)
+        assert time.monotonic() - started < 5
+        await session.client.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        close_detectors("crawl-flag")
+
+
+class ScriptedAgent:
+    def __init__(self, respond):
+        self.respond = respond
+
+    async def ainvoke(self, payload):
+        return await self.respond()
+
+
+def test_recon_crawl_is_visible_to_scout_nodes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    target = {"ip": "shared.test", "port": 80}
+    state = {
+        "messages": [], "challenge_code": "shared-store", "target": [target],
+        "recon": "", "findings": [], "flag": "", "redirection": [],
+    }
+    pages = {path: page for path, page in PAGES.items() if path != "/secret-admin"}
+    found = []
+
+    async def recon_result():
+        annotated = TargetModel(annotation="web app", **target)
+        return {"messages": [], "structured_response": ReconOutput(report="web app", findings=[], target=[annotated])}
+
+    async def pathfinder_result():
+        found.extend(await query_site_map())
+        return {"messages": [AIMessage(content="log in")]}
+
+    async def skip(self, state, store=None):
+        return {}
+
+    async def finish(self, state):
+        return Command(goto=END, update={"flag": "flag{done}"})
+
+    monkeypatch.setattr(settings, "PRERECON_ENABLED", False)
+    monkeypatch.setattr(settings, "CRAWL_ON_RECON", True)
+    monkeypatch.setattr(recon_agent, "create_agent", lambda *args, **kwargs: ScriptedAgent(recon_result))
+    monkeypatch.setattr(pathfinder, "create_agent", lambda *args, **kwargs: ScriptedAgent(pathfinder_result))
+    monkeypatch.setattr(Planner, "ainvoke", skip)
+    monkeypatch.setattr(Executor, "ainvoke", skip)
+    monkeypatch.setattr(Router, "aroute", finish)
+
+    async def scenario() -> None:
+        client._sessions["shared-store"] = session_for(tmp_path, "shared.test", pages)
+        try:
+            await build_graph(store=InMemoryStore()).ainvoke(state, config={"recursion_limit": 20})
+        finally:
+            await client._sessions.pop("shared-store").client.aclose()
+        assert not await crawler._fallback_store.asearch(memory_namespace(state, "sitemap"))
+
+    asyncio.run(scenario())
+
+    urls = {entry["url"] for entry in found}
+    assert "http://shared.test:80/about" in urls
+    assert "http://shared.test:80/login" in urls
@@ -0,0 +1,30 @@
+import time
+
+from src.output.distill import distill
+
+HEADERS = "HTTP/1.1 500 Internal Server Error\r\nServer: nginx\r\nContent-Type: text/html\r\n\r\n"
+
+
+def test_errors_keep_the_context_of_their_line():
+    page = (
+        "<html><body><div>ok</div>\n"
+        "<p>while loading: PHP Warning: include(config.php): failed to open stream in /var/www/index.php</p>\n"
+        "<div>next line</div></body></html>"
+    )
+
+    digest = distill(HEADERS + page)
+
+    assert "Response 1: HTTP/1.1 500 Internal Server Error" in digest
+    assert "  - while loading: PHP Warning: include(config.php): failed to open stream in /var/www/index.php" in digest
+    assert "next line" not in digest.split("Errors:")[1].split("Text:")[0]
+
+
+def test_large_single_line_page_is_distilled_quickly():
+    # A minified page with no newlines used to backtrack for seconds per 100 KB
+    page = "<html><body><div>Fatal error: boom " + "a" * 2_200_000 + "</div></body></html>"
+
+    started = time.monotonic()
+    digest = distill(HEADERS + page)
+
+    assert time.monotonic() - started < 3
+    assert "Errors:" in digest
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, List, Tuple
+
+import pytest
+
+from src.output import flags
+from src.output.flags import FlagCaptured, FlagScanner, close_detectors, find_flags, get_detector
+
+
+def test_find_flags_skips_placeholders_and_excluded_text():
+    text = "flag{example} FLAG{real_1} flag{typed} FLAG{real_1} flag{...}"
+    assert find_flags(text, exclude="echo flag{typed}") == ["FLAG{real_1}"]
+
+
+def test_scanner_finds_a_flag_split_across_chunks():
+    scanner = FlagScanner()
+    assert scanner.feed("output ... fl") == []
+    assert scanner.feed("ag{split_") == []
+    assert scanner.feed("across} done") == ["flag{split_across}"]
+    assert scanner.feed(" more") == []
+
+
+class FakeAPI:
+    def __init__(self, correct: str, failures: int = 0):
+        self.correct = correct
+        self.failures = failures
+        self.submitted: List[Tuple[str, str]] = []
+
+    def __call__(self) -> "FakeAPI":
+        return self
+
+    async def __aenter__(self) -> "FakeAPI":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+    async def submit_answer(self, challenge_code: str, answer: str) -> SimpleNamespace:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("challenge API down")
+        self.submitted.append((challenge_code, answer))
+        return SimpleNamespace(correct=answer == self.correct)
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch) -> FakeAPI:
+    fake = FakeAPI("flag{right}")
+    monkeypatch.setattr(flags, "ProblemAPIClient", fake)
+    close_detectors()
+    yield fake
+    close_detectors()
+
+
+def test_wrong_flags_are_submitted_once_and_a_right_one_raises(api: FakeAPI):
+    detector = get_detector({"challenge_code": "c1"})
+
+    async def scenario() -> None:
+        await detector.submit(["flag{wrong}"], "run_bash")
+        await detector.submit(["flag{wrong}"], "run_bash")
+        with pytest.raises(FlagCaptured) as captured:
+            await detector.submit(["flag{right}"], "http_request")
+        assert captured.value.flag == "flag{right}"
+        # Once captured, any further sighting ends the agent too
+        with pytest.raises(FlagCaptured):
+            await detector.submit(["flag{other}"], "run_bash")
+
+    asyncio.run(scenario())
+    assert api.submitted == [("c1", "flag{wrong}"), ("c1", "flag{right}")]
+
+
+def test_api_errors_leave_the_candidate_eligible(api: FakeAPI, monkeypatch: pytest.MonkeyPatch):
+    async def no_sleep(delay: float) -> None:
+        return None
+
+    monkeypatch.setattr(flags, "SUBMIT_RETRIES", 1)
+    monkeypatch.setattr(flags.asyncio, "sleep", no_sleep)
+    api.failures = 1
+    detector = get_detector({"challenge_code": "c1"})
+
+    async def scenario() -> None:
+        await detector.submit(["flag{wrong}"], "run_bash")
+        assert "flag{wrong}" not in detector.tried
+        await detector.submit(["flag{wrong}"], "run_bash")
+
+    asyncio.run(scenario())
+    assert api.submitted == [("c1", "flag{wrong}")]
+
+
+def test_detectors_are_per_challenge_and_dropped_on_close(api: FakeAPI):
+    first = get_detector({"challenge_code": "c1"})
+    assert get_detector({"challenge_code": "c1"}) is first
+    assert get_detector({"challenge_code": "c2"}) is not first
+    assert get_detector({}) is None
+
+    close_detectors("c1")
+    assert get_detector({"challenge_code": "c1"}) is not first
+    assert "c2" in flags._detectors
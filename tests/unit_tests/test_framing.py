@@ -0,0 +1,92 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from src.runtime.framing import OutputCapture, SessionDied, new_marker, read_framed
+from src.runtime.shell import ShellSession
+
+
+def reader(*chunks: bytes, eof: bool = False) -> asyncio.StreamReader:
+    stream = asyncio.StreamReader()
+    for chunk in chunks:
+        stream.feed_data(chunk)
+    if eof:
+        stream.feed_eof()
+    return stream
+
+
+def test_output_up_to_a_split_marker_is_captured_and_streamed():
+    marker = new_marker()
+    framed = b"line one\nline two" + b"\n" + marker + b" 0 /tmp\nnext command"
+
+    async def scenario() -> None:
+        stream = asyncio.StreamReader()
+        capture = OutputCapture(1 << 16)
+        streamed: List[bytes] = []
+
+        async def on_output(data: bytes) -> None:
+            streamed.append(data)
+
+        reading = asyncio.ensure_future(read_framed(stream, marker, capture, on_output))
+        # One byte at a time, so the marker arrives across many reads
+        for index in range(len(framed)):
+            stream.feed_data(framed[index : index + 1])
+            await asyncio.sleep(0)
+        assert await reading == "0 /tmp"
+        assert capture.text() == "line one\nline two"
+        assert b"".join(streamed) == b"line one\nline two"
+
+    asyncio.run(scenario())
+
+
+def test_eof_before_the_marker_means_the_session_died():
+    async def scenario() -> None:
+        capture = OutputCapture(1 << 16)
+        with pytest.raises(SessionDied):
+            await read_framed(reader(b"partial output", eof=True), new_marker(), capture)
+        assert capture.text() == "partial output"
+
+    asyncio.run(scenario())
+
+
+def test_capture_keeps_head_and_tail_within_the_limit():
+    capture = OutputCapture(20)
+    capture.add(b"a" * 10 + b"b" * 100 + b"c" * 10)
+    text = capture.text()
+    assert text.startswith("a" * 10) and text.endswith("c" * 10)
+    assert capture.omitted == 100
+    assert "100 bytes of output dropped" in text
+
+
+def test_shell_session_keeps_state_and_recovers_from_timeouts(tmp_path):
+    async def scenario() -> None:
+        session = ShellSession(str(tmp_path))
+        try:
+            first = await session.run("cd /; export SEEN=yes; false", 10, 1 << 16)
+            assert (first.exit_code, first.cwd) == (1, "/")
+            second = await session.run("echo $SEEN; pwd", 10, 1 << 16)
+            assert second.output.split() == ["yes", "/"]
+
+            hung = await session.run("sleep 30", 0.5, 1 << 16)
+            assert hung.timed_out and hung.exit_code is None
+            after = await session.run("pwd", 10, 1 << 16)
+            assert after.output.strip() == "/"
+        finally:
+            await session.close()
+
+    asyncio.run(scenario())
+
+
+def test_closing_a_challenges_shells_drops_its_process_slots(tmp_path):
+    from src.runtime import shell
+
+    async def scenario() -> None:
+        state = {"challenge_code": "c1"}
+        result = await shell.run_shell("echo hi", 10, state=state)
+        assert result.output.strip() == "hi"
+        assert "c1" in shell._slots and "c1" in shell._pools
+        await shell.close_shells("c1")
+        assert "c1" not in shell._slots and "c1" not in shell._pools
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm import balancer
+from src.llm.balancer import EndpointBalancer
+
+A = "http://a.test/v1"
+B = "http://b.test/v1"
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(balancer, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def make_balancer() -> EndpointBalancer:
+    endpoints = EndpointBalancer(failure_threshold=3, cooldown=30.0)
+    endpoints.register(A)
+    endpoints.register(B)
+    return endpoints
+
+
+def fail(endpoints: EndpointBalancer, url: str, times: int) -> None:
+    for _ in range(times):
+        assert endpoints.choose([url]) == url
+        endpoints.record_failure(url)
+
+
+def test_breaker_opens_after_consecutive_failures(clock: SimpleNamespace):
+    endpoints = make_balancer()
+
+    fail(endpoints, A, 2)
+    assert endpoints.healthy([A])
+    endpoints.choose([A])
+    endpoints.record_success(A, 0.2)
+    fail(endpoints, A, 2)
+    assert endpoints.healthy([A])
+
+    fail(endpoints, A, 1)
+    assert endpoints.endpoints[A].is_open
+    assert not endpoints.healthy([A])
+    assert endpoints.endpoints[A].open_until == clock.now + 30
+
+
+def test_half_open_breaker_lets_a_single_probe_through(clock: SimpleNamespace):
+    endpoints = make_balancer()
+    fail(endpoints, A, 3)
+
+    clock.now += 31
+    assert endpoints.healthy([A])
+    assert endpoints.choose([A]) == A
+    # The probe is in flight: nobody else gets the endpoint until it reports
+    assert not endpoints.healthy([A])
+    assert endpoints.choose([A, B]) == B
+
+    endpoints.record_failure(A)
+    assert endpoints.endpoints[A].cooldown == 60
+    clock.now += 31
+    assert not endpoints.healthy([A])
+
+    clock.now += 30
+    assert endpoints.choose([A]) == A
+    endpoints.record_success(A, 0.2)
+    assert not endpoints.endpoints[A].is_open
+    assert endpoints.healthy([A])
+
+
+def test_calls_route_away_from_an_open_endpoint(clock: SimpleNamespace):
+    endpoints = make_balancer()
+    for url in (A, B):
+        endpoints.choose([url])
+        endpoints.record_success(url, 0.1)
+    fail(endpoints, A, 3)
+
+    chosen = [endpoints.choose([A, B]) for _ in range(20)]
+    assert chosen == [B] * 20
+
+    # With every breaker open, the endpoint that reopens first gets the probe
+    clock.now += 5
+    fail(endpoints, B, 3)
+    assert endpoints.choose([B, A]) == A
@@ -0,0 +1,62 @@
+import time
+from pathlib import Path
+
+import pytest
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.llm.cache import SQLiteResponseCache
+
+
+def prompt(text: str, **kwargs: object) -> str:
+    return dumps([HumanMessage(text, **kwargs)])
+
+
+def generations(text: str) -> list:
+    return [ChatGeneration(message=AIMessage(text))]
+
+
+def test_hit_returns_the_stored_generations(tmp_path: Path):
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"))
+    cache.update(prompt("hi"), "model-a", generations("hello"))
+
+    hit = cache.lookup(prompt("hi"), "model-a")
+    assert hit is not None
+    assert hit[0].message.content == "hello"
+    assert cache.lookup(prompt("hi"), "model-b") is None
+    assert cache.lookup(prompt("bye"), "model-a") is None
+
+
+def test_response_metadata_does_not_change_the_key(tmp_path: Path):
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"))
+    cache.update(prompt("hi", id="live-1"), "model-a", generations("hello"))
+    assert cache.lookup(prompt("hi", id="replayed-2"), "model-a") is not None
+
+
+def test_expired_entries_are_misses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"), ttl=10)
+    cache.update(prompt("hi"), "model-a", generations("hello"))
+    later = time.time() + 11
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.lookup(prompt("hi"), "model-a") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"))
+    for text in ("a", "b"):
+        clock[0] += 1
+        cache.update(prompt(text), "model-a", generations(text * 100))
+    clock[0] += 1
+    assert cache.lookup(prompt("a"), "model-a") is not None
+
+    (size,) = cache._conn.execute("SELECT MAX(size) FROM llm_cache").fetchone()
+    cache.max_bytes = size * 2
+    clock[0] += 1
+    cache.update(prompt("c"), "model-a", generations("c" * 100))
+
+    assert cache.lookup(prompt("b"), "model-a") is None
+    assert cache.lookup(prompt("a"), "model-a") is not None
+    assert cache.lookup(prompt("c"), "model-a") is not None
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, List
+
+import httpx
+import openai
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.llm import model as llm_model
+from src.llm import ratelimit
+from src.llm.model import ManagedChatOpenAI
+from src.llm.ratelimit import THROTTLE_DECREASE, AdaptiveLimiter
+from src.settings import settings
+
+
+def rate_limit_error() -> openai.RateLimitError:
+    request = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    return openai.RateLimitError("slow down", response=httpx.Response(429, request=request), body=None)
+
+
+def test_window_shrinks_on_throttle_and_grows_back_on_success():
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_concurrency=8, max_concurrency=32)
+        await limiter.acquire()
+        limiter.release(0.1, throttled=True, retry_after=0.01)
+        assert limiter.limit == 8 * THROTTLE_DECREASE
+
+        for _ in range(8):
+            await limiter.acquire()
+            limiter.release(0.1)
+        assert 8 * THROTTLE_DECREASE + 1 < limiter.limit < 8
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_is_capped_by_the_window():
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_concurrency=2, max_concurrency=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        third = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        limiter.release(0.1)
+        await asyncio.wait_for(third, 1)
+        assert limiter.in_flight == 2
+
+    asyncio.run(scenario())
+
+
+def test_waiters_honour_the_throttle_pause():
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_concurrency=4)
+        await limiter.acquire()
+        limiter.release(0.1, throttled=True, retry_after=0.2)
+        started = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - started >= 0.18
+        limiter.release(0.1)
+
+    asyncio.run(scenario())
+
+
+def test_higher_priority_waiters_are_admitted_first():
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_concurrency=1, max_concurrency=1)
+        await limiter.acquire()
+        order: List[int] = []
+
+        async def call(priority: int) -> None:
+            await limiter.acquire(priority)
+            order.append(priority)
+            limiter.release(0.1)
+
+        waiters = [asyncio.ensure_future(call(priority)) for priority in (1, 5, 3)]
+        await asyncio.sleep(0.01)
+        limiter.release(0.1)
+        await asyncio.gather(*waiters)
+        assert order == [5, 3, 1]
+
+    asyncio.run(scenario())
+
+
+def test_requests_per_minute_cap_delays_admission(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ratelimit, "WINDOW_SECONDS", 0.2)
+
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(rpm=2, initial_concurrency=4)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+            limiter.release(0.01)
+        assert time.monotonic() - started >= 0.18
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def limited(monkeypatch: pytest.MonkeyPatch) -> AdaptiveLimiter:
+    limiter = AdaptiveLimiter(initial_concurrency=4)
+    monkeypatch.setattr(ratelimit, "_limiter", limiter)
+    monkeypatch.setattr(llm_model, "_retry_after", lambda error, attempt: 0.01)
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 2)
+    return limiter
+
+
+def make_model() -> ManagedChatOpenAI:
+    return ManagedChatOpenAI(model="test-model", api_key="test", base_url="http://llm.test/v1", max_retries=0)
+
+
+def test_exhausted_retries_reraise(monkeypatch: pytest.MonkeyPatch, limited: AdaptiveLimiter):
+    calls = 0
+
+    async def failing(self: Any, *args: Any, **kwargs: Any) -> ChatResult:
+        nonlocal calls
+        calls += 1
+        raise rate_limit_error()
+
+    monkeypatch.setattr(ChatOpenAI, "_agenerate", failing)
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(make_model()._agenerate([HumanMessage("hi")]))
+    assert calls == settings.LLM_MAX_RETRIES + 1
+    assert limited.in_flight == 0
+
+
+def test_transient_error_is_retried_through_the_limiter(
+    monkeypatch: pytest.MonkeyPatch, limited: AdaptiveLimiter
+):
+    outcomes: List[Any] = [rate_limit_error()]
+
+    async def flaky(self: Any, *args: Any, **kwargs: Any) -> ChatResult:
+        if outcomes:
+            raise outcomes.pop()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage("ok"))])
+
+    monkeypatch.setattr(ChatOpenAI, "_agenerate", flaky)
+    result = asyncio.run(make_model()._agenerate([HumanMessage("hi")]))
+    assert result.generations[0].message.content == "ok"
+    assert limited.limit < 4
+    assert limited.in_flight == 0
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.settings import settings
+from src.web.client import TargetSession
+from src.web.probe import expand_values, run_probe, substitute
+
+
+def test_ranges_keep_padding_and_encodings_apply_to_every_value():
+    assert expand_values(["a"], ["008-011"]) == ["a", "008", "009", "010", "011"]
+    assert expand_values([], ["5-1:2"]) == ["5", "3", "1"]
+    assert expand_values(["1"], encodings=["raw", "base64"]) == ["1", "MQ=="]
+
+
+def test_oversized_ranges_are_rejected_before_expansion():
+    started = time.monotonic()
+    with pytest.raises(ValueError, match="at most 1000"):
+        expand_values([], ["1-100000000"], max_values=1000)
+    with pytest.raises(ValueError, match="at most 1000"):
+        expand_values([], ["1-600"], ["raw", "url"], max_values=1000)
+    assert time.monotonic() - started < 0.5
+
+
+def test_split_values_fill_indexed_placeholders():
+    template = {"url": "/login?u={{value.0}}", "form": {"p": "{{value.1}}", "raw": "{{value}}"}}
+    assert substitute(template, "admin:pw", ":") == {
+        "url": "/login?u=admin",
+        "form": {"p": "pw", "raw": "admin:pw"},
+    }
+
+
+def test_sweep_stays_within_the_concurrency_cap_and_reports_outliers(tmp_path: Path):
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        user = request.url.path.rsplit("/", 1)[-1]
+        if user == "0042":
+            return httpx.Response(200, text=f"<h1>profile {user}</h1> secret notes")
+        return httpx.Response(404, text=f"no user {user}")
+
+    async def scenario() -> str:
+        session = TargetSession(str(tmp_path), "http://target.test")
+        await session.client.aclose()
+        session.client = httpx.AsyncClient(base_url="http://target.test", transport=httpx.MockTransport(handler))
+        try:
+            return await run_probe(session, "/api/user/{{value}}", expand_values([], ["0001-0300"]))
+        finally:
+            await session.client.aclose()
+
+    output = asyncio.run(scenario())
+    assert 1 < peak <= settings.HTTP_PROBE_CONCURRENCY
+    assert "Sent 300 GET requests" in output
+    assert "299 x 404" in output
+    assert "'0042' [B] 200" in output
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any, Dict, List
+
+from src.budget import Preempted
+from src.scheduler import ChallengeScheduler, challenge_priority
+from src.utils.problem_api import Challenge, TargetInfo
+
+
+def make_challenge(code: str, points: int = 100, difficulty: str = "medium") -> Challenge:
+    return Challenge(
+        challenge_code=code,
+        difficulty=difficulty,
+        points=points,
+        hint_viewed=False,
+        solved=False,
+        target_info=TargetInfo(ip="127.0.0.1", port=[80]),
+    )
+
+
+def run(scheduler: ChallengeScheduler, challenges: List[Challenge]) -> Dict[str, Any]:
+    return asyncio.run(scheduler.run(challenges))
+
+
+def test_best_score_runs_first_and_requeued_after_fresh():
+    cheap = make_challenge("cheap", points=100, difficulty="easy")
+    costly = make_challenge("costly", points=100, difficulty="hard")
+    assert challenge_priority(cheap) < challenge_priority(costly)
+    assert challenge_priority(costly) < challenge_priority(cheap, 1)
+
+
+def test_failures_are_retried_until_max_attempts():
+    calls: List[str] = []
+
+    async def runner(challenge: Challenge, index: int, resume: Any) -> Any:
+        calls.append(challenge.challenge_code)
+        raise RuntimeError("boom")
+
+    results = run(ChallengeScheduler(runner, max_workers=1, max_attempts=3), [make_challenge("a")])
+    assert calls == ["a", "a", "a"]
+    assert isinstance(results["a"], RuntimeError)
+
+
+def test_preempted_run_resumes_with_its_state_until_max_passes():
+    resumes: List[Any] = []
+
+    async def runner(challenge: Challenge, index: int, resume: Any) -> Any:
+        resumes.append(resume)
+        return Preempted("time", state={"pass": len(resumes)})
+
+    run(ChallengeScheduler(runner, max_workers=1, max_passes=3), [make_challenge("a")])
+    assert resumes == [None, {"pass": 1}, {"pass": 2}]
+
+
+def test_failure_does_not_use_up_a_pass():
+    outcomes = iter([RuntimeError("boom"), Preempted("time"), Preempted("time"), "done"])
+    calls: List[str] = []
+
+    async def runner(challenge: Challenge, index: int, resume: Any) -> Any:
+        calls.append(challenge.challenge_code)
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    results = run(
+        ChallengeScheduler(runner, max_workers=1, max_attempts=2, max_passes=3),
+        [make_challenge("a")],
+    )
+    assert len(calls) == 4
+    assert results["a"] == "done"
+
+
+def test_slots_bound_concurrency():
+    running = 0
+    peak = 0
+
+    async def runner(challenge: Challenge, index: int, resume: Any) -> Any:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "done"
+
+    challenges = [make_challenge(f"c{i}") for i in range(6)]
+    results = run(ChallengeScheduler(runner, max_workers=2), challenges)
+    assert peak == 2
+    assert set(results) == {challenge.challenge_code for challenge in challenges}
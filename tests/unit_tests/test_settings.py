@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from src.scout.config import ScoutSettings
+from src.settings import Settings
+
+ENV_EXAMPLE = Path(__file__).resolve().parents[2] / ".env.example"
+
+
+def test_env_example_loads_into_both_settings():
+    settings = Settings(_env_file=ENV_EXAMPLE)
+    scout = ScoutSettings(_env_file=ENV_EXAMPLE)
+
+    assert settings.WORKER_PROCESSES >= 1
+    assert scout.execution_timeout == 60
@@ -0,0 +1,52 @@
+import asyncio
+import gzip
+import sqlite3
+from pathlib import Path
+from typing import List
+
+from src.web.traffic import TrafficLog
+
+
+def record(log: TrafficLog, index: int) -> None:
+    log.record(
+        "batch_probe", "get", f"http://target.test/api/user/{index}", 200,
+        [("Accept", "*/*")], b"",
+        [("Content-Type", "application/json"), ("Content-Encoding", "gzip")],
+        gzip.compress(f'{{"id": {index}, "note": "user {index}"}}'.encode()),
+        0.01,
+    )
+
+
+def test_exchanges_are_written_in_batches_off_the_event_loop(tmp_path: Path):
+    path = tmp_path / "traffic.sqlite"
+
+    async def scenario() -> None:
+        log = TrafficLog(str(path))
+        batches: List[int] = []
+        insert = log._insert
+
+        def counting(batch: list) -> None:
+            batches.append(len(batch))
+            insert(batch)
+
+        log._insert = counting
+        for index in range(200):
+            record(log, index)
+        assert batches == []
+
+        rows = await log.search(url="/api/user/")
+        assert len(rows) == 20 and rows[0]["url"].endswith("/199")
+        assert sum(batches) == 200 and len(batches) <= 2
+
+        row = await log.get(rows[-1]["id"])
+        assert row["method"] == "GET" and b'"id": 180' in bytes(row["response_body"])
+        assert [row["id"] for row in await log.search("180")] == [row["id"]]
+        # Not valid FTS5 syntax, searched as a phrase instead
+        assert await log.search("flag{") == []
+
+        record(log, 200)
+        await log.aclose()
+
+    asyncio.run(scenario())
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT COUNT(*) FROM traffic").fetchone() == (201,)
@@ -0,0 +1,58 @@
+import asyncio
+from typing import List
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.memory.window import TranscriptWindow, message_tokens
+
+
+class RecordingWindow(TranscriptWindow):
+    """Window whose summarizer just counts the transcript excerpts it was given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.excerpts: List[str] = []
+
+    async def _extend(self, summary: str, transcript: str) -> str:
+        self.excerpts.append(transcript)
+        return f"{summary}|{len(self.excerpts)}"
+
+
+def transcript(turns: int) -> List[AnyMessage]:
+    messages: List[AnyMessage] = [SystemMessage("system", id="s"), HumanMessage("task", id="h")]
+    for turn in range(turns):
+        call = {"name": "run_bash", "args": {"command": f"echo {turn}"}, "id": f"call-{turn}"}
+        messages.append(AIMessage("", tool_calls=[call], id=f"ai-{turn}"))
+        messages.append(ToolMessage("x" * 400, tool_call_id=f"call-{turn}", name="run_bash", id=f"tool-{turn}"))
+    return messages
+
+
+def test_short_transcript_is_left_alone():
+    window = RecordingWindow("executor", max_tokens=10_000, keep_tokens=1_000)
+    messages = transcript(2)
+    assert asyncio.run(window.fit(messages)) is messages
+    assert window.excerpts == []
+
+
+def test_long_transcript_keeps_task_summary_and_recent_turns():
+    window = RecordingWindow("executor", max_tokens=1_000, keep_tokens=400)
+    messages = transcript(10)
+    fitted = asyncio.run(window.fit(messages))
+
+    assert fitted[:2] == messages[:2]
+    assert fitted[2].content.startswith("[Summary of ")
+    recent = fitted[3:]
+    assert recent == messages[-len(recent):]
+    assert isinstance(recent[0], AIMessage)
+    assert sum(message_tokens(message) for message in recent) <= 400
+
+
+def test_older_turns_are_summarised_once():
+    window = RecordingWindow("executor", max_tokens=1_000, keep_tokens=400)
+    asyncio.run(window.fit(transcript(10)))
+    first = window.excerpts[0]
+
+    asyncio.run(window.fit(transcript(12)))
+    assert len(window.excerpts) == 2
+    # Only the turns that left the window since the last call are sent to the summarizer
+    assert "echo 0" in first and "echo 0" not in window.excerpts[1]
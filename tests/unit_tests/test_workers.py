@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+
+from src import workers
+from src.utils.problem_api import Challenge, TargetInfo
+from src.workers import ProcessWorkerPool
+
+
+class FakeProcess:
+    def __init__(self, exitcode: Optional[int] = None):
+        self.exitcode = exitcode
+
+
+class FakeQueue:
+    def __init__(self) -> None:
+        self.items: List[Any] = []
+
+    def put(self, item: Any) -> None:
+        self.items.append(item)
+
+
+def make_pool(processes: int) -> ProcessWorkerPool:
+    pool = ProcessWorkerPool(processes)
+    pool._loop = asyncio.get_running_loop()
+    pool._queues = {worker_id: FakeQueue() for worker_id in range(processes)}
+    pool._workers = [FakeProcess() for _ in range(processes)]
+    return pool
+
+
+def make_challenge(code: str) -> Challenge:
+    return Challenge(
+        challenge_code=code,
+        difficulty="easy",
+        points=100,
+        hint_viewed=False,
+        solved=False,
+        target_info=TargetInfo(ip="127.0.0.1", port=[80]),
+    )
+
+
+async def settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_crashed_worker_is_replaced_and_its_started_challenge_failed(monkeypatch: pytest.MonkeyPatch):
+    async def scenario() -> None:
+        pool = make_pool(2)
+        spawned: List[int] = []
+        monkeypatch.setattr(pool, "_spawn", lambda worker_id: spawned.append(worker_id) or FakeProcess())
+        first = asyncio.ensure_future(pool.run(make_challenge("a"), 0))
+        running = asyncio.ensure_future(pool.run(make_challenge("b"), 1))
+        waiting = asyncio.ensure_future(pool.run(make_challenge("c"), 2))
+        await settle()
+        assert [task[0] for task in pool._queues[1].items] == [1]
+        pool._dispatch(("started", 1, 1, None))
+        pool._workers[1].exitcode = -9
+
+        pool._check_workers()
+        pool._check_workers()
+        await settle()
+        assert spawned == [1]
+        with pytest.raises(RuntimeError, match="worker 1 crashed"):
+            await running
+        # The freed slot goes to the challenge that was waiting
+        assert pool._assigned[2][0] == 1
+        assert not first.done() and not waiting.done()
+        first.cancel()
+        waiting.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_challenge_of_a_worker_that_died_before_starting_it_is_requeued(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(workers, "MAX_RESPAWNS", 0)
+
+    async def scenario() -> None:
+        pool = make_pool(2)
+        taken = asyncio.ensure_future(pool.run(make_challenge("a"), 0))
+        await settle()
+        assert [task[0] for task in pool._queues[0].items] == [0]
+        # Took the challenge off its queue, then died before reporting it started
+        pool._workers[0].exitcode = -9
+
+        pool._check_workers()
+        await settle()
+        assert not taken.done()
+        assert [task[0] for task in pool._queues[1].items] == [0]
+        pool._dispatch(("result", 0, 1, "solved"))
+        assert await taken == "solved"
+
+    asyncio.run(scenario())
+
+
+def test_pending_challenges_fail_once_no_worker_is_left(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(workers, "MAX_RESPAWNS", 0)
+
+    async def scenario() -> None:
+        pool = make_pool(1)
+        waiting = asyncio.ensure_future(pool.run(make_challenge("a"), 0))
+        await settle()
+        pool._workers[0].exitcode = 1
+
+        pool._check_workers()
+        await settle()
+        with pytest.raises(RuntimeError, match="no worker processes left"):
+            await waiting
+        with pytest.raises(RuntimeError, match="no worker processes left"):
+            await pool.run(make_challenge("b"), 1)
+
+    asyncio.run(scenario())